@@ -1,170 +1,249 @@
-
 import pygame
 import sys
+import time
+
+from frame_capture import FrameCapture
+from game_loop import FixedTimestepLoop
+from input_sources import MOVE, PONG_KEYS, RESTART, GamepadSource, InputQueue, KeyboardSource, NetworkSource
+from pygame_setup import LazyFont, game_screen
+from replay import ReplayRecorder, new_seed, restore_fields, snapshot_fields
+from pong_core import (SCREEN_WIDTH, SCREEN_HEIGHT, PADDLE_WIDTH, PADDLE_HEIGHT, BALL_SIZE,
+                       LEFT_PADDLE_X, RIGHT_PADDLE_X, PongCore)
+from score_store import ScoreStore
+from text_cache import GlyphAtlas, text_cache
 
 # --- Constants ---
-# Window dimensions
-SCREEN_WIDTH = 800
-SCREEN_HEIGHT = 600
+# Window size, paddle, ball and score settings live in pong_core.py
 
 # Colors
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
 
-# Paddle properties
-PADDLE_WIDTH = 15
-PADDLE_HEIGHT = 100
-PADDLE_SPEED = 7
-
-# Ball properties
-BALL_SIZE = 15
-BALL_SPEED_X = 5
-BALL_SPEED_Y = 5
+# Physics ticks per second; frames are drawn at the display rate
+TICK_RATE = 60
 
-# Score
-WINNING_SCORE = 11
+# Replay actions: left move + 1 in bits 0-1, right move + 1 in bits 2-3, plus a restart flag
+ACTION_RESTART = 16
 
 class PongGame:
     """
     A class to represent the Pong game.
+    The rules run in a headless PongCore; this class handles input and drawing.
     """
-    def __init__(self):
+    ACTIONS = tuple(left | right << 2 for left in range(3) for right in range(3))
+    ACTION_RESTART = ACTION_RESTART
+    SNAPSHOT_FIELDS = ('core', 'left_move', 'right_move', 'restart_requested',
+                       'prev_ball', 'prev_left_y', 'prev_right_y')
+
+    def __init__(self, seed=None, record_path=None, headless=False, remote_port=None):
         """
         Initialize the game.
+        Pong has no randomness, but the seed is still kept so every replay
+        file has the same header; record_path (or $GAME_RECORD) saves the
+        session's per-tick inputs for replay.py.
+        headless draws to an off-screen surface instead of opening a window,
+        for driving the game from code with tick() and render().
+        remote_port lets a second player steer the right paddle over TCP
+        (see NetworkSource in input_sources.py).
         """
-        pygame.init()
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("Ping Pong")
-        self.clock = pygame.time.Clock()
-        self.font = pygame.font.Font(None, 74)
-        self.small_font = pygame.font.Font(None, 36)
+        self.seed = new_seed() if seed is None else seed
+        if record_path:
+            self.recorder = ReplayRecorder(record_path, 'pong', self.seed)
+        else:
+            self.recorder = ReplayRecorder.from_env('pong', self.seed)
+        self.headless = headless
+        self.screen = game_screen((SCREEN_WIDTH, SCREEN_HEIGHT), "Ping Pong", headless)
+        self.capture = FrameCapture.from_env(self.screen.get_size())
+        self.scores = None if headless else ScoreStore.from_env()
+        self.loop = FixedTimestepLoop(TICK_RATE)
+
+        # Keys, gamepads and a remote player all queue input for the next tick
+        self.inputs = InputQueue(KeyboardSource(PONG_KEYS))
+        if not headless:
+            self.inputs.add(GamepadSource(player=1, device=0))
+            self.inputs.add(GamepadSource(player=2, device=1))
+        if remote_port is not None:
+            remote = self.inputs.add(NetworkSource(remote_port, player=2))
+            print(f"Right paddle: send lines like 'move -1' to port {remote.port}")
+        self.font = LazyFont(None, 74)
+        self.small_font = LazyFont(None, 36)
+        self.score_digits = GlyphAtlas(self.small_font, WHITE)
+        self.core = PongCore()
+
+        # Paddle moves requested by input (-1 up, 0 stay, 1 down), applied each tick.
+        # They carry over restarts, like the keys still held down.
+        self.left_move = 0
+        self.right_move = 0
         self.reset_game()
 
     def reset_game(self):
         """
         Reset the game to its initial state.
         """
-        self.player1_score = 0
-        self.player2_score = 0
-        self.game_over = False
-        self.winner = None
-        self.reset_ball()
-
-        self.left_paddle = pygame.Rect(30, (SCREEN_HEIGHT - PADDLE_HEIGHT) // 2, PADDLE_WIDTH, PADDLE_HEIGHT)
-        self.right_paddle = pygame.Rect(SCREEN_WIDTH - 30 - PADDLE_WIDTH, (SCREEN_HEIGHT - PADDLE_HEIGHT) // 2, PADDLE_WIDTH, PADDLE_HEIGHT)
+        self.core.reset_game()
+        self.restart_requested = False  # Restarts happen on a tick so replays stay in step
+        self.session_started = time.perf_counter()
+        self.save_positions()
 
-    def reset_ball(self, direction=1):
+    def save_positions(self):
         """
-        Reset the ball to the center.
+        Remember positions at the start of a tick for render interpolation.
         """
-        self.ball = pygame.Rect(SCREEN_WIDTH // 2 - BALL_SIZE // 2, SCREEN_HEIGHT // 2 - BALL_SIZE // 2, BALL_SIZE, BALL_SIZE)
-        self.ball_speed_x = BALL_SPEED_X * direction
-        self.ball_speed_y = BALL_SPEED_Y
+        self.prev_ball = (self.core.ball_x, self.core.ball_y)
+        self.prev_left_y = self.core.left_y
+        self.prev_right_y = self.core.right_y
 
     def handle_input(self):
         """
-        Handle user input.
+        Handle window events and queue the controls for the next tick.
         """
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_w] and self.left_paddle.top > 0:
-            self.left_paddle.y -= PADDLE_SPEED
-        if keys[pygame.K_s] and self.left_paddle.bottom < SCREEN_HEIGHT:
-            self.left_paddle.y += PADDLE_SPEED
-        if keys[pygame.K_UP] and self.right_paddle.top > 0:
-            self.right_paddle.y -= PADDLE_SPEED
-        if keys[pygame.K_DOWN] and self.right_paddle.bottom < SCREEN_HEIGHT:
-            self.right_paddle.y += PADDLE_SPEED
-
-        for event in pygame.event.get():
+        events = pygame.event.get()
+        for event in events:
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_r and self.game_over:
-                    self.reset_game()
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                self.loop.profiler.toggle()
+        self.inputs.poll(events)
 
-    def update(self):
+    def apply_inputs(self):
+        """
+        Apply the input queued since the last tick. A paddle keeps moving
+        until its player's next MOVE, the way a held key does.
         """
-        Update game state.
+        for event in self.inputs.drain():
+            if event.action == MOVE:
+                if event.player == 1:
+                    self.left_move = event.value
+                else:
+                    self.right_move = event.value
+            elif event.action == RESTART and self.core.game_over:
+                self.restart_requested = True
+
+    def encode_action(self):
         """
-        if self.game_over:
-            return
+        Pack the input the next tick will use into one replay byte.
+        """
+        action = (self.left_move + 1) | (self.right_move + 1) << 2
+        if self.restart_requested:
+            action |= ACTION_RESTART
+        return action
+
+    def apply_action(self, action):
+        """
+        Set the input for the next tick from a replay byte.
+        """
+        self.left_move = (action & 3) - 1
+        self.right_move = (action >> 2 & 3) - 1
+        self.restart_requested = bool(action & ACTION_RESTART)
 
-        # Move the ball
-        self.ball.x += self.ball_speed_x
-        self.ball.y += self.ball_speed_y
+    def snapshot(self):
+        """
+        Copy of the game state, for seeking in replays.
+        """
+        return snapshot_fields(self, self.SNAPSHOT_FIELDS)
 
-        # Ball collision with top/bottom walls
-        if self.ball.top <= 0 or self.ball.bottom >= SCREEN_HEIGHT:
-            self.ball_speed_y *= -1
+    def restore(self, state):
+        """
+        Return to a snapshot() state.
+        """
+        restore_fields(self, state)
 
-        # Ball collision with paddles
-        if self.ball.colliderect(self.left_paddle) or self.ball.colliderect(self.right_paddle):
-            self.ball_speed_x *= -1
+    def tick(self):
+        """
+        Run one logic tick, recording its input first.
+        """
+        self.apply_inputs()
+        if self.recorder is not None:
+            self.recorder.record(self.encode_action())
+        if self.restart_requested:
+            self.reset_game()
+        else:
+            was_over = self.core.game_over
+            self.update()
+            if self.core.game_over and not was_over:
+                self.record_score()
 
-        # Ball goes out of bounds
-        if self.ball.left <= 0:
-            self.player2_score += 1
-            if self.player2_score >= WINNING_SCORE:
-                self.game_over = True
-                self.winner = "Player 2"
-            else:
-                self.reset_ball(1) # Move towards player 1
-        if self.ball.right >= SCREEN_WIDTH:
-            self.player1_score += 1
-            if self.player1_score >= WINNING_SCORE:
-                self.game_over = True
-                self.winner = "Player 1"
-            else:
-                self.reset_ball(-1) # Move towards player 2
+    def record_score(self):
+        """
+        Save the finished match to the high-score store (written in the
+        background). Matches always end at WINNING_SCORE, so they are ranked
+        by the winning margin.
+        """
+        if self.scores is not None:
+            core = self.core
+            self.scores.record('pong', abs(core.player1_score - core.player2_score), player=core.winner,
+                               details=f"{core.player1_score}-{core.player2_score}",
+                               duration=time.perf_counter() - self.session_started)
 
+    def update(self):
+        """
+        Update game state by one tick.
+        """
+        self.save_positions()
+        if self.core.step(self.left_move, self.right_move):
+            # Someone scored and the ball jumped to the center; don't interpolate across it
+            self.prev_ball = (self.core.ball_x, self.core.ball_y)
 
-    def render(self):
+    def render(self, alpha=1.0):
         """
         Render the game.
+        alpha blends positions between the previous tick (0) and the current one (1).
         """
         self.screen.fill(BLACK)
 
         # Draw paddles
-        pygame.draw.rect(self.screen, WHITE, self.left_paddle)
-        pygame.draw.rect(self.screen, WHITE, self.right_paddle)
+        left_y = self.prev_left_y + (self.core.left_y - self.prev_left_y) * alpha
+        right_y = self.prev_right_y + (self.core.right_y - self.prev_right_y) * alpha
+        pygame.draw.rect(self.screen, WHITE, (LEFT_PADDLE_X, round(left_y), PADDLE_WIDTH, PADDLE_HEIGHT))
+        pygame.draw.rect(self.screen, WHITE, (RIGHT_PADDLE_X, round(right_y), PADDLE_WIDTH, PADDLE_HEIGHT))
 
         # Draw ball
-        pygame.draw.ellipse(self.screen, WHITE, self.ball)
+        ball_x = self.prev_ball[0] + (self.core.ball_x - self.prev_ball[0]) * alpha
+        ball_y = self.prev_ball[1] + (self.core.ball_y - self.prev_ball[1]) * alpha
+        pygame.draw.ellipse(self.screen, WHITE, (round(ball_x), round(ball_y), BALL_SIZE, BALL_SIZE))
 
         # Draw net
         for i in range(0, SCREEN_HEIGHT, 20):
             pygame.draw.line(self.screen, WHITE, (SCREEN_WIDTH // 2, i), (SCREEN_WIDTH // 2, i + 10), 1)
 
         # Draw score
-        player1_text = self.small_font.render(str(self.player1_score), True, WHITE)
-        self.screen.blit(player1_text, (SCREEN_WIDTH // 4, 20))
+        self.score_digits.blit(self.screen, str(self.core.player1_score), (SCREEN_WIDTH // 4, 20))
+        self.score_digits.blit(self.screen, str(self.core.player2_score), (SCREEN_WIDTH * 3 // 4, 20))
 
-        player2_text = self.small_font.render(str(self.player2_score), True, WHITE)
-        self.screen.blit(player2_text, (SCREEN_WIDTH * 3 // 4, 20))
-
-        if self.game_over:
-            win_text = self.font.render(f"{self.winner} Wins!", True, WHITE)
+        if self.core.game_over:
+            win_text = text_cache.render(self.font, f"{self.core.winner} Wins!", WHITE)
             win_rect = win_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
             self.screen.blit(win_text, win_rect)
 
-            restart_text = self.small_font.render("Press 'R' to Restart", True, WHITE)
+            restart_text = text_cache.render(self.small_font, "Press 'R' to Restart", WHITE)
             restart_rect = restart_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 50))
             self.screen.blit(restart_text, restart_rect)
 
-
-        pygame.display.flip()
+        self.loop.profiler.draw_overlay(self.screen)
+        if self.capture is not None:
+            self.capture.capture(self.screen)
+        self.loop.profiler.mark('draw')
+        if not self.headless:
+            pygame.display.flip()
 
     def run(self):
         """
         Main game loop.
         """
-        while True:
-            self.handle_input()
-            self.update()
-            self.render()
-            self.clock.tick(60)
+        try:
+            self.loop.run(self.handle_input, self.tick, self.render)
+        finally:
+            if self.recorder is not None:
+                self.recorder.close()
+            if self.capture is not None:
+                self.capture.close()
+            if self.scores is not None:
+                self.scores.close()
+            self.inputs.close()
 
 if __name__ == "__main__":
-    game = PongGame()
+    # --remote PORT lets a second player steer the right paddle over the network
+    remote_port = int(sys.argv[sys.argv.index('--remote') + 1]) if '--remote' in sys.argv else None
+    game = PongGame(remote_port=remote_port)
     game.run()
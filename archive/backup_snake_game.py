@@ -7,45 +7,109 @@ Simple, reliable implementation for workshop demos
 import pygame
 import random
 import sys
+import time
+from collections import deque
 
-# Initialize Pygame
-pygame.init()
+from dirty_rects import DirtyRectRenderer
+from frame_capture import FrameCapture
+from free_cells import FreeCellIndex
+from game_loop import FixedTimestepLoop
+from input_sources import (RESTART, SNAKE_KEYS, STEER, STEP_TURNS, TURN_STEPS, AutopilotSource,
+                           GamepadSource, InputQueue, KeyboardSource, TurnBuffer)
+from pygame_setup import LazyFont, game_screen
+from replay import ReplayRecorder, new_seed, restore_fields, snapshot_fields
+from score_store import ScoreStore
+from snake_autopilot import SnakeAutopilot
+from snake_body import SnakeBody
+from snake_rules import (FOOD_COLORS, GRID_HEIGHT, GRID_SIZE, GRID_WIDTH, TICK_RATE,
+                         WINDOW_HEIGHT, WINDOW_WIDTH)
+from sprite_cache import SpriteCache
+from text_cache import GlyphAtlas, text_cache
 
 # Constants
-WINDOW_WIDTH = 600
-WINDOW_HEIGHT = 400
-GRID_SIZE = 20
-GRID_WIDTH = WINDOW_WIDTH // GRID_SIZE
-GRID_HEIGHT = WINDOW_HEIGHT // GRID_SIZE
+# Window, grid, tick rate and food colors live in snake_rules.py
 
 # Colors
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
 GREEN = (0, 255, 0)
 DARK_GREEN = (0, 200, 0)
-RED = (255, 0, 0)
-ORANGE = (255, 165, 0)
-YELLOW = (255, 255, 0)
-PINK = (255, 20, 147)
-PURPLE = (148, 0, 211)
 
-FOOD_COLORS = [RED, ORANGE, YELLOW, PINK, PURPLE]
+# Replay actions: the low two bits index DIRECTIONS, plus a restart flag
+DIRECTIONS = [(0, -1), (0, 1), (-1, 0), (1, 0)]  # Up, down, left, right
+ACTION_RESTART = 4
 
 class SnakeGame:
-    def __init__(self):
-        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-        pygame.display.set_caption("Snake Game - LLM Workshop Demo")
-        self.clock = pygame.time.Clock()
-        self.font = pygame.font.Font(None, 36)
+    ACTIONS = (0, 1, 2, 3)
+    ACTION_RESTART = ACTION_RESTART
+    SNAPSHOT_FIELDS = ("snake", "direction", "next_direction", "score", "game_over",
+                       "free_cells", "foods", "rng", "restart_requested")
+    
+    def __init__(self, render_mode="full", seed=None, record_path=None, autopilot=False, headless=False):
+        """
+        render_mode is "full" to redraw the whole screen every frame, or
+        "dirty" to redraw only the cells that changed since the last frame.
+        seed fixes where food spawns; record_path (or $GAME_RECORD) saves the
+        session's per-tick inputs for replay.py.
+        autopilot starts with the computer steering (toggle with T).
+        headless draws to an off-screen surface instead of opening a window,
+        for driving the game from code with tick() and render().
+        """
+        self.seed = new_seed() if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.autopilot = SnakeAutopilot(GRID_WIDTH, GRID_HEIGHT) if autopilot else None
+        if record_path:
+            self.recorder = ReplayRecorder(record_path, "snake", self.seed)
+        else:
+            self.recorder = ReplayRecorder.from_env("snake", self.seed)
+        
+        self.headless = headless
+        self.screen = game_screen((WINDOW_WIDTH, WINDOW_HEIGHT), "Snake Game - LLM Workshop Demo", headless)
+        self.capture = FrameCapture.from_env(self.screen.get_size())
+        self.scores = None if headless else ScoreStore.from_env()
+        self.loop = FixedTimestepLoop(TICK_RATE)
+        
+        # Keys, a gamepad and the autopilot all queue input for the next tick
+        self.inputs = InputQueue(KeyboardSource(SNAKE_KEYS), AutopilotSource(self.autopilot_steer))
+        if not headless:
+            self.inputs.add(GamepadSource())
+        self.turns = TurnBuffer()
+        self.font = LazyFont(None, 36)
+        self.digits = GlyphAtlas(self.font, WHITE)
+        
+        # Snake segments and food are baked once per color and drawn with a single blit
+        self.sprites = SpriteCache()
+        self.sprites.register("segment", self.bake_segment)
+        self.sprites.register("food", self.bake_3d_food)
+        
+        # Cells changed since the last frame, for the dirty renderer; full redraws
+        # don't need them, so they are dropped as they are added
+        self.render_mode = render_mode
+        self.dirty_cells = [] if render_mode == "dirty" else deque(maxlen=0)
+        if render_mode == "dirty":
+            background = pygame.Surface(self.screen.get_size())
+            background.fill(BLACK)
+            self.renderer = DirtyRectRenderer(self.screen, background)
+        self.hud_rect = pygame.Rect(0, 0, 0, 0)
+        self.drawn_hud = None
+        self.drawn_game_over = False
         
         self.reset_game()
     
     def reset_game(self):
         # Snake starts in the middle
-        self.snake = [(GRID_WIDTH // 2, GRID_HEIGHT // 2)]
+        self.snake = SnakeBody([(GRID_WIDTH // 2, GRID_HEIGHT // 2)])
         self.direction = (1, 0)  # Moving right
+        self.next_direction = self.direction  # Applied on the next tick
+        self.turns.clear()
         self.score = 0
         self.game_over = False
+        self.restart_requested = False  # Restarts happen on a tick so replays stay in step
+        self.session_started = time.perf_counter()
+        self.free_cells = FreeCellIndex(GRID_WIDTH, GRID_HEIGHT, self.snake)
+        
+        self.dirty_cells.clear()
+        self.full_redraw = True
         
         # Create multiple food items
         self.foods = []
@@ -54,31 +118,105 @@ class SnakeGame:
         self.spawn_food()
     
     def spawn_food(self):
-        """Spawn a food item at a random location not occupied by snake or other food"""
-        max_attempts = 100
-        for _ in range(max_attempts):
-            x = random.randint(0, GRID_WIDTH - 1)
-            y = random.randint(0, GRID_HEIGHT - 1)
-            
-            # Check if position is free
-            if (x, y) not in self.snake and not any((x, y) == food[:2] for food in self.foods):
-                color = random.choice(FOOD_COLORS)
-                self.foods.append((x, y, color))
-                break
+        """
+        Spawn a food item on a random free cell (not snake or other food).
+        Returns False when the board is full and nothing could be spawned.
+        """
+        position = self.free_cells.pop_random(self.rng)
+        if position is None:
+            return False
+        
+        color = self.rng.choice(FOOD_COLORS)
+        self.foods.append((position[0], position[1], color))
+        self.dirty_cells.append(position)
+        return True
+    
+    def handle_events(self):
+        """Handle window and key-press events; returns False to quit"""
+        events = pygame.event.get()
+        for event in events:
+            if event.type == pygame.QUIT:
+                return False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:  # Quit
+                    return False
+                elif event.key == pygame.K_t:  # Autopilot on/off
+                    self.autopilot = None if self.autopilot else SnakeAutopilot(GRID_WIDTH, GRID_HEIGHT)
+                elif event.key == pygame.K_F3:  # Frame profiler overlay
+                    self.loop.profiler.toggle()
+                    self.full_redraw = True
+        
+        # WASD, R and the gamepad are queued for the next tick
+        self.inputs.poll(events)
+        return True
     
     def handle_input(self):
-        """Handle WASD key input"""
-        keys = pygame.key.get_pressed()
-        
-        # WASD controls
-        if keys[pygame.K_w] and self.direction != (0, 1):  # W - up
-            self.direction = (0, -1)
-        elif keys[pygame.K_s] and self.direction != (0, -1):  # S - down
-            self.direction = (0, 1)
-        elif keys[pygame.K_a] and self.direction != (1, 0):  # A - left
-            self.direction = (-1, 0)
-        elif keys[pygame.K_d] and self.direction != (-1, 0):  # D - right
-            self.direction = (1, 0)
+        """
+        Apply the input queued since the last tick.
+        Every turn pressed is buffered and the snake takes one per tick, checked
+        against the direction it actually last moved in, so quick turns
+        (a U-turn within one tick) all happen. The autopilot's steer replaces them.
+        """
+        for event in self.inputs.drain():
+            if event.action == RESTART:
+                self.restart_requested = True
+            elif event.action == STEER:
+                self.turns.clear()
+                self.next_direction = TURN_STEPS[event.value]
+            elif event.action in TURN_STEPS:
+                self.turns.push(event.action)
+        turn = self.turns.next_turn(STEP_TURNS[self.direction])
+        if turn is not None:
+            self.next_direction = TURN_STEPS[turn]
+    
+    def autopilot_steer(self):
+        """The autopilot's move for the next tick, while it is on"""
+        if self.autopilot is None or self.game_over:
+            return None
+        foods = [(x, y) for x, y, _ in self.foods]
+        return STEER, STEP_TURNS[self.autopilot.choose(self.snake, foods, self.direction)]
+    
+    def encode_action(self):
+        """Pack the input the next tick will use into one replay byte"""
+        action = DIRECTIONS.index(self.next_direction)
+        if self.restart_requested:
+            action |= ACTION_RESTART
+        return action
+    
+    def apply_action(self, action):
+        """Set the input for the next tick from a replay byte"""
+        self.next_direction = DIRECTIONS[action & 3]
+        self.restart_requested = bool(action & ACTION_RESTART)
+    
+    def snapshot(self):
+        """Copy of the game state, for seeking in replays"""
+        return snapshot_fields(self, self.SNAPSHOT_FIELDS)
+    
+    def restore(self, state):
+        """Return to a snapshot() state"""
+        restore_fields(self, state)
+        self.turns.clear()
+        self.dirty_cells.clear()
+        self.full_redraw = True
+    
+    def tick(self):
+        """Run one logic tick, recording its input first"""
+        self.handle_input()
+        if self.recorder is not None:
+            self.recorder.record(self.encode_action())
+        if self.restart_requested:
+            self.reset_game()
+        else:
+            was_over = self.game_over
+            self.update()
+            if self.game_over and not was_over:
+                self.record_score()
+    
+    def record_score(self):
+        """Save the finished game to the high-score store (written in the background)"""
+        if self.scores is not None:
+            self.scores.record("snake", self.score, details=f"length {len(self.snake)}",
+                               duration=time.perf_counter() - self.session_started)
     
     def update(self):
         """Update game state"""
@@ -86,7 +224,8 @@ class SnakeGame:
             return
         
         # Move snake
-        head_x, head_y = self.snake[0]
+        self.direction = self.next_direction
+        head_x, head_y = self.snake.head
         new_head = (head_x + self.direction[0], head_y + self.direction[1])
         
         # Check wall collision
@@ -100,8 +239,11 @@ class SnakeGame:
             self.game_over = True
             return
         
-        # Add new head
-        self.snake.insert(0, new_head)
+        # Add new head (the old head changes colour, so it is dirty too)
+        self.snake.push_head(new_head)
+        self.free_cells.discard(new_head)
+        self.dirty_cells.append((head_x, head_y))
+        self.dirty_cells.append(new_head)
         
         # Check food collision
         food_eaten = False
@@ -115,94 +257,165 @@ class SnakeGame:
         
         # Remove tail if no food eaten
         if not food_eaten:
-            self.snake.pop()
+            tail = self.snake.pop_tail()
+            self.free_cells.add(tail)
+            self.dirty_cells.append(tail)
     
-    def draw_3d_food(self, x, y, color):
-        """Draw food with 3D effect"""
-        pixel_x = x * GRID_SIZE
-        pixel_y = y * GRID_SIZE
+    def bake_segment(self, color):
+        """Bake a snake segment tile"""
+        tile = pygame.Surface((GRID_SIZE-1, GRID_SIZE-1))
+        tile.fill(color)
+        return tile
+    
+    def bake_3d_food(self, color):
+        """Bake a food tile with 3D effect"""
+        tile = pygame.Surface((GRID_SIZE, GRID_SIZE), pygame.SRCALPHA)
         
         # Create shadow
         shadow_color = tuple(max(0, c - 100) for c in color)
-        pygame.draw.circle(self.screen, shadow_color, 
-                         (pixel_x + GRID_SIZE//2 + 2, pixel_y + GRID_SIZE//2 + 2), 
+        pygame.draw.circle(tile, shadow_color, 
+                         (GRID_SIZE//2 + 2, GRID_SIZE//2 + 2), 
                          GRID_SIZE//2 - 2)
         
         # Main food circle
-        pygame.draw.circle(self.screen, color, 
-                         (pixel_x + GRID_SIZE//2, pixel_y + GRID_SIZE//2), 
+        pygame.draw.circle(tile, color, 
+                         (GRID_SIZE//2, GRID_SIZE//2), 
                          GRID_SIZE//2 - 2)
         
         # Highlight
         highlight_color = tuple(min(255, c + 100) for c in color)
-        pygame.draw.circle(self.screen, highlight_color, 
-                         (pixel_x + GRID_SIZE//2 - 3, pixel_y + GRID_SIZE//2 - 3), 
+        pygame.draw.circle(tile, highlight_color, 
+                         (GRID_SIZE//2 - 3, GRID_SIZE//2 - 3), 
                          GRID_SIZE//4)
+        return tile
+    
+    def draw_3d_food(self, x, y, color):
+        """Draw food with 3D effect"""
+        self.screen.blit(self.sprites.get("food", color), (x * GRID_SIZE, y * GRID_SIZE))
+    
+    def draw_cell(self, cell):
+        """Draw whatever occupies a single grid cell"""
+        x, y = cell
+        if cell == self.snake.head:
+            self.screen.blit(self.sprites.get("segment", GREEN), (x * GRID_SIZE, y * GRID_SIZE))
+        elif cell in self.snake:
+            self.screen.blit(self.sprites.get("segment", DARK_GREEN), (x * GRID_SIZE, y * GRID_SIZE))
+        else:
+            for food in self.foods:
+                if food[0] == x and food[1] == y:
+                    self.draw_3d_food(x, y, food[2])
+                    break
+    
+    def draw_hud(self):
+        """Draw the score and food count"""
+        # Draw score
+        score_label = text_cache.render(self.font, "Score: ", WHITE)
+        score = str(self.score)
+        score_rect = pygame.Rect((10, 10), self.digits.label_size(score_label, score))
+        
+        # Draw food count
+        food_count_label = text_cache.render(self.font, "Food Items: ", WHITE)
+        food_count = str(len(self.foods))
+        food_count_rect = pygame.Rect((10, 50), self.digits.label_size(food_count_label, food_count))
+        
+        hud_rect = score_rect.union(food_count_rect)
+        if self.render_mode == "dirty":
+            # The text sits on top of the grid, so repaint the cells underneath first
+            area = self.renderer.restore(hud_rect.union(self.hud_rect))
+            for y in range(area.top // GRID_SIZE, (area.bottom - 1) // GRID_SIZE + 1):
+                for x in range(area.left // GRID_SIZE, (area.right - 1) // GRID_SIZE + 1):
+                    self.draw_cell((x, y))
+        
+        self.digits.blit_label(self.screen, score_label, score, score_rect.topleft)
+        self.digits.blit_label(self.screen, food_count_label, food_count, food_count_rect.topleft)
+        self.hud_rect = hud_rect
+        self.drawn_hud = (self.score, len(self.foods))
     
-    def render(self):
-        """Render the game"""
+    def draw_frame(self):
+        """Draw the whole frame without presenting it"""
         self.screen.fill(BLACK)
         
-        # Draw snake
-        for i, segment in enumerate(self.snake):
-            x, y = segment
-            pixel_x = x * GRID_SIZE
-            pixel_y = y * GRID_SIZE
-            
-            # Snake head is brighter
-            color = GREEN if i == 0 else DARK_GREEN
-            pygame.draw.rect(self.screen, color, 
-                           (pixel_x, pixel_y, GRID_SIZE-1, GRID_SIZE-1))
+        # Draw snake body in one batch, then the brighter head on top
+        body = self.sprites.placements("segment", DARK_GREEN, GRID_SIZE)
+        self.screen.blits(map(body.__getitem__, self.snake), doreturn=False)
+        head_x, head_y = self.snake.head
+        self.screen.blit(self.sprites.get("segment", GREEN), (head_x * GRID_SIZE, head_y * GRID_SIZE))
         
         # Draw food items with 3D effect
-        for food in self.foods:
-            x, y, color = food
-            self.draw_3d_food(x, y, color)
+        self.screen.blits([(self.sprites.get("food", color), (x * GRID_SIZE, y * GRID_SIZE))
+                           for x, y, color in self.foods], doreturn=False)
         
-        # Draw score
-        score_text = self.font.render(f"Score: {self.score}", True, WHITE)
-        self.screen.blit(score_text, (10, 10))
-        
-        # Draw food count
-        food_count_text = self.font.render(f"Food Items: {len(self.foods)}", True, WHITE)
-        self.screen.blit(food_count_text, (10, 50))
+        # Draw score and food count
+        self.draw_hud()
         
         # Draw game over
         if self.game_over:
-            game_over_text = self.font.render("GAME OVER! Press R to restart", True, WHITE)
+            game_over_text = text_cache.render(self.font, "GAME OVER! Press R to restart", WHITE)
             text_rect = game_over_text.get_rect(center=(WINDOW_WIDTH//2, WINDOW_HEIGHT//2))
             self.screen.blit(game_over_text, text_rect)
+        self.drawn_game_over = self.game_over
+    
+    def render_dirty(self):
+        """
+        Redraw only the cells and HUD text that changed since the last frame.
+        While the profiler overlay is shown every frame is redrawn in full.
+        """
+        profiler = self.loop.profiler
+        if self.full_redraw or profiler.visible or self.game_over != self.drawn_game_over:
+            self.draw_frame()
+            self.renderer.mark_all()
+            self.full_redraw = False
+        else:
+            hud_dirty = self.drawn_hud != (self.score, len(self.foods))
+            for cell in self.dirty_cells:
+                rect = self.renderer.restore((cell[0] * GRID_SIZE, cell[1] * GRID_SIZE, GRID_SIZE, GRID_SIZE))
+                self.draw_cell(cell)
+                hud_dirty = hud_dirty or rect.colliderect(self.hud_rect)
+            
+            if hud_dirty:
+                self.draw_hud()
+        
+        self.dirty_cells.clear()
+        profiler.draw_overlay(self.screen)
+        if self.capture is not None:
+            self.capture.capture(self.screen)
+        profiler.mark('draw')
+        self.renderer.present()
+    
+    def render(self, alpha=1.0):
+        """
+        Render the game.
+        alpha is the fraction of the way to the next tick; the snake moves in
+        whole cells, so it is not used here.
+        """
+        if self.render_mode == "dirty":
+            self.render_dirty()
+            return
         
-        pygame.display.flip()
+        self.draw_frame()
+        self.loop.profiler.draw_overlay(self.screen)
+        if self.capture is not None:
+            self.capture.capture(self.screen)
+        self.loop.profiler.mark('draw')
+        if not self.headless:
+            pygame.display.flip()
     
     def run(self):
         """Main game loop"""
-        print("Snake Game Controls: W/A/S/D to move, R to restart, ESC to quit")
+        print("Snake Game Controls: W/A/S/D to move, R to restart, T for autopilot, F3 for frame timings, ESC to quit")
         print("Collect the colorful food items to grow and increase your score!")
         
-        running = True
-        while running:
-            # Handle events
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_r:  # Restart
-                        self.reset_game()
-                    elif event.key == pygame.K_ESCAPE:  # Quit
-                        running = False
-            
-            # Handle continuous input
-            self.handle_input()
-            
-            # Update game
-            self.update()
-            
-            # Render
-            self.render()
-            
-            # Control game speed
-            self.clock.tick(10)  # 10 FPS for smooth movement
+        # Logic runs at TICK_RATE; input and rendering run every frame
+        try:
+            self.loop.run(self.handle_events, self.tick, self.render)
+        finally:
+            if self.recorder is not None:
+                self.recorder.close()
+            if self.capture is not None:
+                self.capture.close()
+            if self.scores is not None:
+                self.scores.close()
+            self.inputs.close()
         
         pygame.quit()
         sys.exit()
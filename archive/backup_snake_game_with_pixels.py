@@ -1,6 +1,23 @@
 import pygame
 import sys
 import random
+import time
+from collections import deque
+
+from dirty_rects import DirtyRectRenderer
+from frame_capture import FrameCapture
+from free_cells import FreeCellIndex, SparseFreeCells
+from game_loop import FixedTimestepLoop
+from input_sources import (PAUSE, RESTART, SNAKE_KEYS, STEER, AutopilotSource, GamepadSource, InputQueue,
+                           KeyboardSource, TurnBuffer)
+from pygame_setup import LazyFont, game_screen
+from replay import ReplayRecorder, new_seed, restore_fields, snapshot_fields
+from score_store import ScoreStore
+from snake_autopilot import GreedyPilot, SnakeAutopilot
+from snake_body import SnakeBody
+from snake_world import CHUNK_SIZE, SnakeWorld
+from sprite_cache import SpriteCache
+from text_cache import GlyphAtlas, text_cache
 
 # --- Constants ---
 SCREEN_WIDTH = 800
@@ -17,6 +34,7 @@ FONT_NAME = 'PressStart2P-Regular.ttf'
 # Retro Color Palette (NES-like)
 COLOR_BACKGROUND = (12, 12, 12)
 COLOR_GRID_BG = (20, 20, 20)
+COLOR_GRID_CHECKER = (26, 26, 26)  # Every other cell in large-world mode, so scrolling shows
 COLOR_SNAKE_HEAD = (118, 204, 9)
 COLOR_SNAKE_BODY = (80, 140, 20)
 COLOR_SNAKE_OUTLINE = (12, 12, 12)
@@ -28,28 +46,92 @@ COLOR_GAMEOVER = (214, 60, 60)
 
 # Game settings
 SNAKE_INITIAL_LENGTH = 3
-SNAKE_SPEED_FPS = 10
+SNAKE_SPEED_FPS = 10  # Logic ticks per second; frames are drawn at the display rate
+FOOD_COUNT = 3
+
+# Large-world mode: a world much bigger than the window, seen through a camera on the head
+WORLD_WIDTH = 2000
+WORLD_HEIGHT = 2000
+WORLD_CELLS_PER_FOOD = 400
+
+# Replay actions: the low two bits index DIRECTIONS, plus restart and pause-toggle flags
+DIRECTIONS = ['UP', 'DOWN', 'LEFT', 'RIGHT']
+DIRECTION_STEPS = {'UP': (0, -1), 'DOWN': (0, 1), 'LEFT': (-1, 0), 'RIGHT': (1, 0)}
+STEP_DIRECTIONS = {step: name for name, step in DIRECTION_STEPS.items()}
+ACTION_RESTART = 4
+ACTION_PAUSE = 8
 
 class SnakeGame:
     """
     A class to encapsulate the Snake game logic and data with a retro UI style.
     """
-    def __init__(self):
+    REPLAY_KIND = 'snake_retro'
+    ACTIONS = (0, 1, 2, 3, ACTION_PAUSE)
+    ACTION_RESTART = ACTION_RESTART
+    SNAPSHOT_FIELDS = ('snake', 'direction', 'new_direction', 'score', 'game_over', 'paused',
+                       'free_cells', 'food', 'rng', '_restart_requested', '_pause_requested')
+
+    def __init__(self, render_mode='full', seed=None, record_path=None, autopilot=False, world_size=None,
+                 headless=False):
         """
         Initializes the game, sets up the screen, and resets the game state.
+        render_mode is 'full' to redraw everything each frame, or 'dirty' to
+        redraw only the cells and status text that changed.
+        seed fixes where food spawns; record_path (or $GAME_RECORD) saves the
+        session's per-tick inputs for replay.py.
+        autopilot starts with the computer steering (toggle with T).
+        world_size, a (width, height) in cells, plays on a world larger than
+        the window with a camera that follows the head; frames are then always
+        drawn in full, and only what is in view is drawn.
+        headless draws to an off-screen surface instead of opening a window,
+        for driving the game from code with _tick() and _draw_elements().
         """
-        pygame.init()
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption('Snake Game - Retro Edition')
-        self.clock = pygame.time.Clock()
-        try:
-            self.ui_font = pygame.font.Font(FONT_NAME, 16)
-            self.message_font = pygame.font.Font(FONT_NAME, 40)
-        except FileNotFoundError:
-            print(f"Error: Font file '{FONT_NAME}' not found. Please place it in the root directory.")
-            print("Using default font.")
-            self.ui_font = pygame.font.Font(None, 24)
-            self.message_font = pygame.font.Font(None, 50)
+        self.seed = new_seed() if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.grid_width, self.grid_height = world_size or (GRID_WIDTH, GRID_HEIGHT)
+        self.food_count = FOOD_COUNT
+        self.world = None
+        if world_size is not None:
+            self.food_count = max(FOOD_COUNT, self.grid_width * self.grid_height // WORLD_CELLS_PER_FOOD)
+            self.world = SnakeWorld(self.grid_width, self.grid_height, GRID_WIDTH, GRID_HEIGHT,
+                                    GRID_SIZE, self._bake_chunk)
+            render_mode = 'full'   # The camera scrolls every tick, so there is nothing to keep
+        self.autopilot = self._new_autopilot() if autopilot else None
+        if record_path:
+            self.recorder = ReplayRecorder(record_path, self.REPLAY_KIND, self.seed)
+        else:
+            self.recorder = ReplayRecorder.from_env(self.REPLAY_KIND, self.seed)
+        self.headless = headless
+        self.screen = game_screen((SCREEN_WIDTH, SCREEN_HEIGHT), 'Snake Game - Retro Edition', headless)
+        self.capture = FrameCapture.from_env(self.screen.get_size())
+        self.scores = None if headless else ScoreStore.from_env()
+        self.loop = FixedTimestepLoop(SNAKE_SPEED_FPS)
+
+        # Keys, a gamepad and the autopilot all queue input for the next tick
+        self.inputs = InputQueue(KeyboardSource(SNAKE_KEYS), AutopilotSource(self._autopilot_steer))
+        if not headless:
+            self.inputs.add(GamepadSource())
+        self._turns = TurnBuffer()
+
+        # The pixel font is loaded on first draw; the default font stands in if it is missing
+        self.ui_font = LazyFont(FONT_NAME, 16, fallback_size=24)
+        self.message_font = LazyFont(FONT_NAME, 40, fallback_size=50)
+        self.ui_digits = GlyphAtlas(self.ui_font, COLOR_UI_TEXT)
+
+        # Pixel blocks are baked once per (fill, outline) pair and drawn with one blit
+        self.sprites = SpriteCache()
+        self.sprites.register('block', self._bake_pixel_block)
+
+        # Cells changed since the last frame, for the dirty renderer; full redraws
+        # don't need them, so they are dropped as they are added
+        self.render_mode = render_mode
+        self._dirty_cells = [] if render_mode == 'dirty' else deque(maxlen=0)
+        if render_mode == 'dirty':
+            background = pygame.Surface(self.screen.get_size())
+            self._draw_background(background)
+            self.renderer = DirtyRectRenderer(self.screen, background)
+        self._drawn_status = None
+        self._drawn_overlay = (False, False)
 
         self.game_over = False
         self.paused = False
@@ -62,73 +144,194 @@ class SnakeGame:
         self.game_over = False
         self.paused = False
         self.score = 0
+
+        # Restarts and pause toggles wait for the next tick so replays stay in step
+        self._restart_requested = False
+        self._pause_requested = False
+        self._session_started = time.perf_counter()
         
         # Center the snake in the new playable area
-        start_x = GRID_WIDTH // 2
-        start_y = GRID_HEIGHT // 2
-        self.snake = [(start_x, start_y)]
-        for i in range(1, SNAKE_INITIAL_LENGTH):
-            self.snake.append((start_x - i, start_y))
+        start_x = self.grid_width // 2
+        start_y = self.grid_height // 2
+        self.snake = SnakeBody((start_x - i, start_y) for i in range(SNAKE_INITIAL_LENGTH))
         
+        if self.world is None:
+            self.free_cells = FreeCellIndex(self.grid_width, self.grid_height, self.snake)
+        else:
+            # A large world is nearly empty, so only the occupied cells are tracked
+            self.free_cells = SparseFreeCells(self.grid_width, self.grid_height, self.snake)
+            self.world.reset(self.snake)
+
         self.direction = 'RIGHT'
         self.new_direction = 'RIGHT'
+        self._turns.clear()
         
+        self._dirty_cells.clear()
+        self._full_redraw = True
+
         self.food = []
-        self._spawn_food(3)
+        self._spawn_food(self.food_count)
 
     def _spawn_food(self, count=1):
         """
-        Spawns food, ensuring it's not in the status bar area or on the snake.
+        Spawns food on random free cells (not on the snake or other food).
+        Returns how many items were placed, which is less than count once the board is full.
         """
-        for _ in range(count):
-            while True:
-                # Position is relative to the playable grid
-                position = (random.randint(0, GRID_WIDTH - 1), random.randint(0, GRID_HEIGHT - 1))
-                if position not in self.snake and position not in self.food:
-                    self.food.append(position)
-                    break
+        for spawned in range(count):
+            # Position is relative to the playable grid
+            position = self.free_cells.pop_random(self.rng)
+            if position is None:
+                return spawned
+            self.food.append(position)
+            self._dirty_cells.append(position)
+            if self.world is not None:
+                self.world.food.add(position)
+        return count
 
     def run(self):
         """
         The main game loop.
         """
-        while True:
-            self._handle_input()
-            if not self.game_over and not self.paused:
-                self._update_game_state()
-            self._draw_elements()
-            self.clock.tick(SNAKE_SPEED_FPS)
+        try:
+            self.loop.run(self._handle_input, self._tick, self._draw_elements)
+        finally:
+            if self.recorder is not None:
+                self.recorder.close()
+            if self.capture is not None:
+                self.capture.close()
+            if self.scores is not None:
+                self.scores.close()
+            self.inputs.close()
+
+    def _tick(self):
+        """
+        Advances the game by one fixed logic tick, recording its input first.
+        """
+        self._apply_inputs()
+        if self.recorder is not None:
+            self.recorder.record(self.encode_action())
+        if self._restart_requested:
+            self._reset_game_state()
+            return
+        if self._pause_requested:
+            self._pause_requested = False
+            self.paused = not self.paused
+        if not self.game_over and not self.paused:
+            self._update_game_state()
+            if self.game_over:
+                self._record_score()
+
+    def _record_score(self):
+        """
+        Saves the finished game to the high-score store (written in the background).
+        """
+        if self.scores is not None:
+            self.scores.record(self.REPLAY_KIND, self.score, details=f'length {len(self.snake)}',
+                               duration=time.perf_counter() - self._session_started)
+
+    def encode_action(self):
+        """
+        Packs the input the next tick will use into one replay byte.
+        """
+        action = DIRECTIONS.index(self.new_direction)
+        if self._restart_requested:
+            action |= ACTION_RESTART
+        if self._pause_requested:
+            action |= ACTION_PAUSE
+        return action
+
+    def apply_action(self, action):
+        """
+        Sets the input for the next tick from a replay byte.
+        """
+        self.new_direction = DIRECTIONS[action & 3]
+        self._restart_requested = bool(action & ACTION_RESTART)
+        self._pause_requested = bool(action & ACTION_PAUSE)
+
+    def snapshot(self):
+        """
+        Returns a copy of the game state, for seeking in replays.
+        """
+        return snapshot_fields(self, self.SNAPSHOT_FIELDS)
+
+    def restore(self, state):
+        """
+        Returns to a snapshot() state.
+        """
+        restore_fields(self, state)
+        self._turns.clear()
+        if self.world is not None:
+            self.world.reset(self.snake, self.food)
+        self._dirty_cells.clear()
+        self._full_redraw = True
 
     def _handle_input(self):
         """
-        Handles user input for controlling the snake and game state.
+        Handles window and key events; the controls are queued for the next tick.
         """
-        for event in pygame.event.get():
+        events = pygame.event.get()
+        for event in events:
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
             elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_p and not self.game_over:
-                    self.paused = not self.paused
+                if event.key == pygame.K_F3:
+                    self.loop.profiler.toggle()
+                    self._full_redraw = True
+                if event.key == pygame.K_t:
+                    self.autopilot = None if self.autopilot else self._new_autopilot()
+        self.inputs.poll(events)
+
+    def _apply_inputs(self):
+        """
+        Applies the input queued since the last tick. Turns are buffered and
+        the snake takes one valid turn per tick, so quick turns (a U-turn
+        within one tick) all happen; the autopilot's steer replaces them.
+        """
+        for event in self.inputs.drain():
+            if event.action == RESTART:
                 if self.game_over:
-                    if event.key == pygame.K_r:
-                        self._reset_game_state()
-                elif not self.paused:
-                    if event.key == pygame.K_w and self.direction != 'DOWN':
-                        self.new_direction = 'UP'
-                    elif event.key == pygame.K_s and self.direction != 'UP':
-                        self.new_direction = 'DOWN'
-                    elif event.key == pygame.K_a and self.direction != 'RIGHT':
-                        self.new_direction = 'LEFT'
-                    elif event.key == pygame.K_d and self.direction != 'LEFT':
-                        self.new_direction = 'RIGHT'
+                    self._restart_requested = True
+            elif event.action == PAUSE:
+                if not self.game_over:
+                    self._pause_requested = not self._pause_requested
+            elif self.game_over or self.paused:
+                continue
+            elif event.action == STEER:
+                self._turns.clear()
+                self.new_direction = event.value
+            elif event.action in DIRECTION_STEPS:
+                self._turns.push(event.action)
+        if not self.game_over and not self.paused:
+            turn = self._turns.next_turn(self.direction)
+            if turn is not None:
+                self.new_direction = turn
+
+    def _autopilot_steer(self):
+        """
+        The autopilot's move for the next tick, while it is on.
+        """
+        if self.autopilot is None or self.game_over or self.paused:
+            return None
+        foods = self.food if self.world is None else self.world.food
+        step = self.autopilot.choose(self.snake, foods, DIRECTION_STEPS[self.direction])
+        return STEER, STEP_DIRECTIONS[step]
+
+    def _new_autopilot(self):
+        """
+        An autopilot for the board. A large world gets the greedy one, as the
+        cycle autopilot's per-cell tables would take too long to build.
+        """
+        if self.world is not None:
+            return GreedyPilot(self.grid_width, self.grid_height)
+        return SnakeAutopilot(self.grid_width, self.grid_height)
 
     def _update_game_state(self):
         """
         Updates snake position and checks for collisions within the playable area.
         """
         self.direction = self.new_direction
-        head_x, head_y = self.snake[0]
+        head_x, head_y = self.snake.head
 
         if self.direction == 'UP': head_y -= 1
         elif self.direction == 'DOWN': head_y += 1
@@ -138,7 +341,7 @@ class SnakeGame:
         new_head = (head_x, head_y)
 
         # Check for wall collision (within the playable grid)
-        if not (0 <= head_x < GRID_WIDTH and 0 <= head_y < GRID_HEIGHT):
+        if not (0 <= head_x < self.grid_width and 0 <= head_y < self.grid_height):
             self.game_over = True
             return
 
@@ -146,66 +349,203 @@ class SnakeGame:
             self.game_over = True
             return
 
-        self.snake.insert(0, new_head)
+        # The old head changes colour, so it is dirty along with the new one
+        self._dirty_cells.append(self.snake.head)
+        self._dirty_cells.append(new_head)
+        self.snake.push_head(new_head)
+        self.free_cells.discard(new_head)
+        world = self.world
+        if world is not None:
+            world.body.add(new_head)
 
-        if new_head in self.food:
+        # A large world has thousands of food items, so ask its index rather than the list
+        if new_head in (self.food if world is None else world.food):
             self.score += 10
             self.food.remove(new_head)
+            if world is not None:
+                world.food.discard(new_head)
             self._spawn_food()
         else:
-            self.snake.pop()
+            tail = self.snake.pop_tail()
+            self.free_cells.add(tail)
+            self._dirty_cells.append(tail)
+            if world is not None:
+                world.body.discard(tail)
+
+    def _bake_pixel_block(self, colors):
+        """ Bakes a block tile with an outline. colors is a (fill, outline) pair. """
+        color, outline_color = colors
+        tile = pygame.Surface((GRID_SIZE, GRID_SIZE))
+
+        # Draw outline
+        tile.fill(outline_color)
+        # Draw inner fill
+        pygame.draw.rect(tile, color, (1, 1, GRID_SIZE - 2, GRID_SIZE - 2))
+        return tile
+
+    def _bake_chunk(self, chunk_x, chunk_y):
+        """ Bakes a CHUNK_SIZE square of the large world's floor, with its edges where they fall. """
+        size = CHUNK_SIZE * GRID_SIZE
+        chunk = pygame.Surface((size, size))
+        chunk.fill(COLOR_GRID_BG)
+        left, top = chunk_x * CHUNK_SIZE, chunk_y * CHUNK_SIZE
+        for y in range(CHUNK_SIZE):
+            for x in range(CHUNK_SIZE):
+                if (left + x + top + y) % 2:
+                    chunk.fill(COLOR_GRID_CHECKER, (x * GRID_SIZE, y * GRID_SIZE, GRID_SIZE, GRID_SIZE))
+
+        # World edges: past them is background, and the edge itself gets the play area border
+        right = (self.grid_width - left) * GRID_SIZE
+        bottom = (self.grid_height - top) * GRID_SIZE
+        if right < size:
+            chunk.fill(COLOR_BACKGROUND, (right, 0, size - right, size))
+        if bottom < size:
+            chunk.fill(COLOR_BACKGROUND, (0, bottom, size, size - bottom))
+        edges = [(0, 0, 2, size)] if left == 0 else []
+        edges += [(0, 0, size, 2)] if top == 0 else []
+        edges += [(right - 2, 0, 2, size)] if right <= size else []
+        edges += [(0, bottom - 2, size, 2)] if bottom <= size else []
+        for edge in edges:
+            chunk.fill(COLOR_UI_BORDER, edge)
+        return chunk
 
     def _draw_pixel_block(self, grid_pos, color, outline_color):
         """ Helper to draw a block with an outline in the playable grid. """
         x = grid_pos[0] * GRID_SIZE
         y = grid_pos[1] * GRID_SIZE + PLAY_AREA_Y_OFFSET
-        
-        # Draw outline
-        pygame.draw.rect(self.screen, outline_color, (x, y, GRID_SIZE, GRID_SIZE))
-        # Draw inner fill
-        pygame.draw.rect(self.screen, color, (x + 1, y + 1, GRID_SIZE - 2, GRID_SIZE - 2))
+        self.screen.blit(self.sprites.get('block', (color, outline_color)), (x, y))
+
+    def _draw_cell(self, grid_pos):
+        """ Draws whatever occupies a single cell of the playable grid. """
+        if grid_pos == self.snake.head:
+            self._draw_pixel_block(grid_pos, COLOR_SNAKE_HEAD, COLOR_SNAKE_OUTLINE)
+        elif grid_pos in self.snake:
+            self._draw_pixel_block(grid_pos, COLOR_SNAKE_BODY, COLOR_SNAKE_OUTLINE)
+        elif grid_pos in self.food:
+            self._draw_pixel_block(grid_pos, COLOR_FOOD, COLOR_FOOD_OUTLINE)
 
-    def _draw_elements(self):
+    def _draw_background(self, surface):
         """
-        Renders all game elements with a retro style.
+        Draws the parts of the frame that never change: status bar frame and play area.
         """
-        self.screen.fill(COLOR_BACKGROUND)
-        
+        surface.fill(COLOR_BACKGROUND)
+
         # --- Draw UI / Status Bar ---
-        pygame.draw.rect(self.screen, COLOR_UI_BORDER, (0, 0, SCREEN_WIDTH, STATUS_BAR_HEIGHT))
-        pygame.draw.rect(self.screen, COLOR_BACKGROUND, (2, 2, SCREEN_WIDTH - 4, STATUS_BAR_HEIGHT - 4))
-        
-        score_text = self.ui_font.render(f"SCORE: {self.score}", True, COLOR_UI_TEXT)
-        self.screen.blit(score_text, (20, 20))
-        
-        food_text = self.ui_font.render(f"FOOD: {len(self.food)}", True, COLOR_UI_TEXT)
-        food_rect = food_text.get_rect(right=SCREEN_WIDTH - 20, top=20)
-        self.screen.blit(food_text, food_rect)
+        pygame.draw.rect(surface, COLOR_UI_BORDER, (0, 0, SCREEN_WIDTH, STATUS_BAR_HEIGHT))
+        pygame.draw.rect(surface, COLOR_BACKGROUND, (2, 2, SCREEN_WIDTH - 4, STATUS_BAR_HEIGHT - 4))
 
         # --- Draw Play Area ---
         play_area_rect = (0, PLAY_AREA_Y_OFFSET, SCREEN_WIDTH, SCREEN_HEIGHT - PLAY_AREA_Y_OFFSET)
-        pygame.draw.rect(self.screen, COLOR_GRID_BG, play_area_rect)
-        pygame.draw.rect(self.screen, COLOR_UI_BORDER, play_area_rect, 2)
+        pygame.draw.rect(surface, COLOR_GRID_BG, play_area_rect)
+        pygame.draw.rect(surface, COLOR_UI_BORDER, play_area_rect, 2)
+
+    def _draw_status(self):
+        """
+        Draws the score and food count in the status bar.
+        """
+        if self.render_mode == 'dirty':
+            self.renderer.restore((2, 2, SCREEN_WIDTH - 4, STATUS_BAR_HEIGHT - 4))
 
-        # Draw snake
-        for i, segment in enumerate(self.snake):
-            color = COLOR_SNAKE_HEAD if i == 0 else COLOR_SNAKE_BODY
-            self._draw_pixel_block(segment, color, COLOR_SNAKE_OUTLINE)
+        score_label = text_cache.render(self.ui_font, "SCORE: ", COLOR_UI_TEXT)
+        self.ui_digits.blit_label(self.screen, score_label, str(self.score), (20, 20))
 
-        # Draw food
-        for item in self.food:
-            self._draw_pixel_block(item, COLOR_FOOD, COLOR_FOOD_OUTLINE)
+        food_label = text_cache.render(self.ui_font, "FOOD: ", COLOR_UI_TEXT)
+        food_count = str(len(self.food))
+        food_rect = pygame.Rect((0, 0), self.ui_digits.label_size(food_label, food_count))
+        food_rect.topright = (SCREEN_WIDTH - 20, 20)
+        self.ui_digits.blit_label(self.screen, food_label, food_count, food_rect.topleft)
+        self._drawn_status = (self.score, len(self.food))
+
+    def _draw_elements(self, alpha=1.0):
+        """
+        Renders all game elements with a retro style.
+        alpha (progress towards the next tick) is unused: the snake moves in whole cells.
+        """
+        if self.render_mode == 'dirty':
+            self._draw_dirty()
+            return
+
+        self._draw_frame()
+        self.loop.profiler.draw_overlay(self.screen)
+        if self.capture is not None:
+            self.capture.capture(self.screen)
+        self.loop.profiler.mark('draw')
+        if not self.headless:
+            pygame.display.flip()
+
+    def _draw_frame(self):
+        """
+        Draws the complete frame without presenting it.
+        """
+        self._draw_background(self.screen)
+        self._draw_status()
+
+        if self.world is not None:
+            self._draw_world()
+        else:
+            self._draw_board()
 
         if self.game_over:
             self._draw_game_over()
         elif self.paused:
             self._draw_paused_message()
+        self._drawn_overlay = (self.game_over, self.paused)
+
+    def _draw_board(self):
+        """
+        Draws the snake and food on the window-sized board.
+        """
+        # Draw snake body in one batch, then the head on top
+        body = self.sprites.placements('block', (COLOR_SNAKE_BODY, COLOR_SNAKE_OUTLINE), GRID_SIZE,
+                                       (0, PLAY_AREA_Y_OFFSET))
+        self.screen.blits(map(body.__getitem__, self.snake), doreturn=False)
+        self._draw_pixel_block(self.snake.head, COLOR_SNAKE_HEAD, COLOR_SNAKE_OUTLINE)
+
+        # Draw food
+        food = self.sprites.placements('block', (COLOR_FOOD, COLOR_FOOD_OUTLINE), GRID_SIZE,
+                                       (0, PLAY_AREA_Y_OFFSET))
+        self.screen.blits(map(food.__getitem__, self.food), doreturn=False)
+
+    def _draw_world(self):
+        """
+        Draws the part of the large world around the head: cached floor chunks,
+        then the segments and food the bucket indexes find in view.
+        """
+        self.world.follow(self.snake.head)
+        self.world.draw(self.screen, (0, PLAY_AREA_Y_OFFSET), self.snake.head,
+                        self.sprites.get('block', (COLOR_SNAKE_BODY, COLOR_SNAKE_OUTLINE)),
+                        self.sprites.get('block', (COLOR_SNAKE_HEAD, COLOR_SNAKE_OUTLINE)),
+                        self.sprites.get('block', (COLOR_FOOD, COLOR_FOOD_OUTLINE)))
+
+    def _draw_dirty(self):
+        """
+        Redraws only what changed since the last frame and updates just those rects.
+        Overlay messages are rare, so showing or hiding one falls back to a full redraw,
+        as does every frame while the profiler overlay is shown.
+        """
+        profiler = self.loop.profiler
+        if self._full_redraw or profiler.visible or self._drawn_overlay != (self.game_over, self.paused):
+            self._draw_frame()
+            self.renderer.mark_all()
+            self._full_redraw = False
+        else:
+            for cell in self._dirty_cells:
+                self.renderer.restore((cell[0] * GRID_SIZE, cell[1] * GRID_SIZE + PLAY_AREA_Y_OFFSET,
+                                       GRID_SIZE, GRID_SIZE))
+                self._draw_cell(cell)
+            if self._drawn_status != (self.score, len(self.food)):
+                self._draw_status()
 
-        pygame.display.flip()
+        self._dirty_cells.clear()
+        profiler.draw_overlay(self.screen)
+        if self.capture is not None:
+            self.capture.capture(self.screen)
+        profiler.mark('draw')
+        self.renderer.present()
 
     def _draw_message(self, text, font, color, y_offset=0):
         """ Helper to draw centered messages. """
-        message_surf = font.render(text, True, color)
+        message_surf = text_cache.render(font, text, color)
         message_rect = message_surf.get_rect(center=(SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2 + y_offset))
         self.screen.blit(message_surf, message_rect)
 
@@ -219,6 +559,19 @@ class SnakeGame:
         self._draw_message("Press 'R' to Restart", self.ui_font, COLOR_UI_TEXT, y_offset=30)
 
 
+class SnakeWorldGame(SnakeGame):
+    """
+    The retro snake on a WORLD_WIDTH x WORLD_HEIGHT world, seen through a
+    window-sized camera that follows the head.
+    """
+    REPLAY_KIND = 'snake_world'
+
+    def __init__(self, seed=None, record_path=None, autopilot=False, headless=False):
+        super().__init__(seed=seed, record_path=record_path, autopilot=autopilot,
+                         world_size=(WORLD_WIDTH, WORLD_HEIGHT), headless=headless)
+
+
 if __name__ == '__main__':
-    game = SnakeGame()
+    # --world plays on a large world instead of the window-sized board
+    game = SnakeWorldGame() if '--world' in sys.argv[1:] else SnakeGame()
     game.run()
@@ -0,0 +1,280 @@
+"""
+Benchmark suite for tick and frame cost across all games.
+
+Drives the classic SnakeGame, the retro SnakeGame and PongGame under SDL's
+dummy video driver with scripted inputs and no frame cap, at increasing snake
+lengths and ball speeds. Reports ticks/s, frames/s, p50/p99 frame time and
+transient allocation per frame, and writes the results to a JSON file so runs
+from different versions can be compared.
+
+Usage:
+    python archive/benchmark.py [--frames N] [--output FILE] [--compare OLD_FILE]
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+os.environ['GAME_SCORES'] = ''   # Scripted sessions stay off the high-score table
+
+import pygame
+
+import backup_pong_game
+import backup_snake_game
+import backup_snake_game_with_pixels
+from free_cells import FreeCellIndex
+from snake_autopilot import hamiltonian_cycle
+from snake_body import SnakeBody
+
+# --- Constants ---
+DEFAULT_FRAMES = 1000
+ALLOC_FRAMES = 200
+DEFAULT_OUTPUT = 'benchmark_results.json'
+
+CLASSIC_LENGTHS = (1, 50, 200, 450)
+RETRO_LENGTHS = (3, 100, 400, 850)
+PONG_SPEEDS = (5, 20, 60, 200)
+RENDER_MODES = ('full', 'dirty')
+
+RETRO_DIRECTIONS = {(0, -1): 'UP', (0, 1): 'DOWN', (-1, 0): 'LEFT', (1, 0): 'RIGHT'}
+
+
+class SnakeDriver:
+    """
+    Plays a snake game along a Hamiltonian cycle so it never dies, starting
+    from a snake of a given length.
+    """
+    def __init__(self, game, width, height):
+        self.game = game
+        self.cycle = hamiltonian_cycle(width, height)
+        self.index = {cell: i for i, cell in enumerate(self.cycle)}
+        self.width = width
+        self.height = height
+
+    def setup(self, length):
+        head = length - 1
+        segments = [self.cycle[head - i] for i in range(length)]
+        self.place(SnakeBody(segments))
+
+    def next_direction(self):
+        head = self.game.snake.head
+        x, y = self.cycle[(self.index[head] + 1) % len(self.cycle)]
+        return x - head[0], y - head[1]
+
+
+class ClassicSnakeDriver(SnakeDriver):
+    def __init__(self, render_mode):
+        super().__init__(backup_snake_game.SnakeGame(render_mode=render_mode),
+                         backup_snake_game.GRID_WIDTH, backup_snake_game.GRID_HEIGHT)
+
+    def place(self, snake):
+        game = self.game
+        game.reset_game()
+        game.snake = snake
+        game.free_cells = FreeCellIndex(self.width, self.height, snake)
+        game.foods = []
+        for _ in range(3):
+            game.spawn_food()
+        game.direction = game.next_direction = self.next_direction()
+        game.full_redraw = True
+
+    def tick(self):
+        self.game.next_direction = self.next_direction()
+        self.game.update()
+        if self.game.game_over:
+            self.setup(len(self.game.snake))
+
+    def render(self):
+        self.game.render()
+
+
+class RetroSnakeDriver(SnakeDriver):
+    def __init__(self, render_mode):
+        super().__init__(backup_snake_game_with_pixels.SnakeGame(render_mode=render_mode),
+                         backup_snake_game_with_pixels.GRID_WIDTH, backup_snake_game_with_pixels.GRID_HEIGHT)
+
+    def place(self, snake):
+        game = self.game
+        game._reset_game_state()
+        game.snake = snake
+        game.free_cells = FreeCellIndex(self.width, self.height, snake)
+        game.food = []
+        game._spawn_food(3)
+        game.direction = game.new_direction = RETRO_DIRECTIONS[self.next_direction()]
+        game._full_redraw = True
+
+    def tick(self):
+        self.game.new_direction = RETRO_DIRECTIONS[self.next_direction()]
+        self.game._tick()
+        if self.game.game_over:
+            self.setup(len(self.game.snake))
+
+    def render(self):
+        self.game._draw_elements()
+
+
+class PongDriver:
+    """
+    Plays Pong with both paddles tracking the ball, holding the ball at a fixed speed.
+    """
+    def __init__(self):
+        self.game = backup_pong_game.PongGame()
+
+    def setup(self, speed):
+        self.speed = speed
+        self.game.reset_game()
+        self.keep_speed()
+
+    def keep_speed(self):
+        core = self.game.core
+        core.ball_speed_x = self.speed if core.ball_speed_x > 0 else -self.speed
+        core.ball_speed_y = self.speed * 0.7 if core.ball_speed_y > 0 else -self.speed * 0.7
+
+    def tick(self):
+        game, core = self.game, self.game.core
+        target = core.ball_y + backup_pong_game.BALL_SIZE / 2 - backup_pong_game.PADDLE_HEIGHT / 2
+        game.left_move = (target > core.left_y) - (target < core.left_y)
+        game.right_move = (target > core.right_y) - (target < core.right_y)
+        game.update()
+        if core.game_over:
+            game.reset_game()
+        self.keep_speed()
+
+    def render(self):
+        self.game.render()
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def measure(driver, param, frames):
+    """
+    Time ticks alone, then full frames (events, tick, render), then measure
+    allocations per frame with tracemalloc in a separate, shorter pass.
+    """
+    driver.setup(param)
+    start = time.perf_counter()
+    for _ in range(frames):
+        driver.tick()
+    ticks_per_s = frames / (time.perf_counter() - start)
+
+    driver.setup(param)
+    frame_times = []
+    collections_before = sum(stat['collections'] for stat in gc.get_stats())
+    start = time.perf_counter()
+    for _ in range(frames):
+        frame_start = time.perf_counter()
+        pygame.event.pump()
+        driver.tick()
+        driver.render()
+        frame_times.append(time.perf_counter() - frame_start)
+    frames_per_s = frames / (time.perf_counter() - start)
+    collections = sum(stat['collections'] for stat in gc.get_stats()) - collections_before
+
+    driver.setup(param)
+    allocations = []
+    tracemalloc.start()
+    for _ in range(min(frames, ALLOC_FRAMES)):
+        tracemalloc.reset_peak()
+        current = tracemalloc.get_traced_memory()[0]
+        pygame.event.pump()
+        driver.tick()
+        driver.render()
+        allocations.append(tracemalloc.get_traced_memory()[1] - current)
+    tracemalloc.stop()
+
+    frame_times.sort()
+    allocations.sort()
+    return {
+        'ticks_per_s': round(ticks_per_s, 1),
+        'frames_per_s': round(frames_per_s, 1),
+        'frame_ms_p50': round(percentile(frame_times, 0.50) * 1000, 4),
+        'frame_ms_p99': round(percentile(frame_times, 0.99) * 1000, 4),
+        'alloc_bytes_per_frame_p50': percentile(allocations, 0.50),
+        'gc_collections': collections,
+    }
+
+
+def scenarios():
+    """Yield (game, mode, parameter name, parameter value, driver)."""
+    for mode in RENDER_MODES:
+        driver = ClassicSnakeDriver(mode)
+        for length in CLASSIC_LENGTHS:
+            yield 'snake_classic', mode, 'snake_length', length, driver
+    for mode in RENDER_MODES:
+        driver = RetroSnakeDriver(mode)
+        for length in RETRO_LENGTHS:
+            yield 'snake_retro', mode, 'snake_length', length, driver
+    driver = PongDriver()
+    for speed in PONG_SPEEDS:
+        yield 'pong', 'full', 'ball_speed', speed, driver
+
+
+def result_key(result):
+    return result['game'], result['mode'], result['param'], result['value']
+
+
+def run(frames):
+    results = []
+    for game, mode, param, value, driver in scenarios():
+        result = {'game': game, 'mode': mode, 'param': param, 'value': value}
+        result.update(measure(driver, value, frames))
+        results.append(result)
+        print(f"{game:14} {mode:6} {param}={value:<5} "
+              f"{result['ticks_per_s']:>10.0f} ticks/s {result['frames_per_s']:>8.0f} frames/s "
+              f"p50 {result['frame_ms_p50']:.3f} ms p99 {result['frame_ms_p99']:.3f} ms "
+              f"alloc {result['alloc_bytes_per_frame_p50']} B/frame")
+    return results
+
+
+def compare(results, baseline_path):
+    """Print frame-rate ratios against an earlier results file."""
+    with open(baseline_path) as f:
+        baseline = {result_key(r): r for r in json.load(f)['results']}
+    print(f"\nCompared with {baseline_path} (new/old frames/s):")
+    for result in results:
+        old = baseline.get(result_key(result))
+        if old:
+            ratio = result['frames_per_s'] / old['frames_per_s']
+            print(f"  {result['game']:14} {result['mode']:6} {result['param']}={result['value']:<5} {ratio:6.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--frames', type=int, default=DEFAULT_FRAMES, help='frames per scenario')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='where to write the JSON results')
+    parser.add_argument('--compare', help='earlier results file to compare against')
+    args = parser.parse_args()
+
+    results = run(args.frames)
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'platform': platform.platform(),
+            'frames': args.frames,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {len(results)} results to {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
+    sys.exit(0)
@@ -0,0 +1,41 @@
+"""
+Dirty-rectangle presenter for incremental rendering.
+"""
+
+import pygame
+
+
+class DirtyRectRenderer:
+    """
+    Keeps a persistent background surface and collects the screen areas that
+    changed this frame, so present() only pushes those to the display.
+    """
+    def __init__(self, screen, background):
+        self.screen = screen
+        self.background = background
+        self.dirty = []
+
+    def restore(self, rect):
+        """Paint the background back over rect and mark it dirty."""
+        rect = pygame.Rect(rect)
+        self.screen.blit(self.background, rect, rect)
+        self.dirty.append(rect)
+        return rect
+
+    def mark(self, rect):
+        """Mark an area that was drawn directly as dirty."""
+        self.dirty.append(pygame.Rect(rect))
+
+    def mark_all(self):
+        """Mark the whole screen dirty, e.g. after a full redraw."""
+        self.dirty.append(self.screen.get_rect())
+
+    def present(self):
+        """
+        Push the dirty areas to the display and start a new frame. An
+        off-screen (headless) screen has nothing to push.
+        """
+        if self.dirty:
+            if self.screen is pygame.display.get_surface():
+                pygame.display.update(self.dirty)
+            self.dirty = []
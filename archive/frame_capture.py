@@ -0,0 +1,333 @@
+"""
+Asynchronous screenshot and video capture for the games.
+
+Saving a frame with pygame.image.save inside the render loop costs more
+than drawing it. FrameCapture instead copies the screen's raw pixel bytes
+into one of a few preallocated slots (a single memory copy) and hands the
+slot to a background thread, which converts it to RGB and writes it out.
+When every slot is still waiting to be written the frame is dropped rather
+than making the game wait, so capture never holds up display.flip().
+
+Frames go to a sink: PngSink writes numbered PNG files, PipeSink streams raw
+RGB to an encoder process such as ffmpeg (see ffmpeg_command). Both encode
+with zlib or in the other process, which run without holding the GIL.
+
+The games capture when GAME_CAPTURE is set, to a directory of PNGs or to a
+video file:
+    GAME_CAPTURE=frames/ python archive/backup_snake_game.py
+    GAME_CAPTURE=session.mp4 python archive/backup_pong_game.py
+Check that captured frames match the screen and that capture never blocks:
+    python archive/frame_capture.py
+"""
+
+import os
+import queue
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zlib
+
+import numpy as np
+import pygame
+
+# --- Constants ---
+CAPTURE_ENV_VAR = 'GAME_CAPTURE'
+CAPTURE_FPS = 30                 # Frames captured per second of play; 0 captures every frame
+CAPTURE_SLOTS = 8                # Frames that can wait to be written before new ones are dropped
+PNG_COMPRESSION = 1              # zlib level: fast, still several times smaller than raw
+VIDEO_EXTENSIONS = ('.mp4', '.mkv', '.webm', '.mov', '.avi', '.gif')
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+def _png_chunk(kind, data):
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+
+class PngSink:
+    """
+    Writes each frame to directory/frame_NNNNNN.png, numbered by the frame it
+    was captured on (dropped frames leave gaps in the numbering).
+    """
+    def __init__(self, directory, name='frame_{:06d}.png'):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.name = name
+        self._scanlines = None
+
+    def write(self, rgb, number):
+        height, width = rgb.shape[:2]
+        if self._scanlines is None or self._scanlines.shape != (height, 1 + 3 * width):
+            self._scanlines = np.zeros((height, 1 + 3 * width), dtype=np.uint8)   # Filter byte 0 per row
+        self._scanlines[:, 1:] = rgb.reshape(height, 3 * width)
+        header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)   # 8-bit RGB
+        with open(os.path.join(self.directory, self.name.format(number)), 'wb') as f:
+            f.write(PNG_SIGNATURE)
+            f.write(_png_chunk(b'IHDR', header))
+            f.write(_png_chunk(b'IDAT', zlib.compress(self._scanlines, PNG_COMPRESSION)))
+            f.write(_png_chunk(b'IEND', b''))
+
+    def close(self):
+        pass
+
+
+class PipeSink:
+    """
+    Streams frames as raw RGB24 to the standard input of command, such as
+    an ffmpeg_command() encoding them to video.
+    """
+    def __init__(self, command):
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE)
+
+    def write(self, rgb, number):
+        self.process.stdin.write(rgb)
+
+    def close(self):
+        self.process.stdin.close()
+        self.process.wait()
+
+
+def ffmpeg_command(path, size, fps):
+    """ffmpeg arguments that encode raw RGB frames of size from stdin into path."""
+    width, height = size
+    return ['ffmpeg', '-loglevel', 'error', '-y',
+            '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', f'{width}x{height}', '-r', str(fps), '-i', '-',
+            '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-pix_fmt', 'yuv420p', path]
+
+
+class FrameCapture:
+    """
+    Copies frames of a screen of the given size to a sink on a background thread.
+
+    Call capture(screen) once per frame, before flipping. At most one frame
+    per 1/fps seconds is taken (every frame when fps is 0), and a frame is
+    dropped when all slots are still queued for the writer. Screens that
+    aren't 32-bit are converted to RGB on the game thread, which is slower
+    but still leaves the writing to the background.
+    """
+    def __init__(self, size, sink, fps=CAPTURE_FPS, slots=CAPTURE_SLOTS):
+        self.size = size
+        self.sink = sink
+        self.interval = 1.0 / fps if fps else 0.0
+        self.frame = 0
+        self.captured = 0
+        self.dropped = 0
+        self.error = None
+        self._next_capture = 0.0
+        self._layout = None
+        self._slots = []
+        self._free = queue.Queue(maxsize=slots)
+        self._ready = queue.Queue(maxsize=slots + 1)   # One more for the stop marker
+        for slot in range(slots):
+            self._free.put(slot)
+        self._thread = threading.Thread(target=self._write_frames, name='frame-capture', daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_env(cls, size, fps=CAPTURE_FPS):
+        """A capture to $GAME_CAPTURE (a video file or a PNG directory), or None when it isn't set."""
+        path = os.environ.get(CAPTURE_ENV_VAR)
+        if not path:
+            return None
+        if path.lower().endswith(VIDEO_EXTENSIONS):
+            if shutil.which('ffmpeg') is None:
+                print(f"Frame capture: ffmpeg is needed to write {path}; not capturing.")
+                return None
+            return cls(size, PipeSink(ffmpeg_command(path, size, fps)), fps)
+        return cls(size, PngSink(path), fps)
+
+    def capture(self, surface):
+        """Queue the surface's current pixels to be written; returns False if skipped or dropped."""
+        self.frame += 1
+        if self.interval:
+            now = time.perf_counter()
+            if now < self._next_capture:
+                return False
+            self._next_capture = max(self._next_capture + self.interval, now)
+        if self._layout is None:
+            if surface.get_bytesize() == 4:
+                self._layout = (4, surface.get_pitch(), surface.get_shifts()[:3])
+            else:
+                self._layout = (3, 3 * self.size[0], None)   # Slots hold RGB already
+        try:
+            slot = self._free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            return False
+
+        while len(self._slots) <= slot:
+            self._slots.append(np.empty(self._layout[1] * self.size[1], dtype=np.uint8))
+
+        if self._layout[2] is None:
+            np.copyto(self._slots[slot], np.frombuffer(pygame.image.tobytes(surface, 'RGB'), dtype=np.uint8))
+        else:
+            pixels = surface.get_buffer()
+            np.copyto(self._slots[slot], np.frombuffer(pixels, dtype=np.uint8))
+            del pixels   # Unlocks the surface before it is flipped
+        self._ready.put_nowait((slot, self.frame))
+        self.captured += 1
+        return True
+
+    def _write_frames(self):
+        """Background thread: convert queued frames to RGB and pass them to the sink."""
+        width, height = self.size
+        rgb = np.empty((height, width, 3), dtype=np.uint8)
+        while True:
+            item = self._ready.get()
+            if item is None:
+                break
+            slot, number = item
+            try:
+                if self.error is None:
+                    _, pitch, shifts = self._layout
+                    if shifts is None:
+                        self.sink.write(self._slots[slot].reshape(height, width, 3), number)
+                    else:
+                        pixels = self._slots[slot].reshape(height, pitch // 4, 4)[:, :width]
+                        for channel, shift in enumerate(shifts):
+                            byte = shift // 8 if sys.byteorder == 'little' else 3 - shift // 8
+                            rgb[:, :, channel] = pixels[:, :, byte]
+                        self.sink.write(rgb, number)
+            except Exception as error:
+                self.error = error
+                print(f"Frame capture stopped: {error}")
+            finally:
+                self._free.put(slot)
+        try:
+            self.sink.close()
+        except Exception as error:
+            print(f"Frame capture could not finish: {error}")
+
+    def close(self):
+        """Write the frames still queued and stop the writer thread."""
+        if self._thread.is_alive():
+            self._ready.put(None)
+            self._thread.join()
+
+
+# --- Checks ---
+
+class _SlowSink:
+    """Takes delay seconds per frame, like a disk that can't keep up."""
+    def __init__(self, delay):
+        self.delay = delay
+        self.numbers = []
+
+    def write(self, rgb, number):
+        time.sleep(self.delay)
+        self.numbers.append(number)
+
+    def close(self):
+        pass
+
+
+def _check_frames(surface, count):
+    """Draw count distinct frames on surface one by one, yielding each frame's RGB bytes."""
+    width, height = surface.get_size()
+    for i in range(count):
+        surface.fill((i * 40 % 256, 255 - i * 25 % 256, i * 90 % 256))
+        pygame.draw.rect(surface, (255, 255, 255), (i * 7 % width, i * 5 % height, 40, 30))
+        yield pygame.image.tobytes(surface, 'RGB')
+
+
+def run_capture_checks(size=(600, 400), frames=200):
+    """
+    Check PNG and pipe output against the screen, that a sink that can't keep
+    up makes capture drop frames instead of blocking, and compare the
+    per-frame cost with saving synchronously.
+    """
+    failures = []
+    pygame.display.init()
+    screen = pygame.display.set_mode(size)
+    directory = tempfile.mkdtemp(prefix='capture_check_')
+    try:
+        # PNG frames, captured from the display surface right before each flip
+        capture = FrameCapture(size, PngSink(directory), fps=0)
+        expected = []
+        for image in _check_frames(screen, 6):
+            expected.append(image)
+            capture.capture(screen)
+            pygame.display.flip()
+            time.sleep(0.05)
+        capture.close()
+        for number, image in enumerate(expected, 1):
+            saved = pygame.image.load(os.path.join(directory, f'frame_{number:06d}.png'))
+            if pygame.image.tobytes(saved, 'RGB') != image:
+                failures.append(f'PNG frame {number} differs from the screen')
+
+        # Screens that aren't 32-bit are converted instead of refused
+        for depth in (24, 16):
+            surface = pygame.Surface(size, depth=depth)
+            depth_directory = os.path.join(directory, f'depth{depth}')
+            capture = FrameCapture(size, PngSink(depth_directory), fps=0)
+            expected = []
+            for image in _check_frames(surface, 3):
+                expected.append(image)
+                capture.capture(surface)
+            capture.close()
+            for number, image in enumerate(expected, 1):
+                saved = pygame.image.load(os.path.join(depth_directory, f'frame_{number:06d}.png'))
+                if pygame.image.tobytes(saved, 'RGB') != image:
+                    failures.append(f'{depth}-bit frame {number} differs from the surface')
+
+        # Raw RGB through a pipe, from an off-screen surface
+        raw_path = os.path.join(directory, 'frames.rgb')
+        copy_stdin = f"import shutil, sys; shutil.copyfileobj(sys.stdin.buffer, open({raw_path!r}, 'wb'))"
+        surface = pygame.Surface(size)
+        capture = FrameCapture(size, PipeSink([sys.executable, '-c', copy_stdin]), fps=0)
+        expected = []
+        for image in _check_frames(surface, 6):
+            expected.append(image)
+            capture.capture(surface)
+            time.sleep(0.02)
+        capture.close()
+        with open(raw_path, 'rb') as f:
+            if f.read() != b''.join(expected):
+                failures.append('piped frames differ from the surface')
+
+        # A sink far slower than the game: frames are dropped, capture() stays cheap
+        sink = _SlowSink(0.05)
+        capture = FrameCapture(size, sink, fps=0, slots=4)
+        longest = 0.0
+        for _ in range(frames):
+            start = time.perf_counter()
+            capture.capture(screen)
+            longest = max(longest, time.perf_counter() - start)
+        capture.close()
+        print(f"slow sink: {capture.captured} captured, {capture.dropped} dropped, "
+              f"longest capture() {longest * 1000:.2f} ms")
+        if not capture.dropped or len(sink.numbers) != capture.captured:
+            failures.append('frames were not dropped when the sink fell behind')
+        if longest > 0.01:
+            failures.append(f'capture() blocked for {longest * 1000:.1f} ms')
+
+        # Cost on the game's thread, against saving each frame synchronously
+        capture = FrameCapture(size, PngSink(directory), fps=0)
+        start = time.perf_counter()
+        for _ in range(frames):
+            capture.capture(screen)
+            time.sleep(0.002)   # The rest of a frame, during which the writer gets to run
+        async_ms = (time.perf_counter() - start) / frames * 1000 - 2
+        capture.close()
+        start = time.perf_counter()
+        for i in range(frames // 10):
+            pygame.image.save(screen, os.path.join(directory, 'sync.png'))
+        sync_ms = (time.perf_counter() - start) / (frames // 10) * 1000
+        print(f"per frame on the game thread: {async_ms:.2f} ms with FrameCapture "
+              f"({capture.captured} written, {capture.dropped} dropped), {sync_ms:.2f} ms with image.save")
+    finally:
+        shutil.rmtree(directory)
+        pygame.quit()
+    return failures
+
+
+if __name__ == '__main__':
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    failures = run_capture_checks()
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print(f"{len(failures)} failures")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,200 @@
+"""
+Per-phase frame profiler for the game loops.
+
+Each frame is split into phases (event pump, logic, draw, flip, tick sleep)
+by calling mark() at the end of each one. The last PROFILE_FRAMES frames are
+kept in fixed-size ring buffers, summarized by an on-screen overlay (toggled
+with F3 in the games) and optionally streamed to a CSV or JSON lines file.
+
+Set the FRAME_PROFILE environment variable to a .csv or .jsonl path to export
+every frame, e.g. FRAME_PROFILE=frames.csv python archive/backup_pong_game.py
+The file is opened once per process, when the first frame is written, and
+shared by every profiler, so a process that builds several games (benchmark,
+validate_game) keeps the frames of all of them.
+"""
+
+import atexit
+import json
+import os
+import time
+from array import array
+
+import pygame
+
+from pygame_setup import LazyFont
+
+# --- Constants ---
+PHASES = ('events', 'logic', 'draw', 'flip', 'sleep')
+PROFILE_FRAMES = 240          # Frames kept in the ring buffers (a few seconds)
+OVERLAY_REFRESH_FRAMES = 15   # Re-render the overlay text this often, not every frame
+OVERLAY_FONT_SIZE = 18
+OVERLAY_MARGIN = 6
+OVERLAY_BG = (0, 0, 0, 170)
+OVERLAY_FG = (255, 255, 0)
+EXPORT_ENV_VAR = 'FRAME_PROFILE'
+
+
+class ProfileExport:
+    """A CSV or JSON lines file of frame timings; .csv writes CSV, anything else JSON lines."""
+    def __init__(self, path):
+        self.path = path
+        self.csv = path.endswith('.csv')
+        self._file = open(path, 'w')
+        if self.csv:
+            self._file.write('frame,' + ','.join(f"{phase}_ms" for phase in PHASES) + '\n')
+
+    def write_row(self, frame, times):
+        if self.csv:
+            self._file.write(f"{frame}," + ','.join(map(str, times)) + '\n')
+        else:
+            row = {'frame': frame}
+            row.update((f"{phase}_ms", t) for phase, t in zip(PHASES, times))
+            self._file.write(json.dumps(row) + '\n')
+
+    def flush(self):
+        if not self._file.closed:
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+_env_export = None   # The FRAME_PROFILE file, shared by every profiler in the process
+
+
+def _shared_export(path):
+    """The process-wide export for the FRAME_PROFILE path, opened on first use."""
+    global _env_export
+    if _env_export is None or _env_export.path != path:
+        if _env_export is not None:
+            _env_export.close()
+        _env_export = ProfileExport(path)
+        atexit.register(_env_export.close)
+    return _env_export
+
+
+class FrameProfiler:
+    """
+    Rolling per-phase frame timings.
+
+    The game loop calls begin_frame(), then mark(phase) as each phase ends,
+    then end_frame(). Time between two marks is charged to the later phase,
+    so the draw/flip split only needs one mark('draw') right before the flip.
+    """
+    def __init__(self, capacity=PROFILE_FRAMES, export_path=None):
+        self.capacity = capacity
+        self.samples = {phase: array('d', bytes(8 * capacity)) for phase in PHASES}
+        self.index = 0
+        self.count = 0
+        self.frames = 0
+        self.visible = False
+        self._current = dict.fromkeys(PHASES, 0.0)
+        self._last = time.perf_counter()
+        self._overlay = None
+        self._font = LazyFont(None, OVERLAY_FONT_SIZE)
+
+        self._export = None
+        self._owns_export = False
+        self._env_path = None
+        if export_path is None:
+            self._env_path = os.environ.get(EXPORT_ENV_VAR) or None
+        elif export_path:
+            self.open_export(export_path)
+
+    def begin_frame(self):
+        """Start timing a new frame."""
+        for phase in PHASES:
+            self._current[phase] = 0.0
+        self._last = time.perf_counter()
+
+    def mark(self, phase):
+        """Charge the time since the previous mark to phase."""
+        now = time.perf_counter()
+        self._current[phase] += now - self._last
+        self._last = now
+
+    def end_frame(self):
+        """Store the finished frame in the ring buffers and the export file."""
+        index = self.index
+        for phase in PHASES:
+            self.samples[phase][index] = self._current[phase]
+        self.index = (index + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        self.frames += 1
+        if self._export is None and self._env_path is not None:
+            self._export = _shared_export(self._env_path)
+        if self._export is not None:
+            self._export.write_row(self.frames, [round(self._current[phase] * 1000, 4) for phase in PHASES])
+
+    def toggle(self):
+        """Show or hide the overlay."""
+        self.visible = not self.visible
+        self._overlay = None
+
+    def summary(self):
+        """Return {phase: (mean_ms, max_ms)} over the frames in the buffers, plus 'frame'."""
+        result = {}
+        totals = [0.0] * self.count
+        for phase in PHASES:
+            values = self.samples[phase][:self.count]
+            for i, value in enumerate(values):
+                totals[i] += value
+            result[phase] = self._stats(values)
+        result['frame'] = self._stats(totals)
+        return result
+
+    @staticmethod
+    def _stats(values):
+        if not values:
+            return 0.0, 0.0
+        return sum(values) / len(values) * 1000, max(values) * 1000
+
+    # --- Overlay ---
+
+    def draw_overlay(self, surface):
+        """Blit the overlay onto the top-right corner of surface if it is shown."""
+        if not self.visible:
+            return None
+        if self._overlay is None or self.frames % OVERLAY_REFRESH_FRAMES == 0:
+            self._overlay = self._render_overlay()
+        rect = self._overlay.get_rect(topright=(surface.get_width() - OVERLAY_MARGIN, OVERLAY_MARGIN))
+        surface.blit(self._overlay, rect)
+        return rect
+
+    def _render_overlay(self):
+        summary = self.summary()
+        mean_frame = summary['frame'][0]
+        fps = 1000 / mean_frame if mean_frame else 0.0
+        lines = [f"{fps:6.1f} fps  avg / max ms"]
+        lines += [f"{phase:<6} {mean:6.2f} {peak:6.2f}" for phase, (mean, peak) in summary.items()]
+        rendered = [self._font.render(line, True, OVERLAY_FG) for line in lines]
+
+        line_height = self._font.get_linesize()
+        width = max(text.get_width() for text in rendered) + 2 * OVERLAY_MARGIN
+        height = line_height * len(rendered) + 2 * OVERLAY_MARGIN
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill(OVERLAY_BG)
+        for i, text in enumerate(rendered):
+            panel.blit(text, (OVERLAY_MARGIN, OVERLAY_MARGIN + i * line_height))
+        return panel
+
+    # --- Export ---
+
+    def open_export(self, path):
+        """Stream every following frame to path; .csv writes CSV, anything else JSON lines."""
+        self.close_export()
+        self._export = ProfileExport(path)
+        self._owns_export = True
+        self._env_path = None
+
+    def close_export(self):
+        """Close this profiler's own export; the shared FRAME_PROFILE file is only flushed."""
+        if self._export is None:
+            return
+        if self._owns_export:
+            self._export.close()
+        else:
+            self._export.flush()
+        self._export = None
+        self._owns_export = False
+        self._env_path = None
@@ -0,0 +1,133 @@
+"""
+Index of the free cells on a grid, for O(1) random spawning.
+"""
+
+from array import array
+
+
+class FreeCellIndex:
+    """
+    Keeps every unoccupied (x, y) cell of a width x height grid.
+
+    Cells live in a packed array with a position map, so adding, removing and
+    drawing a uniform random cell are all O(1) (removal swaps the last cell
+    into the hole). The starting order is all cells row by row, then each
+    occupied cell is removed in the order given.
+    """
+    def __init__(self, width, height, occupied=()):
+        self.width = width
+        self.height = height
+        size = width * height
+        self._cells = array('i', range(size))
+        self._pos = array('i', range(size))
+        self._count = size
+        for cell in occupied:
+            self.discard(cell)
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, cell):
+        """True for a free cell on the board; cells off the board are never free."""
+        x, y = cell
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return False
+        return self._pos[y * self.width + x] >= 0
+
+    @property
+    def is_full(self):
+        """True when no free cell is left on the board."""
+        return self._count == 0
+
+    def add(self, cell):
+        """Mark a cell as free again."""
+        x, y = cell
+        index = y * self.width + x
+        if self._pos[index] >= 0:
+            return
+        self._cells[self._count] = index
+        self._pos[index] = self._count
+        self._count += 1
+
+    def discard(self, cell):
+        """Mark a cell as occupied, if it was free."""
+        x, y = cell
+        index = y * self.width + x
+        slot = self._pos[index]
+        if slot < 0:
+            return
+        last = self._cells[self._count - 1]
+        self._cells[slot] = last
+        self._pos[last] = slot
+        self._pos[index] = -1
+        self._count -= 1
+
+    def pop_random(self, rng):
+        """
+        Take a uniformly random free cell and mark it occupied.
+        Returns None when the board is full.
+        """
+        if self._count == 0:
+            return None
+        index = self._cells[rng.randrange(self._count)]
+        cell = (index % self.width, index // self.width)
+        self.discard(cell)
+        return cell
+
+
+class SparseFreeCells:
+    """
+    The same interface for a large, mostly empty grid: only the occupied
+    cells are stored, so building and copying it costs nothing per cell.
+
+    pop_random draws random cells until it finds a free one, which takes
+    about one draw while most of the grid is free. After MAX_DRAWS misses it
+    falls back to picking from a scan of every free cell.
+    """
+    MAX_DRAWS = 64
+
+    def __init__(self, width, height, occupied=()):
+        self.width = width
+        self.height = height
+        self._occupied = set(occupied)
+
+    def __len__(self):
+        return self.width * self.height - len(self._occupied)
+
+    def __contains__(self, cell):
+        """True for a free cell on the board; cells off the board are never free."""
+        x, y = cell
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return False
+        return cell not in self._occupied
+
+    @property
+    def is_full(self):
+        """True when no free cell is left on the board."""
+        return len(self) == 0
+
+    def add(self, cell):
+        """Mark a cell as free again."""
+        self._occupied.discard(cell)
+
+    def discard(self, cell):
+        """Mark a cell as occupied, if it was free."""
+        self._occupied.add(cell)
+
+    def pop_random(self, rng):
+        """
+        Take a uniformly random free cell and mark it occupied.
+        Returns None when the board is full.
+        """
+        occupied = self._occupied
+        for _ in range(self.MAX_DRAWS):
+            cell = (rng.randrange(self.width), rng.randrange(self.height))
+            if cell not in occupied:
+                occupied.add(cell)
+                return cell
+        free = [(x, y) for y in range(self.height) for x in range(self.width) if (x, y) not in occupied]
+        if not free:
+            return None
+        cell = rng.choice(free)
+        occupied.add(cell)
+        return cell
@@ -0,0 +1,81 @@
+"""
+Fixed-timestep game loop shared by the games.
+
+Game logic advances in fixed ticks while frames are drawn as fast as the
+display rate allows, so a slow frame no longer slows the game down and input
+is read every frame rather than every tick.
+"""
+
+import time
+
+import pygame
+
+from frame_profiler import FrameProfiler
+
+# --- Constants ---
+RENDER_FPS = 144          # Frame cap; 0 renders as fast as possible
+MAX_CATCH_UP_TICKS = 5    # Most logic ticks run in one frame before time is dropped
+
+
+class FixedTimestepLoop:
+    """
+    Drives handle_input / update / render with a fixed-timestep accumulator.
+    """
+    def __init__(self, tick_rate, render_fps=RENDER_FPS, max_catch_up=MAX_CATCH_UP_TICKS, profiler=None):
+        self.tick_time = 1.0 / tick_rate
+        self.render_fps = render_fps
+        self.max_catch_up = max_catch_up
+        self.clock = pygame.time.Clock()
+        self.profiler = profiler if profiler is not None else FrameProfiler()
+        self.running = False
+        self.ticks = 0
+
+    def stop(self):
+        """Leave the loop after the current frame."""
+        self.running = False
+
+    def run(self, handle_input, update, render):
+        """
+        Run until handle_input returns False or stop() is called.
+
+        handle_input() is called once per frame, update() once per logic tick,
+        and render(alpha) once per frame, where alpha in [0, 1) is how far the
+        current moment lies between the last tick and the next one.
+
+        Each frame is timed by self.profiler: render() should call
+        profiler.mark('draw') right before it flips so the flip is timed apart.
+        """
+        profiler = self.profiler
+        self.running = True
+        accumulator = 0.0
+        previous = time.perf_counter()
+        try:
+            while self.running:
+                now = time.perf_counter()
+                accumulator += now - previous
+                previous = now
+                profiler.begin_frame()
+
+                if handle_input() is False:
+                    break
+                profiler.mark('events')
+
+                steps = 0
+                while accumulator >= self.tick_time and steps < self.max_catch_up:
+                    update()
+                    accumulator -= self.tick_time
+                    steps += 1
+                    self.ticks += 1
+
+                # Too far behind: drop the backlog instead of spiralling into ever longer catch-ups
+                if accumulator >= self.tick_time:
+                    accumulator %= self.tick_time
+                profiler.mark('logic')
+
+                render(accumulator / self.tick_time)
+                profiler.mark('flip')
+                self.clock.tick(self.render_fps)
+                profiler.mark('sleep')
+                profiler.end_frame()
+        finally:
+            profiler.close_export()
@@ -0,0 +1,455 @@
+"""
+Pluggable input for the games: every source of input (keyboard, gamepad,
+a script, a bot, a player on the network) pushes timestamped events into
+one InputQueue, and each logic tick drains the queue in time order.
+
+Polling the keyboard once per tick sees only the keys held at that moment,
+so a quick W-then-A (a U-turn within one tick) loses the first press, and
+the game only works with whatever device the polling code names. With the
+queue, every press is kept until the next tick (so input reaches the game
+within one tick), bots and remote players are just more sources, and the
+update step sees the same events in the same order however the frames fell.
+
+Snake games feed turns through a TurnBuffer, which releases one valid turn
+per tick, so fast turn sequences play out move by move.
+
+Run this file directly to check event order, turn buffering, held-key
+axes, and the gamepad and network sources.
+"""
+
+import socket
+import sys
+import threading
+import time
+from collections import deque, namedtuple
+from operator import attrgetter
+
+import pygame
+
+# --- Constants ---
+UP, DOWN, LEFT, RIGHT = 'UP', 'DOWN', 'LEFT', 'RIGHT'   # Turns; the names match the retro snake's directions
+RESTART = 'RESTART'
+PAUSE = 'PAUSE'
+MOVE = 'MOVE'     # A paddle axis; value is -1 (up), 0 or 1 (down)
+STEER = 'STEER'   # A bot's turn, which replaces any buffered turns; value is the turn
+ACTIONS = (UP, DOWN, LEFT, RIGHT, RESTART, PAUSE, MOVE, STEER)
+
+TURN_STEPS = {UP: (0, -1), DOWN: (0, 1), LEFT: (-1, 0), RIGHT: (1, 0)}
+STEP_TURNS = {step: turn for turn, step in TURN_STEPS.items()}
+OPPOSITE = {UP: DOWN, DOWN: UP, LEFT: RIGHT, RIGHT: LEFT}
+TURN_BUFFER_SIZE = 3             # Turns kept for the coming ticks; more presses than this are dropped
+
+GAMEPAD_DEAD_ZONE = 0.5          # Stick deflection that counts as a direction
+GAMEPAD_RESTART_BUTTON = 0       # A / Cross
+GAMEPAD_PAUSE_BUTTON = 7         # Start on most pads
+NETWORK_HOST = '127.0.0.1'
+
+# Key bindings: key -> (player, action, value)
+SNAKE_KEYS = {
+    pygame.K_w: (1, UP, None),
+    pygame.K_s: (1, DOWN, None),
+    pygame.K_a: (1, LEFT, None),
+    pygame.K_d: (1, RIGHT, None),
+    pygame.K_r: (1, RESTART, None),
+    pygame.K_p: (1, PAUSE, None),
+}
+PONG_KEYS = {
+    pygame.K_w: (1, MOVE, -1),
+    pygame.K_s: (1, MOVE, 1),
+    pygame.K_UP: (2, MOVE, -1),
+    pygame.K_DOWN: (2, MOVE, 1),
+    pygame.K_r: (1, RESTART, None),
+}
+
+InputEvent = namedtuple('InputEvent', 'time player action value')
+
+
+class InputQueue:
+    """
+    Collects InputEvents from sources until the next tick drains them.
+
+    poll(events) is called once per frame with that frame's pygame events;
+    drain() once per tick returns everything that arrived since the last
+    tick, oldest first. push() may be called from any thread.
+    """
+    def __init__(self, *sources):
+        self.sources = list(sources)
+        self._pending = deque()
+
+    def add(self, source):
+        self.sources.append(source)
+        return source
+
+    def push(self, player, action, value=None, time_stamp=None):
+        """Queue an event; it is stamped now unless time_stamp is given."""
+        if time_stamp is None:
+            time_stamp = time.perf_counter()
+        self._pending.append(InputEvent(time_stamp, player, action, value))
+
+    def poll(self, events):
+        """Let every source turn this frame's pygame events into input events."""
+        for source in self.sources:
+            source.poll(self, events)
+
+    def drain(self):
+        """This tick's events in time order (arrival order for equal times)."""
+        for source in self.sources:
+            source.on_tick(self)
+        pending = self._pending
+        if not pending:
+            return ()
+        events = []
+        while pending:
+            events.append(pending.popleft())
+        events.sort(key=attrgetter('time'))   # Sources on other threads may push slightly out of order
+        return events
+
+    def clear(self):
+        self._pending.clear()
+
+    def close(self):
+        for source in self.sources:
+            source.close()
+
+
+class InputSource:
+    """
+    A source of input events. poll() sees each frame's pygame events and
+    on_tick() runs at the start of each tick; either may push to the queue.
+    """
+    def poll(self, queue, events):
+        pass
+
+    def on_tick(self, queue):
+        pass
+
+    def close(self):
+        pass
+
+
+class KeyboardSource(InputSource):
+    """
+    Key presses, mapped by bindings (key -> (player, action, value)).
+
+    Most actions are pushed when their key goes down. MOVE keys are held:
+    the player's axis (the sum of the values of their held MOVE keys) is
+    pushed whenever it changes, so a paddle moves until the key comes up.
+    """
+    def __init__(self, bindings):
+        self.bindings = bindings
+        self._held = {}   # player -> MOVE keys held down
+
+    def poll(self, queue, events):
+        for event in events:
+            if event.type != pygame.KEYDOWN and event.type != pygame.KEYUP:
+                continue
+            binding = self.bindings.get(event.key)
+            if binding is None:
+                continue
+            player, action, value = binding
+            if action != MOVE:
+                if event.type == pygame.KEYDOWN:
+                    queue.push(player, action, value)
+                continue
+            held = self._held.setdefault(player, set())
+            axis = self._axis(held)
+            if event.type == pygame.KEYDOWN:
+                held.add(event.key)
+            else:
+                held.discard(event.key)
+            if self._axis(held) != axis:
+                queue.push(player, MOVE, self._axis(held))
+
+    def _axis(self, held):
+        return max(-1, min(1, sum(self.bindings[key][2] for key in held)))
+
+
+class GamepadSource(InputSource):
+    """
+    A game controller for player: the hat or left stick turns (and moves a
+    paddle up and down), button 0 restarts and button 7 pauses.
+
+    device is the joystick index to follow, or None for every controller.
+    Controllers are opened as they connect (SDL reports the ones already
+    plugged in at start-up), and the joystick subsystem is only started
+    when a GamepadSource is made.
+    """
+    def __init__(self, player=1, device=None):
+        self.player = player
+        self.device = device
+        self._joysticks = {}   # instance id -> Joystick, kept open so its events keep coming
+        self._stick = {}       # (instance id, axis) -> -1, 0 or 1
+        if not pygame.joystick.get_init():
+            pygame.joystick.init()
+
+    def poll(self, queue, events):
+        for event in events:
+            if event.type == pygame.JOYDEVICEADDED:
+                if self.device is None or event.device_index == self.device:
+                    joystick = pygame.joystick.Joystick(event.device_index)
+                    self._joysticks[joystick.get_instance_id()] = joystick
+            elif event.type == pygame.JOYDEVICEREMOVED:
+                self._joysticks.pop(event.instance_id, None)
+            elif event.type == pygame.JOYHATMOTION and self._follows(event):
+                x, y = event.value
+                if x or y:
+                    queue.push(self.player, (RIGHT if x > 0 else LEFT) if x else (UP if y > 0 else DOWN))
+                queue.push(self.player, MOVE, -y)
+            elif event.type == pygame.JOYAXISMOTION and event.axis < 2 and self._follows(event):
+                key = (event.instance_id, event.axis)
+                direction = (event.value > GAMEPAD_DEAD_ZONE) - (event.value < -GAMEPAD_DEAD_ZONE)
+                if direction == self._stick.get(key, 0):
+                    continue
+                self._stick[key] = direction
+                if event.axis == 0:
+                    if direction:
+                        queue.push(self.player, RIGHT if direction > 0 else LEFT)
+                else:
+                    if direction:
+                        queue.push(self.player, DOWN if direction > 0 else UP)
+                    queue.push(self.player, MOVE, direction)
+            elif event.type == pygame.JOYBUTTONDOWN and self._follows(event):
+                if event.button == GAMEPAD_RESTART_BUTTON:
+                    queue.push(self.player, RESTART)
+                elif event.button == GAMEPAD_PAUSE_BUTTON:
+                    queue.push(self.player, PAUSE)
+
+    def _follows(self, event):
+        return self.device is None or event.instance_id in self._joysticks
+
+    def close(self):
+        self._joysticks.clear()
+
+
+class ScriptedSource(InputSource):
+    """
+    Plays back a script of (tick, action, value) for player, counting ticks
+    from when it is added, e.g. for demos and attract modes.
+    """
+    def __init__(self, script, player=1):
+        self.player = player
+        self._script = deque(sorted(script, key=lambda step: step[0]))
+        self.tick = 0
+
+    def on_tick(self, queue):
+        script = self._script
+        while script and script[0][0] <= self.tick:
+            _, action, value = script.popleft()
+            queue.push(self.player, action, value)
+        self.tick += 1
+
+    @property
+    def finished(self):
+        return not self._script
+
+
+class AutopilotSource(InputSource):
+    """
+    A bot: decide() is asked once per tick and returns (action, value) for
+    player, or None to leave the controls alone.
+    """
+    def __init__(self, decide, player=1):
+        self.decide = decide
+        self.player = player
+
+    def on_tick(self, queue):
+        decision = self.decide()
+        if decision is not None:
+            queue.push(self.player, *decision)
+
+
+class NetworkSource(InputSource):
+    """
+    A remote player: listens on host:port (port 0 picks a free one) and
+    reads one command per line from whoever connects, e.g. "up", "restart"
+    or "move -1". Lines are read on a background thread and stamped as they
+    arrive, then handed to the queue on the next tick; unknown commands are
+    ignored.
+    """
+    def __init__(self, port, player=2, host=NETWORK_HOST):
+        self.player = player
+        self._received = deque()   # (time, action, value), appended by the reader thread
+        self._server = socket.create_server((host, port))
+        self.port = self._server.getsockname()[1]
+        self._thread = threading.Thread(target=self._serve, name='network-input', daemon=True)
+        self._thread.start()
+
+    def on_tick(self, queue):
+        received = self._received
+        while received:
+            time_stamp, action, value = received.popleft()
+            queue.push(self.player, action, value, time_stamp)
+
+    def _serve(self):
+        """Background thread: accept one player at a time and push their commands."""
+        while True:
+            try:
+                connection, _ = self._server.accept()
+            except OSError:
+                return   # Closed
+            with connection, connection.makefile('r', encoding='utf-8', errors='replace') as lines:
+                try:
+                    for line in lines:
+                        self._command(line.split())
+                except OSError:
+                    pass
+
+    def _command(self, words):
+        if not words:
+            return
+        action = words[0].upper()
+        if action not in ACTIONS or action == STEER:
+            return
+        value = None
+        if action == MOVE:
+            try:
+                value = max(-1, min(1, int(words[1])))
+            except (IndexError, ValueError):
+                return
+        self._received.append((time.perf_counter(), action, value))
+
+    def close(self):
+        self._server.close()
+
+
+class TurnBuffer:
+    """
+    Turns waiting for the snake to move. next_turn() hands out one turn per
+    tick, skipping turns that are no change or would reverse the snake, so
+    W then A pressed within one tick turns up and then left on the next two
+    ticks instead of losing the first press.
+    """
+    def __init__(self, size=TURN_BUFFER_SIZE):
+        self._turns = deque(maxlen=size)
+
+    def __len__(self):
+        return len(self._turns)
+
+    def push(self, turn):
+        if len(self._turns) < self._turns.maxlen:
+            self._turns.append(turn)
+
+    def next_turn(self, direction):
+        """The next turn the snake moving in direction can make, or None."""
+        turns = self._turns
+        while turns:
+            turn = turns.popleft()
+            if turn != direction and turn != OPPOSITE[direction]:
+                return turn
+        return None
+
+    def clear(self):
+        self._turns.clear()
+
+
+# --- Checks ---
+
+def _keys(*presses):
+    """KEYDOWN/KEYUP events from (key, down) pairs."""
+    return [pygame.event.Event(pygame.KEYDOWN if down else pygame.KEYUP, key=key) for key, down in presses]
+
+
+def _play_turns(queue, buffer, frames, direction=RIGHT):
+    """Run one tick after each frame's events; return the direction moved on each tick."""
+    moves = []
+    for events in frames:
+        queue.poll(events)
+        for event in queue.drain():
+            if event.action == STEER:
+                buffer.clear()
+                direction = event.value
+            elif event.action in TURN_STEPS:
+                buffer.push(event.action)
+        direction = buffer.next_turn(direction) or direction
+        moves.append(direction)
+    return moves
+
+
+def run_input_checks():
+    """
+    Check that fast turns within one tick all play out, that held keys give
+    the right paddle axis, that drains are ordered and complete, and that
+    the gamepad, scripted, autopilot and network sources push the events
+    they should.
+    """
+    failures = []
+
+    # A U-turn pressed within one tick: up, then left on the next tick
+    queue = InputQueue(KeyboardSource(SNAKE_KEYS))
+    moves = _play_turns(queue, TurnBuffer(), [_keys((pygame.K_w, True), (pygame.K_a, True)), [], []])
+    if moves != [UP, LEFT, LEFT]:
+        failures.append(f'W then A in one tick moved {moves}')
+    moves = _play_turns(queue, TurnBuffer(), [_keys((pygame.K_w, True), (pygame.K_s, True), (pygame.K_d, True)),
+                                              [], []])
+    if moves != [UP, RIGHT, RIGHT]:
+        failures.append(f'W, S, D in one tick moved {moves} (reversals should be skipped)')
+
+    # Held paddle keys: W, then S as well, then W released
+    queue = InputQueue(KeyboardSource(PONG_KEYS))
+    axes = []
+    for presses in (((pygame.K_w, True),), ((pygame.K_s, True),), ((pygame.K_w, False),), ((pygame.K_s, False),)):
+        queue.poll(_keys(*presses))
+        axes.extend((event.player, event.value) for event in queue.drain())
+    if axes != [(1, -1), (1, 0), (1, 1), (1, 0)]:
+        failures.append(f'held W/S gave axes {axes}')
+
+    # Everything pushed before a drain comes out of it, in time order, whichever thread pushed it
+    queue = InputQueue()
+    pushers = [threading.Thread(target=lambda p=p: [queue.push(p, MOVE, i % 3 - 1) for i in range(500)])
+               for p in (1, 2)]
+    for pusher in pushers:
+        pusher.start()
+    for pusher in pushers:
+        pusher.join()
+    queue.push(1, UP, time_stamp=0.0)
+    events = queue.drain()
+    if len(events) != 1001 or events[0].action != UP or any(a.time > b.time for a, b in zip(events, events[1:])):
+        failures.append('drain() lost events or returned them out of order')
+    if queue.drain():
+        failures.append('drain() returned events twice')
+
+    # Scripted turns and an autopilot that steers every tick
+    script = ScriptedSource([(2, DOWN, None), (0, UP, None), (0, LEFT, None)])
+    moves = _play_turns(InputQueue(script), TurnBuffer(), [[]] * 4)
+    if moves != [UP, LEFT, DOWN, DOWN] or not script.finished:
+        failures.append(f'the script moved {moves}')
+    steering = iter([(STEER, DOWN), None, (STEER, LEFT)])
+    moves = _play_turns(InputQueue(KeyboardSource(SNAKE_KEYS), AutopilotSource(lambda: next(steering))),
+                        TurnBuffer(), [_keys((pygame.K_w, True)), [], []])
+    if moves != [DOWN, DOWN, LEFT]:
+        failures.append(f'the autopilot moved {moves}')
+
+    # A gamepad, from the events SDL sends for one
+    pad = GamepadSource(player=1)
+    queue = InputQueue(pad)
+    queue.poll([pygame.event.Event(pygame.JOYHATMOTION, instance_id=0, hat=0, value=(0, 1)),
+                pygame.event.Event(pygame.JOYAXISMOTION, instance_id=0, axis=0, value=-0.9),
+                pygame.event.Event(pygame.JOYAXISMOTION, instance_id=0, axis=0, value=-0.95),
+                pygame.event.Event(pygame.JOYAXISMOTION, instance_id=0, axis=1, value=0.8),
+                pygame.event.Event(pygame.JOYBUTTONDOWN, instance_id=0, button=GAMEPAD_RESTART_BUTTON)])
+    actions = [(event.action, event.value) for event in queue.drain()]
+    expected = [(UP, None), (MOVE, -1), (LEFT, None), (DOWN, None), (MOVE, 1), (RESTART, None)]
+    if actions != expected:
+        failures.append(f'gamepad events gave {actions}, expected {expected}')
+
+    # A remote player sending commands over TCP
+    remote = NetworkSource(0, player=2)
+    queue = InputQueue(remote)
+    with socket.create_connection((NETWORK_HOST, remote.port)) as connection:
+        connection.sendall(b"move -1\nbogus\nsteer up\nmove 5\nrestart\n")
+        deadline = time.monotonic() + 2.0
+        while len(remote._received) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    actions = [(event.player, event.action, event.value) for event in queue.drain()]
+    queue.close()
+    if actions != [(2, MOVE, -1), (2, MOVE, 1), (2, RESTART, None)]:
+        failures.append(f'network commands gave {actions}')
+    return failures
+
+
+if __name__ == '__main__':
+    failures = run_input_checks()
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print(f"{len(failures)} failures")
+    sys.exit(1 if failures else 0)
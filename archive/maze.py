@@ -0,0 +1,278 @@
+"""
+Maze generation and goal distance fields for Maze Runner, sized for mazes
+far beyond the prompt's 20x20 grid.
+
+A maze is a (height, width) uint8 array with one bit per open side of each
+cell (NORTH, EAST, SOUTH, WEST). Mazes are carved with the sidewinder
+algorithm, which decides every row independently, so a whole maze is carved
+with a handful of NumPy operations. walls() turns a maze into the block
+layout of the prompt (1 for wall, 0 for path) for drawing.
+
+A distance field gives every cell's number of steps to a goal, for "which
+way?" hints and enemies that chase along the maze. Sidewinder mazes are
+trees, so instead of a cell-by-cell search the field comes from each cell's
+depth in the tree and where its path to the root meets the goal's; both are
+found by pointer jumping, in O(log n) array passes. Mazes that aren't known
+trees fall back to a breadth-first search over whole frontiers.
+
+Run this file directly to check the fields against breadth-first search and
+to time a 1000x1000 maze.
+"""
+
+import sys
+import time
+
+import numpy as np
+
+# --- Constants ---
+GRID_SIZE = 30      # Pixels per maze cell, as in the Maze Runner prompt
+GRID_WIDTH = 20
+GRID_HEIGHT = 20
+
+NORTH, EAST, SOUTH, WEST = 1, 2, 4, 8
+STEPS = ((NORTH, (0, -1)), (EAST, (1, 0)), (SOUTH, (0, 1)), (WEST, (-1, 0)))
+OPPOSITE = {NORTH: SOUTH, EAST: WEST, SOUTH: NORTH, WEST: EAST}
+UNREACHABLE = -1
+
+
+def sidewinder(width, height, rng):
+    """
+    Carve a perfect maze with the sidewinder algorithm. Returns (cells,
+    parent): the open-side bits and, for each flat cell index, the next cell
+    on its way to the top-left corner (which is its own parent).
+    """
+    cells = np.zeros((height, width), dtype=np.uint8)
+    index = np.arange(width * height)
+    parent = index - 1
+    parent[0] = 0
+
+    # The top row is one corridor
+    cells[0, :-1] |= EAST
+    cells[0, 1:] |= WEST
+
+    if height > 1:
+        # Every other row is cut into runs of cells joined east-west...
+        east = rng.random((height - 1, width)) < 0.5
+        east[:, -1] = False
+        cells[1:, :-1] |= (east[:, :-1] * EAST).astype(np.uint8)
+        cells[1:, 1:] |= (east[:, :-1] * WEST).astype(np.uint8)
+
+        # ...and each run opens north from one random cell. Runs never cross rows.
+        run_end = np.flatnonzero(~east.ravel())
+        run_start = np.concatenate(([0], run_end[:-1] + 1))
+        run_length = run_end - run_start + 1
+        opening = run_start + (rng.random(len(run_end)) * run_length).astype(np.int64)
+        cells[1:].reshape(-1)[opening] |= NORTH
+        cells[:-1].reshape(-1)[opening] |= SOUTH
+
+        # Within a run the way to the root leads to the opening, then up
+        below = index[width:]
+        run_opening = np.repeat(opening + width, run_length)
+        parent[width:] = np.where(below < run_opening, below + 1,
+                                  np.where(below > run_opening, below - 1, below - width))
+    return cells, parent
+
+
+def tree_depths(parent):
+    """Steps from every cell to the root, by pointer jumping."""
+    ancestor = parent
+    depth = (parent != np.arange(len(parent))).astype(np.int32)
+    while True:
+        next_ancestor = ancestor[ancestor]
+        if np.array_equal(next_ancestor, ancestor):
+            return depth
+        depth += depth[ancestor]
+        ancestor = next_ancestor
+
+
+def tree_distances(parent, depth, goal):
+    """
+    Steps from every cell to goal in a tree: depth(cell) + depth(goal) -
+    2 * depth(lowest common ancestor), where the common ancestor is the first
+    cell on the cell's way to the root that is also on the goal's.
+    """
+    on_goal_path = np.zeros(len(parent), dtype=bool)
+    cell = goal
+    while not on_goal_path[cell]:
+        on_goal_path[cell] = True
+        cell = parent[cell]
+
+    meet = np.where(on_goal_path, np.arange(len(parent)), parent)
+    while True:
+        next_meet = meet[meet]
+        if np.array_equal(next_meet, meet):
+            break
+        meet = next_meet
+    return depth + depth[goal] - 2 * depth[meet]
+
+
+def frontier_distances(cells, goal):
+    """Steps from every cell to goal by breadth-first search; UNREACHABLE where there is no path."""
+    width = cells.shape[1]
+    open_sides = cells.ravel()
+    distance = np.full(open_sides.size, UNREACHABLE, dtype=np.int32)
+    distance[goal] = 0
+    offsets = ((NORTH, -width), (EAST, 1), (SOUTH, width), (WEST, -1))
+    frontier = np.array([goal])
+    step = 0
+    while frontier.size:
+        step += 1
+        sides = open_sides[frontier]
+        reached = np.concatenate([frontier[(sides & side) != 0] + offset for side, offset in offsets])
+        frontier = np.unique(reached[distance[reached] == UNREACHABLE])
+        distance[frontier] = step
+    return distance
+
+
+class Maze:
+    """
+    A grid maze of open-side bits, with neighbor queries and distance fields.
+
+    parent is the tree structure from sidewinder(); without it (for a maze
+    loaded from elsewhere or with walls knocked out) distance fields are
+    found by breadth-first search instead.
+    """
+    def __init__(self, cells, parent=None):
+        self.cells = cells
+        self.height, self.width = cells.shape
+        self._parent = parent
+        self._depth = None
+
+    @classmethod
+    def generate(cls, width=GRID_WIDTH, height=GRID_HEIGHT, seed=None):
+        cells, parent = sidewinder(width, height, np.random.default_rng(seed))
+        return cls(cells, parent)
+
+    def open_sides(self, cell):
+        x, y = cell
+        return int(self.cells[y, x])
+
+    def can_move(self, cell, side):
+        """True when the wall on side (NORTH, EAST, SOUTH or WEST) of cell is open."""
+        return bool(self.open_sides(cell) & side)
+
+    def neighbors(self, cell):
+        """The cells reachable from cell in one step."""
+        x, y = cell
+        sides = int(self.cells[y, x])
+        return [(x + dx, y + dy) for side, (dx, dy) in STEPS if sides & side]
+
+    def open_wall(self, cell, side):
+        """
+        Knock down a wall (from both sides). The maze may no longer be a tree.
+        Raises ValueError for a wall on the outside of the grid.
+        """
+        x, y = cell
+        dx, dy = dict(STEPS)[side]
+        if not (0 <= x < self.width and 0 <= y < self.height
+                and 0 <= x + dx < self.width and 0 <= y + dy < self.height):
+            raise ValueError(f"no cell beyond side {side} of {cell} in a {self.width}x{self.height} maze")
+        self.cells[y, x] |= side
+        self.cells[y + dy, x + dx] |= OPPOSITE[side]
+        self._parent = None
+        self._depth = None
+
+    def distance_field(self, goal):
+        """(height, width) int32 array of steps from each cell to goal."""
+        goal_index = goal[1] * self.width + goal[0]
+        if self._parent is None:
+            distance = frontier_distances(self.cells, goal_index)
+        else:
+            if self._depth is None:
+                self._depth = tree_depths(self._parent)
+            distance = tree_distances(self._parent, self._depth, goal_index)
+        return distance.reshape(self.height, self.width)
+
+    def next_step(self, cell, field):
+        """The neighbor of cell one step closer to the field's goal, or None at the goal or off its map."""
+        x, y = cell
+        distance = field[y, x]
+        if distance <= 0:
+            return None
+        for neighbor in self.neighbors(cell):
+            if field[neighbor[1], neighbor[0]] == distance - 1:
+                return neighbor
+        return None
+
+    def walls(self):
+        """
+        The maze as a (2 * height + 1, 2 * width + 1) block grid, 1 for wall
+        and 0 for path. Cell (x, y) is block (2x + 1, 2y + 1).
+        """
+        blocks = np.ones((2 * self.height + 1, 2 * self.width + 1), dtype=np.uint8)
+        blocks[1::2, 1::2] = 0
+        blocks[1::2, 2:-1:2] = (self.cells[:, :-1] & EAST) == 0
+        blocks[2:-1:2, 1::2] = (self.cells[:-1, :] & SOUTH) == 0
+        return blocks
+
+
+# --- Checks ---
+
+def run_maze_checks(size=1000, budget_s=1.0):
+    """
+    Check that tree distance fields match breadth-first search, that mazes
+    are perfect (every cell reachable, no loops), and that a size x size maze
+    and its field take well under budget_s.
+    """
+    failures = []
+    rng = np.random.default_rng(0)
+    for width, height in ((1, 1), (7, 1), (1, 7), (20, 20), (157, 93)):
+        maze = Maze.generate(width, height, seed=int(rng.integers(1 << 31)))
+        open_sides = sum(bin(int(value)).count('1') for value in maze.cells.ravel())
+        if open_sides != 2 * (width * height - 1):
+            failures.append(f'{width}x{height}: {open_sides // 2} passages, expected {width * height - 1}')
+        for _ in range(5):
+            goal = (int(rng.integers(width)), int(rng.integers(height)))
+            field = maze.distance_field(goal)
+            expected = frontier_distances(maze.cells, goal[1] * width + goal[0]).reshape(height, width)
+            if not np.array_equal(field, expected):
+                failures.append(f'{width}x{height}: distance field to {goal} differs from search')
+                break
+            cell = (int(rng.integers(width)), int(rng.integers(height)))
+            while cell is not None and cell != goal:
+                cell = maze.next_step(cell, field)
+            if cell != goal:
+                failures.append(f'{width}x{height}: next_step does not lead to {goal}')
+
+    # A shortcut makes a loop, so distances come from the search
+    maze = Maze.generate(20, 20, seed=1)
+    x = int(np.flatnonzero((maze.cells[19] & NORTH) == 0)[0])
+    maze.open_wall((x, 19), NORTH)
+    if maze.distance_field((x, 19))[18, x] != 1 or (x, 19) not in maze.neighbors((x, 18)):
+        failures.append('open_wall does not make a shortcut')
+    for cell, side in (((x, 0), NORTH), ((0, 5), WEST), ((x, 19), SOUTH), ((19, 5), EAST), ((20, 5), NORTH)):
+        before = maze.cells.copy()
+        try:
+            maze.open_wall(cell, side)
+        except ValueError:
+            pass
+        else:
+            failures.append(f'open_wall opens side {side} of {cell} on the outside of the grid')
+        if not np.array_equal(maze.cells, before):
+            failures.append(f'open_wall on side {side} of {cell} changes the maze')
+
+    blocks = maze.walls()
+    if blocks[1::2, 1::2].any() or not blocks[0].all() or not blocks[:, -1].all():
+        failures.append('walls() has the wrong layout')
+    passages = int(np.count_nonzero(maze.cells & EAST)) + int(np.count_nonzero(maze.cells & SOUTH))
+    if int((blocks == 0).sum()) != 20 * 20 + passages:
+        failures.append('walls() does not open one block per passage')
+
+    start = time.perf_counter()
+    maze = Maze.generate(size, size, seed=2)
+    generated = time.perf_counter()
+    field = maze.distance_field((size - 1, size - 1))
+    done = time.perf_counter()
+    print(f"{size}x{size} maze: generated in {(generated - start) * 1000:.0f} ms, "
+          f"distance field in {(done - generated) * 1000:.0f} ms, longest path {int(field.max())} steps")
+    if done - start > budget_s:
+        failures.append(f'{size}x{size} maze and field took {done - start:.2f} s')
+    return failures
+
+
+if __name__ == '__main__':
+    failures = run_maze_checks()
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print(f"{len(failures)} failures")
+    sys.exit(1 if failures else 0)
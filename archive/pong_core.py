@@ -0,0 +1,324 @@
+"""
+Ping Pong - Headless Physics Core
+Ball, paddle and scoring rules without pygame or a display.
+
+PongCore runs one match from paddle actions; PongGame draws it. PongBatch
+runs thousands of matches at once with NumPy for evaluating paddle policies,
+following the same rules and arithmetic as PongCore.
+"""
+
+import numpy as np
+
+from pong_physics import MAX_BOUNCES, advance_ball
+
+# --- Constants ---
+# Window dimensions
+SCREEN_WIDTH = 800
+SCREEN_HEIGHT = 600
+
+# Paddle properties
+PADDLE_WIDTH = 15
+PADDLE_HEIGHT = 100
+PADDLE_SPEED = 7
+PADDLE_MARGIN = 30  # Gap between a paddle and its side of the screen
+LEFT_PADDLE_X = PADDLE_MARGIN
+RIGHT_PADDLE_X = SCREEN_WIDTH - PADDLE_MARGIN - PADDLE_WIDTH
+
+# Ball properties
+BALL_SIZE = 15
+BALL_SPEED_X = 5
+BALL_SPEED_Y = 5
+BALL_SPEEDUP = 1.0  # Ball speed multiplier on each paddle hit; 1.0 keeps the classic constant speed
+
+# Score
+WINNING_SCORE = 11
+
+# Paddle actions
+UP, STAY, DOWN = -1, 0, 1
+
+
+def move_paddle(y, action):
+    """
+    Move a paddle's top edge one step up (-1) or down (1), staying on screen.
+    """
+    if action < 0 and y > 0:
+        return y - PADDLE_SPEED
+    if action > 0 and y + PADDLE_HEIGHT < SCREEN_HEIGHT:
+        return y + PADDLE_SPEED
+    return y
+
+
+class PongCore:
+    """
+    The state and rules of one Pong match.
+    """
+    def __init__(self):
+        self.reset_game()
+
+    def reset_game(self):
+        """
+        Reset the match to its initial state.
+        """
+        self.player1_score = 0
+        self.player2_score = 0
+        self.game_over = False
+        self.winner = None
+        self.reset_ball()
+
+        self.left_y = (SCREEN_HEIGHT - PADDLE_HEIGHT) // 2
+        self.right_y = (SCREEN_HEIGHT - PADDLE_HEIGHT) // 2
+
+    def reset_ball(self, direction=1):
+        """
+        Reset the ball to the center.
+        """
+        self.ball_x = float(SCREEN_WIDTH // 2 - BALL_SIZE // 2)
+        self.ball_y = float(SCREEN_HEIGHT // 2 - BALL_SIZE // 2)
+        self.ball_speed_x = BALL_SPEED_X * direction
+        self.ball_speed_y = BALL_SPEED_Y
+
+    @property
+    def left_paddle(self):
+        return (LEFT_PADDLE_X, self.left_y, PADDLE_WIDTH, PADDLE_HEIGHT)
+
+    @property
+    def right_paddle(self):
+        return (RIGHT_PADDLE_X, self.right_y, PADDLE_WIDTH, PADDLE_HEIGHT)
+
+    def step(self, left_action, right_action):
+        """
+        Advance the match by one tick given each paddle's action (-1 up, 0 stay, 1 down).
+        Returns 1 or 2 when that player scored this tick, otherwise 0.
+        """
+        self.left_y = move_paddle(self.left_y, left_action)
+        self.right_y = move_paddle(self.right_y, right_action)
+
+        if self.game_over:
+            return 0
+
+        # Move the ball along its path, bouncing off walls and paddles at the exact
+        # time of impact so it can't tunnel through a paddle at high speed
+        self.ball_x, self.ball_y, self.ball_speed_x, self.ball_speed_y, _ = advance_ball(
+            self.ball_x, self.ball_y, self.ball_speed_x, self.ball_speed_y, BALL_SIZE,
+            (self.left_paddle, self.right_paddle), SCREEN_HEIGHT, BALL_SPEEDUP)
+
+        # Ball goes out of bounds
+        scorer = 0
+        if self.ball_x <= 0:
+            scorer = 2
+            self.player2_score += 1
+            if self.player2_score >= WINNING_SCORE:
+                self.game_over = True
+                self.winner = "Player 2"
+            else:
+                self.reset_ball(1) # Move towards player 1
+        if self.ball_x + BALL_SIZE >= SCREEN_WIDTH:
+            scorer = 1
+            self.player1_score += 1
+            if self.player1_score >= WINNING_SCORE:
+                self.game_over = True
+                self.winner = "Player 1"
+            else:
+                self.reset_ball(-1) # Move towards player 2
+        return scorer
+
+
+def _sweep_many(x, y, dx, dy, paddle_x, paddle_y):
+    """
+    Vectorized pong_physics.sweep of the ball against one paddle per match.
+    Returns (toi, normal_x, normal_y) with toi = inf where there is no contact.
+    """
+    size = BALL_SIZE
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_entry = np.where(dx > 0, (paddle_x - (x + size)) / dx,
+                           np.where(dx < 0, (paddle_x + PADDLE_WIDTH - x) / dx, -np.inf))
+        x_exit = np.where(dx > 0, (paddle_x + PADDLE_WIDTH - x) / dx,
+                          np.where(dx < 0, (paddle_x - (x + size)) / dx, np.inf))
+        y_entry = np.where(dy > 0, (paddle_y - (y + size)) / dy,
+                           np.where(dy < 0, (paddle_y + PADDLE_HEIGHT - y) / dy, -np.inf))
+        y_exit = np.where(dy > 0, (paddle_y + PADDLE_HEIGHT - y) / dy,
+                          np.where(dy < 0, (paddle_y - (y + size)) / dy, np.inf))
+
+    x_apart = (dx == 0) & ((x + size <= paddle_x) | (x >= paddle_x + PADDLE_WIDTH))
+    y_apart = (dy == 0) & ((y + size <= paddle_y) | (y >= paddle_y + PADDLE_HEIGHT))
+    entry = np.maximum(x_entry, y_entry)
+    exit_ = np.minimum(x_exit, y_exit)
+    hit = ~x_apart & ~y_apart & (entry < exit_) & (entry >= 0) & (entry <= 1)
+
+    x_axis = x_entry > y_entry
+    normal_x = np.where(x_axis, np.where(dx > 0, -1, 1), 0)
+    normal_y = np.where(x_axis, 0, np.where(dy > 0, -1, 1))
+    return np.where(hit, entry, np.inf), normal_x, normal_y
+
+
+class PongBatch:
+    """
+    Many independent Pong matches advanced together with NumPy arrays.
+    """
+    def __init__(self, num_matches):
+        self.num_matches = num_matches
+        self.ball_x = np.zeros(num_matches)
+        self.ball_y = np.zeros(num_matches)
+        self.ball_speed_x = np.zeros(num_matches)
+        self.ball_speed_y = np.zeros(num_matches)
+        self.left_y = np.zeros(num_matches, dtype=np.int64)
+        self.right_y = np.zeros(num_matches, dtype=np.int64)
+        self.player1_score = np.zeros(num_matches, dtype=np.int64)
+        self.player2_score = np.zeros(num_matches, dtype=np.int64)
+        self.done = np.zeros(num_matches, dtype=bool)
+        self.reset()
+
+    def reset(self, mask=None):
+        """
+        Reset the selected matches (all by default) and return the observation.
+        """
+        if mask is None:
+            mask = np.ones(self.num_matches, dtype=bool)
+        mask = np.asarray(mask, dtype=bool)
+        self.player1_score[mask] = 0
+        self.player2_score[mask] = 0
+        self.done[mask] = False
+        self._reset_ball(mask, 1)
+        self.left_y[mask] = (SCREEN_HEIGHT - PADDLE_HEIGHT) // 2
+        self.right_y[mask] = (SCREEN_HEIGHT - PADDLE_HEIGHT) // 2
+        return self.observe()
+
+    def _reset_ball(self, mask, direction):
+        self.ball_x[mask] = SCREEN_WIDTH // 2 - BALL_SIZE // 2
+        self.ball_y[mask] = SCREEN_HEIGHT // 2 - BALL_SIZE // 2
+        self.ball_speed_x[mask] = BALL_SPEED_X * direction
+        self.ball_speed_y[mask] = BALL_SPEED_Y
+
+    def observe(self):
+        """
+        State of every match as rows of
+        (ball_x, ball_y, ball_speed_x, ball_speed_y, left_y, right_y).
+        """
+        return np.stack([self.ball_x, self.ball_y, self.ball_speed_x, self.ball_speed_y,
+                         self.left_y, self.right_y], axis=1)
+
+    def _move_paddles(self, y, actions):
+        up = (actions < 0) & (y > 0)
+        down = (actions > 0) & (y + PADDLE_HEIGHT < SCREEN_HEIGHT)
+        y[up] -= PADDLE_SPEED
+        y[down] += PADDLE_SPEED
+
+    def _push_out(self, paddle_x, paddle_y, live):
+        """Vectorized pong_physics.push_out for balls that start inside a paddle."""
+        x, y, size = self.ball_x, self.ball_y, BALL_SIZE
+        inside = live & (x < paddle_x + PADDLE_WIDTH) & (paddle_x < x + size) & \
+            (y < paddle_y + PADDLE_HEIGHT) & (paddle_y < y + size)
+        if not inside.any():
+            return
+        pushes = np.stack([x + size - paddle_x, paddle_x + PADDLE_WIDTH - x,
+                           y + size - paddle_y, paddle_y + PADDLE_HEIGHT - y])
+        side = np.argmin(pushes, axis=0)  # First minimum wins, like the scalar version
+
+        left = inside & (side == 0)
+        right = inside & (side == 1)
+        up = inside & (side == 2)
+        down = inside & (side == 3)
+        x[left] = paddle_x - size
+        self.ball_speed_x[left] = -np.abs(self.ball_speed_x[left])
+        x[right] = paddle_x + PADDLE_WIDTH
+        self.ball_speed_x[right] = np.abs(self.ball_speed_x[right])
+        y[up] = (paddle_y - size)[up]
+        self.ball_speed_y[up] = -np.abs(self.ball_speed_y[up])
+        y[down] = (paddle_y + PADDLE_HEIGHT)[down]
+        self.ball_speed_y[down] = np.abs(self.ball_speed_y[down])
+
+    def _advance_balls(self, live):
+        """Vectorized pong_physics.advance_ball for every live match."""
+        self._push_out(LEFT_PADDLE_X, self.left_y, live)
+        self._push_out(RIGHT_PADDLE_X, self.right_y, live)
+
+        size = BALL_SIZE
+        paddles = ((LEFT_PADDLE_X, self.left_y), (RIGHT_PADDLE_X, self.right_y))
+        remaining = np.ones(self.num_matches)
+        for _ in range(MAX_BOUNCES):
+            if not live.any():
+                break
+            x, y = self.ball_x, self.ball_y
+            dx = self.ball_speed_x * remaining
+            dy = self.ball_speed_y * remaining
+
+            # Earliest contact: walls first, paddles can only be earlier
+            toi = np.ones(self.num_matches)
+            normal_x = np.zeros(self.num_matches, dtype=np.int64)
+            normal_y = np.zeros(self.num_matches, dtype=np.int64)
+            hit = np.full(self.num_matches, -1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                top = (dy < 0) & (y + dy < 0)
+                bottom = (dy > 0) & (y + size + dy > SCREEN_HEIGHT)
+                toi = np.where(top, -y / dy, np.where(bottom, (SCREEN_HEIGHT - size - y) / dy, toi))
+            normal_y[top] = 1
+            normal_y[bottom] = -1
+
+            for index, (paddle_x, paddle_y) in enumerate(paddles):
+                contact, contact_x, contact_y = _sweep_many(x, y, dx, dy, paddle_x, paddle_y)
+                earlier = contact < toi
+                toi = np.where(earlier, contact, toi)
+                normal_x = np.where(earlier, contact_x, normal_x)
+                normal_y = np.where(earlier, contact_y, normal_y)
+                hit[earlier] = index
+
+            x[live] += (dx * toi)[live]
+            y[live] += (dy * toi)[live]
+            touched = live & ((normal_x != 0) | (normal_y != 0))
+
+            # Snap exactly onto the contact surface
+            hit_x = np.where(hit == 0, LEFT_PADDLE_X, RIGHT_PADDLE_X)
+            hit_y = np.where(hit == 0, self.left_y, self.right_y)
+            on_paddle = hit >= 0
+            top_edge = np.where(on_paddle, hit_y, SCREEN_HEIGHT)    # Walls: the bottom wall's top...
+            bottom_edge = np.where(on_paddle, hit_y + PADDLE_HEIGHT, 0)   # ...and the top wall's bottom
+            snap = touched & (normal_x < 0)
+            x[snap] = (hit_x - size)[snap]
+            snap = touched & (normal_x > 0)
+            x[snap] = (hit_x + PADDLE_WIDTH)[snap]
+            snap = touched & (normal_x == 0) & (normal_y < 0)
+            y[snap] = (top_edge - size)[snap]
+            snap = touched & (normal_x == 0) & (normal_y > 0)
+            y[snap] = bottom_edge[snap]
+
+            # Reflect the velocity off the contact surface
+            flip = touched & (normal_x != 0)
+            self.ball_speed_x[flip] = (np.abs(self.ball_speed_x) * normal_x)[flip]
+            flip = touched & (normal_y != 0)
+            self.ball_speed_y[flip] = (np.abs(self.ball_speed_y) * normal_y)[flip]
+            sped_up = touched & on_paddle
+            self.ball_speed_x[sped_up] *= BALL_SPEEDUP
+            self.ball_speed_y[sped_up] *= BALL_SPEEDUP
+
+            remaining = np.where(touched, remaining * (1.0 - toi), remaining)
+            live = touched & (remaining > 0)
+
+    def step(self, left_actions, right_actions):
+        """
+        Advance every match by one tick.
+        Returns (obs, reward, done); reward is +1 where player 1 scored and
+        -1 where player 2 scored. Finished matches keep their final score.
+        """
+        self._move_paddles(self.left_y, np.asarray(left_actions))
+        self._move_paddles(self.right_y, np.asarray(right_actions))
+
+        live = ~self.done
+        self._advance_balls(live.copy())
+
+        # Ball goes out of bounds
+        reward = np.zeros(self.num_matches, dtype=np.int64)
+        scored = live & (self.ball_x <= 0)
+        self.player2_score[scored] += 1
+        reward[scored] = -1
+        won = scored & (self.player2_score >= WINNING_SCORE)
+        self.done |= won
+        self._reset_ball(scored & ~won, 1)
+
+        scored = live & (self.ball_x + BALL_SIZE >= SCREEN_WIDTH)
+        self.player1_score[scored] += 1
+        reward[scored] = 1
+        won = scored & (self.player1_score >= WINNING_SCORE)
+        self.done |= won
+        self._reset_ball(scored & ~won, -1)
+
+        return self.observe(), reward, self.done
@@ -0,0 +1,245 @@
+"""
+Continuous (swept) collision detection for the Pong ball.
+
+The ball is moved along its path for the whole tick and stopped at the exact
+time of impact with a wall or paddle, so it cannot tunnel through a paddle no
+matter how fast it goes. Boxes are (x, y, w, h) sequences; pygame Rects work.
+
+Run this file directly to fire balls at many speeds and angles and check that
+none of them tunnel through or get stuck in a paddle.
+"""
+
+import math
+import sys
+
+# --- Constants ---
+MAX_BOUNCES = 4      # Collisions resolved per tick before the rest of the move is dropped
+INFINITY = float('inf')
+
+
+def sweep(box, dx, dy, obstacle):
+    """
+    Sweep box by (dx, dy) against a static obstacle.
+    Returns (toi, normal_x, normal_y) with toi in [0, 1] for the first
+    contact, or None if the box does not hit the obstacle during the move.
+    """
+    x, y, w, h = box
+    ox, oy, ow, oh = obstacle
+
+    if dx > 0:
+        x_entry, x_exit = (ox - (x + w)) / dx, (ox + ow - x) / dx
+    elif dx < 0:
+        x_entry, x_exit = (ox + ow - x) / dx, (ox - (x + w)) / dx
+    elif x + w <= ox or x >= ox + ow:
+        return None
+    else:
+        x_entry, x_exit = -INFINITY, INFINITY
+
+    if dy > 0:
+        y_entry, y_exit = (oy - (y + h)) / dy, (oy + oh - y) / dy
+    elif dy < 0:
+        y_entry, y_exit = (oy + oh - y) / dy, (oy - (y + h)) / dy
+    elif y + h <= oy or y >= oy + oh:
+        return None
+    else:
+        y_entry, y_exit = -INFINITY, INFINITY
+
+    entry = max(x_entry, y_entry)
+    exit_ = min(x_exit, y_exit)
+    if entry >= exit_ or entry < 0 or entry > 1:
+        return None
+
+    if x_entry > y_entry:
+        return entry, (-1 if dx > 0 else 1), 0
+    return entry, 0, (-1 if dy > 0 else 1)
+
+
+def overlaps(box, obstacle):
+    """True if the two boxes overlap with positive area."""
+    x, y, w, h = box
+    ox, oy, ow, oh = obstacle
+    return x < ox + ow and ox < x + w and y < oy + oh and oy < y + h
+
+
+def push_out(x, y, vx, vy, size, paddle):
+    """
+    Move a ball that starts inside a paddle (e.g. the paddle moved onto it)
+    out along the axis of least penetration and point its velocity away.
+    """
+    px, py, pw, ph = paddle
+    push_left = x + size - px
+    push_right = px + pw - x
+    push_up = y + size - py
+    push_down = py + ph - y
+    shallowest = min(push_left, push_right, push_up, push_down)
+    if shallowest == push_left:
+        return px - size, y, -abs(vx), vy
+    if shallowest == push_right:
+        return px + pw, y, abs(vx), vy
+    if shallowest == push_up:
+        return x, py - size, vx, -abs(vy)
+    return x, py + ph, vx, abs(vy)
+
+
+def advance_ball(x, y, vx, vy, size, paddles, height, speedup=1.0):
+    """
+    Move the ball for one tick, bouncing off the top and bottom walls and the
+    paddles at their exact time of impact.
+    Returns (x, y, vx, vy, hit_paddle).
+    """
+    hit_paddle = False
+    for paddle in paddles:
+        if overlaps((x, y, size, size), paddle):
+            x, y, vx, vy = push_out(x, y, vx, vy, size, paddle)
+            hit_paddle = True
+
+    remaining = 1.0
+    for _ in range(MAX_BOUNCES):
+        dx = vx * remaining
+        dy = vy * remaining
+
+        # Earliest contact: walls first, paddles can only be earlier
+        toi, normal_x, normal_y, hit = 1.0, 0, 0, None
+        if dy < 0 and y + dy < 0:
+            toi, normal_y = -y / dy, 1
+        elif dy > 0 and y + size + dy > height:
+            toi, normal_y = (height - size - y) / dy, -1
+
+        for paddle in paddles:
+            contact = sweep((x, y, size, size), dx, dy, paddle)
+            if contact is not None and contact[0] < toi:
+                toi, normal_x, normal_y = contact
+                hit = paddle
+
+        x += dx * toi
+        y += dy * toi
+        if normal_x == 0 and normal_y == 0:
+            break
+
+        # Snap exactly onto the contact surface so rounding can't leave the ball inside.
+        # A wall's surface is the bottom wall's top (height) or the top wall's bottom (0).
+        top, bottom = (hit[1], hit[1] + hit[3]) if hit is not None else (height, 0)
+        if normal_x < 0:
+            x = hit[0] - size
+        elif normal_x > 0:
+            x = hit[0] + hit[2]
+        elif normal_y < 0:
+            y = top - size
+        else:
+            y = bottom
+
+        # Reflect the velocity off the contact surface and carry on with the time left
+        if normal_x != 0:
+            vx = abs(vx) * normal_x
+        if normal_y != 0:
+            vy = abs(vy) * normal_y
+        if hit is not None:
+            vx *= speedup
+            vy *= speedup
+            hit_paddle = True
+        remaining *= 1.0 - toi
+        if remaining <= 0:
+            break
+
+    return x, y, vx, vy, hit_paddle
+
+
+def _fold(y, span):
+    """Where a ball at unfolded height y really is, bouncing between 0 and span."""
+    y %= 2 * span
+    return y if y <= span else 2 * span - y
+
+
+def _fire(x, y, vx, vy, size, paddle, height):
+    """
+    Run a ball at paddle until it comes back. Returns (failure or None,
+    ticks, whether it bounced off a wall before the paddle).
+    """
+    face = paddle[0] + paddle[2]
+    bounced = False
+    for tick in range(10000):
+        x, y, vx_new, vy_new, hit = advance_ball(x, y, vx, vy, size, [paddle], height)
+        if overlaps((x, y, size, size), paddle):
+            return 'inside paddle', tick, bounced
+        if not 0 <= y <= height - size:
+            return 'left the field', tick, bounced
+        if x < face:
+            return 'tunneled', tick, bounced
+        if vx_new > 0:
+            return (None if hit else 'turned without a paddle'), tick, bounced
+        bounced = bounced or (vy_new > 0) != (vy > 0)
+        vx, vy = vx_new, vy_new
+    return 'never returned', tick, bounced
+
+
+def run_physics_checks(width=800, height=600, size=15):
+    """
+    Fire balls at many speeds and angles from inside the field at a paddle
+    in their path, including ones that bounce off the top or bottom wall on
+    the way or in the same tick as the paddle, and check that every one comes
+    back without tunneling, leaving the field or sticking inside.
+    Returns the list of failures (empty when all checks pass).
+    """
+    paddle_x, paddle_w, paddle_h = 30, 15, 100
+    face = paddle_x + paddle_w
+    span = height - size
+    failures = []
+    scenarios = wall_first = 0
+    for speed in (1, 5, 10, 15, 16, 30, 50, 100, 250, 1000, 5000):
+        for angle_deg in range(-75, 76, 5):
+            angle = math.radians(angle_deg)
+            vx = -speed * math.cos(angle)
+            vy = speed * math.sin(angle)
+            for start_y in (0, 1, 120, span / 2, 460, span - 1, span):
+                # Put the paddle where the ball's path, walls included, meets its face
+                x = width / 2
+                land_y = _fold(start_y + vy * (x - face) / -vx, span)
+                for along in (0.25, 0.5, 0.75):
+                    paddle_y = min(max(land_y + size / 2 - along * paddle_h, 0), height - paddle_h)
+                    paddle = (paddle_x, paddle_y, paddle_w, paddle_h)
+                    failure, tick, bounced = _fire(x, start_y, vx, vy, size, paddle, height)
+                    scenarios += 1
+                    wall_first += bounced
+                    if failure:
+                        failures.append((speed, angle_deg, start_y, tick, failure))
+
+    # A wall bounce in the same tick as the paddle hit, or the tick before it:
+    # the ball starts next to a paddle in a corner, short of the wall by gap
+    # and of the face by gap + lead, moving diagonally at speed
+    for speed in (20, 50, 200, 1000):
+        for gap in (0, 0.5, speed / 4, speed / 2, speed - 1):
+            for lead in (1, speed / 3, speed / 2, speed, 1.5 * speed, paddle_h - size - 1):
+                if gap + lead > 2 * speed or lead > paddle_h - size:
+                    continue
+                for top in (True, False):
+                    paddle_y = 0 if top else height - paddle_h
+                    y = gap if top else span - gap
+                    vy = -speed if top else speed
+                    failure, tick, bounced = _fire(face + gap + lead, y, -speed, vy, size,
+                                                   (paddle_x, paddle_y, paddle_w, paddle_h), height)
+                    scenarios += 1
+                    wall_first += bounced or tick == 0
+                    if failure:
+                        failures.append((speed, 'corner', (gap, lead, top), tick, failure))
+
+    print(f"{scenarios} scenarios, {wall_first} with a wall bounce before or with the paddle hit")
+    if not wall_first:
+        failures.append((0, '-', '-', 0, 'no scenario bounced off a wall'))
+
+    # A paddle that moves onto the ball must push it out rather than trap it
+    paddle = (30, 250, paddle_w, paddle_h)
+    for offset_x in range(-size + 1, paddle_w):
+        for offset_y in range(-size + 1, paddle_h, 7):
+            for vx, vy in ((-5, 5), (5, -5), (-30, 0), (0, 30)):
+                x, y, vx, vy, _ = advance_ball(30 + offset_x, 250 + offset_y, vx, vy, size, [paddle], height)
+                if overlaps((x, y, size, size), paddle):
+                    failures.append((vx, vy, offset_y, offset_x, 'stuck in moving paddle'))
+    return failures
+
+
+if __name__ == '__main__':
+    failures = run_physics_checks()
+    for failure in failures[:20]:
+        print("FAIL %s %s %s %s: %s" % failure)
+    print(f"{len(failures)} failures")
+    sys.exit(1 if failures else 0)
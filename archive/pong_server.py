@@ -0,0 +1,475 @@
+"""
+Ping Pong - Network Match Server
+An asyncio TCP server that runs hundreds of Pong matches in one process with
+the authoritative rules at a fixed tick rate. Players join over TCP, send
+their paddle moves and get back delta-compressed snapshots of the ball,
+paddles and score. Clients predict their own paddle and the ball between
+snapshots and reconcile when a snapshot arrives.
+
+All matches live in one PongBatch (a slot per match), so a server tick is a
+handful of NumPy calls however many matches are running.
+
+Protocol: every message is a little-endian u16 payload length, a u8 message
+type and the payload.
+    client -> server  JOIN     (no payload)            wait for a seat in a match
+                      INPUT    u32 seq, i8 move         one tick of paddle input
+    server -> client  WELCOME  u32 match, u8 side, u16 tick rate
+                      SNAPSHOT u32 tick, u32 ack, u16 changed-field mask,
+                               then the changed fields in FIELDS order
+
+Usage:
+    python archive/pong_server.py [--port N] [--matches N]    run a server
+    python archive/pong_server.py --demo [--matches N]        loopback test with bot clients
+"""
+
+import argparse
+import asyncio
+import multiprocessing as mp
+import struct
+import sys
+import time
+from collections import deque
+
+import numpy as np
+
+from pong_core import (SCREEN_HEIGHT, PADDLE_HEIGHT, BALL_SIZE, STAY, PongBatch, PongCore)
+
+# --- Constants ---
+DEFAULT_PORT = 50007
+TICK_RATE = 60               # Same as PongGame
+SNAPSHOT_INTERVAL = 2        # Ticks between snapshots (30 per second)
+MAX_MATCHES = 512
+MAX_INPUT_BACKLOG = 8        # Inputs queued per player before the oldest are dropped
+MAX_WRITE_BUFFER = 64 * 1024 # Skip snapshots to a client that isn't reading
+MAX_TICK_LAG = 0.25          # Seconds behind schedule before the tick clock resyncs
+RESTART_DELAY_TICKS = 3 * TICK_RATE
+DEMO_SECONDS = 10
+
+MSG_JOIN = 1
+MSG_INPUT = 2
+MSG_WELCOME = 16
+MSG_SNAPSHOT = 17
+
+FRAME = struct.Struct('<HB')
+INPUT = struct.Struct('<Ib')
+WELCOME = struct.Struct('<IBH')
+SNAPSHOT_HEADER = struct.Struct('<IIH')
+
+# Match states carried in the 'state' field
+WAITING, PLAYING, GAME_OVER = 0, 1, 2
+
+# Snapshot fields and their wire formats; the mask bit is the index
+FIELDS = (
+    ('ball_x', 'f'), ('ball_y', 'f'), ('ball_speed_x', 'f'), ('ball_speed_y', 'f'),
+    ('left_y', 'h'), ('right_y', 'h'), ('player1_score', 'B'), ('player2_score', 'B'),
+    ('state', 'B'),
+)
+FULL_MASK = (1 << len(FIELDS)) - 1
+_field_structs = {}
+
+
+def _fields_struct(mask):
+    """Struct for the fields selected by mask, cached per mask."""
+    packer = _field_structs.get(mask)
+    if packer is None:
+        packer = struct.Struct('<' + ''.join(code for i, (_, code) in enumerate(FIELDS) if mask >> i & 1))
+        _field_structs[mask] = packer
+    return packer
+
+
+def encode_message(kind, payload=b''):
+    return FRAME.pack(len(payload), kind) + payload
+
+
+async def read_message(reader):
+    """Return (type, payload) of the next message; raises IncompleteReadError at EOF."""
+    length, kind = FRAME.unpack(await reader.readexactly(FRAME.size))
+    return kind, await reader.readexactly(length)
+
+
+def encode_snapshot(tick, ack, values, baseline):
+    """
+    Pack the fields of values that differ from baseline (all of them when
+    baseline is None). Returns the SNAPSHOT message.
+    """
+    mask = 0
+    changed = []
+    for i, value in enumerate(values):
+        if baseline is None or value != baseline[i]:
+            mask |= 1 << i
+            changed.append(value)
+    payload = SNAPSHOT_HEADER.pack(tick, ack, mask) + _fields_struct(mask).pack(*changed)
+    return encode_message(MSG_SNAPSHOT, payload)
+
+
+def decode_snapshot(payload, values):
+    """Apply a SNAPSHOT payload to the values list in place. Returns (tick, ack)."""
+    tick, ack, mask = SNAPSHOT_HEADER.unpack_from(payload)
+    changed = iter(_fields_struct(mask).unpack_from(payload, SNAPSHOT_HEADER.size))
+    for i in range(len(FIELDS)):
+        if mask >> i & 1:
+            values[i] = next(changed)
+    return tick, ack
+
+
+class Connection:
+    """
+    One connected player: their seat, queued inputs and the last snapshot sent.
+    """
+    def __init__(self, writer):
+        self.writer = writer
+        self.slot = None
+        self.side = None
+        self.inputs = deque()
+        self.move = STAY
+        self.ack = 0
+        self.baseline = None
+
+
+class PongServer:
+    """
+    Authoritative server for up to max_matches concurrent matches.
+
+    Each tick consumes one queued input per player (repeating the last move
+    when none arrived), steps every match in the PongBatch, restarts finished
+    matches after a pause and, every snapshot_interval ticks, sends each
+    player the fields that changed since the last snapshot they received.
+    """
+    def __init__(self, max_matches=MAX_MATCHES, tick_rate=TICK_RATE, snapshot_interval=SNAPSHOT_INTERVAL):
+        self.max_matches = max_matches
+        self.tick_rate = tick_rate
+        self.snapshot_interval = snapshot_interval
+        self.batch = PongBatch(max_matches)
+        self.batch.done[:] = True   # Empty slots stay frozen until both seats fill
+        self.seats = [[None, None] for _ in range(max_matches)]
+        self.seated = np.zeros((max_matches, 2), dtype=bool)
+        self.moves = np.zeros((2, max_matches), dtype=np.int64)
+        self.finished_at = np.full(max_matches, -1, dtype=np.int64)
+        self.free_slots = deque(range(max_matches))
+        self.waiting_slots = deque()
+        self.connections = set()
+
+        self.tick = 0
+        self.tick_times = deque(maxlen=10 * tick_rate)
+        self.snapshots_sent = 0
+        self.snapshot_bytes = 0
+
+    # --- Seating ---
+
+    def _join(self, conn):
+        """Seat conn in a waiting match or a fresh slot. Returns False when the server is full."""
+        slot = None
+        while self.waiting_slots:
+            candidate = self.waiting_slots.popleft()
+            if self.seated[candidate].sum() == 1:
+                slot = candidate
+                break
+        if slot is None:
+            if not self.free_slots:
+                return False
+            slot = self.free_slots.popleft()
+
+        side = 0 if self.seats[slot][0] is None else 1
+        self.seats[slot][side] = conn
+        self.seated[slot, side] = True
+        conn.slot, conn.side = slot, side
+        self.connections.add(conn)
+
+        if self.seated[slot].all():
+            mask = np.zeros(self.max_matches, dtype=bool)
+            mask[slot] = True
+            self.batch.reset(mask)
+            self.finished_at[slot] = -1
+        else:
+            self.waiting_slots.append(slot)
+        return True
+
+    def _leave(self, conn):
+        """Free conn's seat; the opponent, if any, waits for a new one."""
+        self.connections.discard(conn)
+        slot, side = conn.slot, conn.side
+        if slot is None:
+            return
+        self.seats[slot][side] = None
+        self.seated[slot, side] = False
+        self.moves[side, slot] = STAY
+        self.batch.done[slot] = True
+        if self.seated[slot].any():
+            self.waiting_slots.append(slot)
+        else:
+            self.free_slots.append(slot)
+
+    async def handle_client(self, reader, writer):
+        conn = Connection(writer)
+        try:
+            kind, _ = await read_message(reader)
+            if kind != MSG_JOIN or not self._join(conn):
+                return
+            writer.write(encode_message(MSG_WELCOME, WELCOME.pack(conn.slot, conn.side, self.tick_rate)))
+
+            while True:
+                kind, payload = await read_message(reader)
+                if kind == MSG_INPUT:
+                    if len(payload) != INPUT.size:
+                        return   # Not a client we understand; drop it
+                    seq, move = INPUT.unpack(payload)
+                    conn.inputs.append((seq, max(-1, min(1, move))))
+                    if len(conn.inputs) > MAX_INPUT_BACKLOG:
+                        conn.inputs.popleft()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._leave(conn)
+            writer.close()
+
+    # --- Simulation ---
+
+    def step(self):
+        """Advance every match by one tick and send snapshots when due."""
+        for conn in self.connections:
+            if conn.inputs:
+                conn.ack, conn.move = conn.inputs.popleft()
+            self.moves[conn.side, conn.slot] = conn.move
+
+        batch = self.batch
+        batch.step(self.moves[0], self.moves[1])
+        self.tick += 1
+
+        # Finished matches show the result for a while, then start over
+        playing = self.seated.all(axis=1)
+        self.finished_at[playing & batch.done & (self.finished_at < 0)] = self.tick
+        restart = playing & (self.finished_at >= 0) & (self.tick - self.finished_at >= RESTART_DELAY_TICKS)
+        if restart.any():
+            batch.reset(restart)
+            self.finished_at[restart] = -1
+
+        if self.tick % self.snapshot_interval == 0:
+            self._send_snapshots(playing)
+
+    def _send_snapshots(self, playing):
+        batch = self.batch
+        state = np.where(playing, np.where(batch.done, GAME_OVER, PLAYING), WAITING)
+        columns = [getattr(batch, name).tolist() for name, _ in FIELDS[:-1]] + [state.tolist()]
+        for conn in self.connections:
+            if conn.writer.transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+                continue   # Slow reader: skip, and keep the delta against what it last got
+            values = tuple(column[conn.slot] for column in columns)
+            message = encode_snapshot(self.tick, conn.ack, values, conn.baseline)
+            conn.writer.write(message)
+            conn.baseline = values
+            self.snapshots_sent += 1
+            self.snapshot_bytes += len(message)
+
+    async def run(self):
+        """Step at tick_rate until cancelled, catching up after short stalls."""
+        loop = asyncio.get_running_loop()
+        tick_time = 1.0 / self.tick_rate
+        next_tick = loop.time()
+        while True:
+            start = time.perf_counter()
+            self.step()
+            self.tick_times.append(time.perf_counter() - start)
+
+            next_tick += tick_time
+            delay = next_tick - loop.time()
+            if delay < -MAX_TICK_LAG:
+                next_tick = loop.time()
+            await asyncio.sleep(max(0.0, delay))
+
+    async def serve(self, host='0.0.0.0', port=DEFAULT_PORT):
+        """Start listening and ticking. Returns the asyncio server."""
+        server = await asyncio.start_server(self.handle_client, host, port)
+        self._ticker = asyncio.create_task(self.run())
+        return server
+
+
+class PongClient:
+    """
+    Loopback client stand-in with prediction and reconciliation.
+
+    tick(move) sends one input and immediately steps a local PongCore with it
+    (the opponent is assumed to stay put). Each snapshot resets the local core
+    to the server state and replays the inputs the server hasn't used yet.
+    """
+    def __init__(self):
+        self.core = PongCore()
+        self.values = [0] * len(FIELDS)
+        self.pending = deque()
+        self.seq = 0
+        self.slot = None
+        self.side = None
+        self.server_tick = 0
+        self.snapshots = 0
+        self.correction = 0.0   # Total distance the predicted ball moved on reconciliation
+        self._writer = None
+        self._receiver = None
+
+    @property
+    def state(self):
+        return self.values[-1]
+
+    @property
+    def paddle_y(self):
+        return self.core.left_y if self.side == 0 else self.core.right_y
+
+    async def connect(self, host, port):
+        reader, self._writer = await asyncio.open_connection(host, port)
+        self._writer.write(encode_message(MSG_JOIN))
+        kind, payload = await read_message(reader)
+        if kind != MSG_WELCOME:
+            raise ConnectionError(f"expected WELCOME, got message type {kind}")
+        self.slot, self.side, _ = WELCOME.unpack(payload)
+        self._receiver = asyncio.create_task(self._receive(reader))
+
+    def tick(self, move):
+        """Send this tick's move and predict its effect locally."""
+        self.seq += 1
+        self.pending.append((self.seq, move))
+        self._writer.write(encode_message(MSG_INPUT, INPUT.pack(self.seq, move)))
+        if self.state == PLAYING:
+            self._predict(move)
+
+    def _predict(self, move):
+        if self.side == 0:
+            self.core.step(move, STAY)
+        else:
+            self.core.step(STAY, move)
+
+    async def _receive(self, reader):
+        try:
+            while True:
+                kind, payload = await read_message(reader)
+                if kind == MSG_SNAPSHOT:
+                    self._reconcile(payload)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+    def _reconcile(self, payload):
+        predicted = (self.core.ball_x, self.core.ball_y)
+        self.server_tick, ack = decode_snapshot(payload, self.values)
+        while self.pending and self.pending[0][0] <= ack:
+            self.pending.popleft()
+
+        # Rewind to the server state, then replay the inputs it hasn't seen yet
+        core = self.core
+        (core.ball_x, core.ball_y, core.ball_speed_x, core.ball_speed_y, core.left_y, core.right_y,
+         core.player1_score, core.player2_score, state) = self.values
+        core.game_over = state == GAME_OVER
+        if state == PLAYING:
+            for _, move in self.pending:
+                self._predict(move)
+        self.snapshots += 1
+        self.correction += abs(core.ball_x - predicted[0]) + abs(core.ball_y - predicted[1])
+
+    async def close(self):
+        self._writer.close()
+        if self._receiver is not None:
+            self._receiver.cancel()
+
+
+def bot_move(client):
+    """Track the (predicted) ball with the paddle centre."""
+    target = client.core.ball_y + BALL_SIZE / 2 - PADDLE_HEIGHT / 2
+    target = max(0, min(SCREEN_HEIGHT - PADDLE_HEIGHT, target))
+    y = client.paddle_y
+    return (target > y + 3) - (target < y - 3)
+
+
+async def _run_bots(port, count, seconds):
+    """Connect count bot clients, play for a while and summarize what they saw."""
+    clients = [PongClient() for _ in range(count)]
+    for client in clients:
+        await client.connect('127.0.0.1', port)
+
+    loop = asyncio.get_running_loop()
+    tick_time = 1.0 / TICK_RATE
+    next_tick = loop.time()
+    for _ in range(seconds * TICK_RATE):
+        for client in clients:
+            client.tick(bot_move(client))
+        next_tick += tick_time
+        await asyncio.sleep(max(0.0, next_tick - loop.time()))
+
+    summary = {
+        'playing': sum(client.state == PLAYING for client in clients),
+        'snapshots': sum(client.snapshots for client in clients),
+        'correction': sum(client.correction for client in clients),
+    }
+    for client in clients:
+        await client.close()
+    return summary
+
+
+def _bot_process(port, count, seconds, results):
+    results.put(asyncio.run(_run_bots(port, count, seconds)))
+
+
+async def run_demo(matches, seconds):
+    """
+    Fill a loopback server with bot clients and report tick rate, tick cost
+    and bandwidth. The bots run in a separate process so their prediction
+    work doesn't share the server's event loop.
+    """
+    server = PongServer(max_matches=matches)
+    listener = await server.serve('127.0.0.1', 0)
+    port = listener.sockets[0].getsockname()[1]
+
+    context = mp.get_context('spawn')
+    results = context.Queue()
+    bots = context.Process(target=_bot_process, args=(port, 2 * matches, seconds, results), daemon=True)
+    bots.start()
+    while len(server.connections) < 2 * matches and bots.is_alive():
+        await asyncio.sleep(0.05)
+    start_tick, start = server.tick, time.perf_counter()
+    server.tick_times.clear()
+    while server.connections and bots.is_alive():
+        await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - start
+    summary = await asyncio.get_running_loop().run_in_executor(None, results.get)
+    bots.join()
+
+    full_size = FRAME.size + SNAPSHOT_HEADER.size + _fields_struct(FULL_MASK).size
+    tick_ms = sorted(t * 1000 for t in server.tick_times)
+    print(f"{matches} matches, {2 * matches} clients ({summary['playing']} playing), "
+          f"{(server.tick - start_tick) / elapsed:.1f} ticks/s")
+    print(f"server tick p50 {tick_ms[len(tick_ms) // 2]:.3f} ms, p99 {tick_ms[int(len(tick_ms) * 0.99)]:.3f} ms")
+    print(f"snapshot {server.snapshot_bytes / max(1, server.snapshots_sent):.1f} bytes on average "
+          f"(full {full_size}), {server.snapshot_bytes / elapsed / 1024:.0f} KiB/s in total")
+    print(f"client reconciliation: {summary['snapshots']} snapshots applied, "
+          f"mean ball correction {summary['correction'] / max(1, summary['snapshots']):.2f} px")
+
+    listener.close()
+    await listener.wait_closed()
+    server._ticker.cancel()
+
+
+async def serve_forever(host, port, matches):
+    server = PongServer(max_matches=matches)
+    listener = await server.serve(host, port)
+    print(f"Pong server for {matches} matches listening on {host}:{port}")
+    async with listener:
+        await listener.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Authoritative Pong match server.")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--matches', type=int, default=None,
+                        help=f'match slots (default {MAX_MATCHES}; 200 for --demo)')
+    parser.add_argument('--demo', action='store_true', help='run a loopback test with bot clients')
+    parser.add_argument('--seconds', type=int, default=DEMO_SECONDS, help='length of the demo')
+    args = parser.parse_args()
+
+    try:
+        if args.demo:
+            asyncio.run(run_demo(args.matches or 200, args.seconds))
+        else:
+            asyncio.run(serve_forever(args.host, args.port, args.matches or MAX_MATCHES))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""
+On-demand pygame setup, so the games import without side effects and start
+only the subsystems a mode needs.
+
+pygame.init() starts every subsystem, audio and joysticks included, which
+adds startup time and fails on machines without a display or sound card.
+Interactive play only needs the display and fonts, and headless simulation
+needs neither.
+"""
+
+import pygame
+
+_missing_fonts = set()   # Font files already reported missing, so each is reported once
+
+
+def open_window(size, caption):
+    """Start the display (and nothing else) and return the window surface."""
+    pygame.display.init()
+    screen = pygame.display.set_mode(size)
+    pygame.display.set_caption(caption)
+    return screen
+
+
+def game_screen(size, caption, headless):
+    """The window, or an off-screen surface of the same size when headless."""
+    if headless:
+        return pygame.Surface(size)
+    return open_window(size, caption)
+
+
+class LazyFont:
+    """
+    A pygame Font that is loaded the first time it is used.
+
+    Attribute access (render, size, get_height, ...) is forwarded to the
+    loaded font, so it can be passed anywhere a Font is expected. A font file
+    that can't be found falls back to pygame's default font at fallback_size.
+    """
+    def __init__(self, file_name, size, fallback_size=None):
+        self.file_name = file_name
+        self.size_points = size
+        self.fallback_size = fallback_size or size
+        self._font = None
+
+    def load(self):
+        if self._font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            try:
+                self._font = pygame.font.Font(self.file_name, self.size_points)
+            except FileNotFoundError:
+                if self.file_name not in _missing_fonts:
+                    _missing_fonts.add(self.file_name)
+                    print(f"Error: Font file '{self.file_name}' not found. Please place it in the root directory.")
+                    print("Using default font.")
+                self._font = pygame.font.Font(None, self.fallback_size)
+        return self._font
+
+    def __getattr__(self, name):
+        return getattr(self.load(), name)
@@ -0,0 +1,302 @@
+"""
+Deterministic input recording and fast-forward replay.
+
+A replay file is a small header (magic, version, game kind, RNG seed)
+followed by one action byte per logic tick. Each game packs the input its
+next tick will consume into that byte (encode_action) and can apply it back
+(apply_action), and its food RNG is seeded from the header, so replaying the
+bytes reproduces the session exactly.
+
+Record a session by setting GAME_RECORD to a file path:
+    GAME_RECORD=session.rpl python archive/backup_snake_game.py
+Replay it headlessly, optionally seeking to a tick and watching from there:
+    python archive/replay.py session.rpl [--seek TICK] [--watch]
+Check that replays and seeks are exact:
+    python archive/replay.py --check
+"""
+
+import argparse
+import copy
+import importlib
+import os
+import random
+import struct
+import sys
+import time
+from array import array
+from collections import deque
+
+# --- Constants ---
+MAGIC = b'RPLY'
+VERSION = 1
+HEADER = struct.Struct('<4sBBI')   # magic, version, game kind, seed
+SEED_LIMIT = 1 << 32               # Seeds must lie in [0, SEED_LIMIT) to fit the header
+FLUSH_BYTES = 4096                 # Ticks buffered before writing to disk
+SNAPSHOT_INTERVAL = 600            # Ticks between seek snapshots (a minute of Snake)
+RECORD_ENV_VAR = 'GAME_RECORD'
+
+# Game kind -> (module, class, tick method, render method). The index is stored in the header.
+GAME_KINDS = {
+    'snake': ('backup_snake_game', 'SnakeGame', 'tick', 'render'),
+    'snake_retro': ('backup_snake_game_with_pixels', 'SnakeGame', '_tick', '_draw_elements'),
+    'pong': ('backup_pong_game', 'PongGame', 'tick', 'render'),
+    'snake_world': ('backup_snake_game_with_pixels', 'SnakeWorldGame', '_tick', '_draw_elements'),
+}
+KIND_NAMES = list(GAME_KINDS)
+
+
+def new_seed():
+    """A fresh seed for a game that wasn't given one, so every session can be recorded."""
+    return random.getrandbits(32)
+
+
+def snapshot_fields(game, names):
+    """Deep copy of the named attributes of game."""
+    return copy.deepcopy({name: getattr(game, name) for name in names})
+
+
+def restore_fields(game, state):
+    """Set attributes of game from a snapshot_fields() copy, leaving the snapshot reusable."""
+    for name, value in copy.deepcopy(state).items():
+        setattr(game, name, value)
+
+
+class ReplayRecorder:
+    """
+    Writes the header and then one action byte per tick, buffered.
+    Raises ValueError for a seed the header can't hold.
+    """
+    def __init__(self, path, kind, seed):
+        if not 0 <= seed < SEED_LIMIT:
+            raise ValueError(f"can't record a game with seed {seed}: replay seeds must be in [0, 2**32)")
+        self._file = open(path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, VERSION, KIND_NAMES.index(kind), seed))
+        self._buffer = bytearray()
+        self.ticks = 0
+
+    @classmethod
+    def from_env(cls, kind, seed):
+        """A recorder writing to $GAME_RECORD, or None when it isn't set."""
+        path = os.environ.get(RECORD_ENV_VAR)
+        return cls(path, kind, seed) if path else None
+
+    def record(self, action):
+        self._buffer.append(action)
+        self.ticks += 1
+        if len(self._buffer) >= FLUSH_BYTES:
+            self.flush()
+
+    def flush(self):
+        self._file.write(self._buffer)
+        self._buffer.clear()
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+
+def read_replay(path):
+    """Return (kind, seed, actions) from a replay file."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < HEADER.size:
+        raise ValueError(f"{path} is too short to be a replay")
+    magic, version, kind, seed = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a replay file")
+    if version != VERSION:
+        raise ValueError(f"{path} has replay version {version}, expected {VERSION}")
+    if kind >= len(KIND_NAMES):
+        raise ValueError(f"{path} has unknown game kind {kind}")
+    return KIND_NAMES[kind], seed, data[HEADER.size:]
+
+
+def make_game(kind, seed, headless=True):
+    """Create a game of the given kind with a seeded RNG and no recorder, without a window unless asked."""
+    module_name, class_name, _, _ = GAME_KINDS[kind]
+    game_class = getattr(importlib.import_module(module_name), class_name)
+    return game_class(seed=seed, headless=headless)
+
+
+def describe(game):
+    """One-line summary of a game's state."""
+    if hasattr(game, 'core'):
+        return f"score {game.core.player1_score}-{game.core.player2_score}, game over: {game.core.game_over}"
+    return f"score {game.score}, length {len(game.snake)}, game over: {game.game_over}"
+
+
+class Replayer:
+    """
+    Plays a replay file back without drawing, as fast as possible.
+
+    A snapshot of the game is kept every snapshot_interval ticks as they are
+    first played, so seek() can jump backwards (or to a tick already passed)
+    by restoring the nearest snapshot and fast-forwarding from there.
+    The game gets a window only when headless is False, for watch().
+    """
+    def __init__(self, path, snapshot_interval=SNAPSHOT_INTERVAL, headless=True):
+        self.kind, self.seed, self.actions = read_replay(path)
+        self.game = make_game(self.kind, self.seed, headless)
+        self._tick_game = getattr(self.game, GAME_KINDS[self.kind][2])
+        self.snapshot_interval = snapshot_interval
+        self.snapshots = [self.game.snapshot()]
+        self.tick = 0
+
+    def __len__(self):
+        return len(self.actions)
+
+    def step(self):
+        """Play one tick; returns False at the end of the recording."""
+        if self.tick >= len(self.actions):
+            return False
+        self.game.apply_action(self.actions[self.tick])
+        self._tick_game()
+        self.tick += 1
+        if self.tick == len(self.snapshots) * self.snapshot_interval:
+            self.snapshots.append(self.game.snapshot())
+        return True
+
+    def seek(self, tick):
+        """Bring the game to the state it had just before tick was played."""
+        tick = max(0, min(tick, len(self.actions)))
+        index = min(tick // self.snapshot_interval, len(self.snapshots) - 1)
+        base = index * self.snapshot_interval
+        if tick < self.tick or base > self.tick:
+            self.game.restore(self.snapshots[index])
+            self.tick = base
+        while self.tick < tick:
+            self.step()
+
+    def run_to_end(self):
+        while self.step():
+            pass
+
+
+def _canonical(value):
+    """Plain, comparable form of a snapshot value (sets sorted, objects as dicts)."""
+    if isinstance(value, random.Random):
+        return value.getstate()
+    if isinstance(value, dict):
+        return {key: _canonical(item) for key, item in value.items()}
+    if isinstance(value, set):
+        return sorted(value)
+    if isinstance(value, (list, tuple, deque, array)):
+        return [_canonical(item) for item in value]
+    if hasattr(value, '__dict__'):
+        return _canonical(vars(value))
+    return value
+
+
+def run_replay_checks(path, ticks=3000):
+    """
+    Record random play for every game, then check that the replay ends in
+    the same state and that seeking back and forth lands on the same states
+    as straight playback. Returns the list of failures.
+    """
+    failures = []
+    rng = random.Random(0)
+    for kind in GAME_KINDS:
+        module_name, class_name, tick_name, _ = GAME_KINDS[kind]
+        game_class = getattr(importlib.import_module(module_name), class_name)
+        game = game_class(seed=rng.getrandbits(32), record_path=path, headless=True)
+        tick_game = getattr(game, tick_name)
+
+        # Random presses, with restarts whenever the game ends; states are kept for the ticks seeked to
+        seeks = (ticks // 2, 10, ticks - 1, 0, 999, 1000, 1001, ticks)
+        states = {}
+        for tick in range(ticks):
+            if tick in seeks:
+                states[tick] = _canonical(game.snapshot())
+            action = rng.choice(game.ACTIONS)
+            if getattr(game, 'game_over', False) or getattr(getattr(game, 'core', None), 'game_over', False):
+                action |= game.ACTION_RESTART
+            game.apply_action(action)
+            tick_game()
+        states[ticks] = _canonical(game.snapshot())
+        game.recorder.close()
+
+        replayer = Replayer(path, snapshot_interval=250)
+        replayer.run_to_end()
+        if _canonical(replayer.game.snapshot()) != states[ticks]:
+            failures.append((kind, 'end state differs'))
+        for tick in seeks:
+            replayer.seek(tick)
+            if _canonical(replayer.game.snapshot()) != states[tick]:
+                failures.append((kind, f'seek to {tick} differs'))
+
+        # Seeds outside the header's range are refused before anything is written
+        seed_path = path + '.seed'
+        for seed in (-1, SEED_LIMIT):
+            try:
+                game_class(seed=seed, record_path=seed_path, headless=True)
+            except ValueError:
+                pass
+            else:
+                failures.append((kind, f'recording with seed {seed} was accepted'))
+            if os.path.exists(seed_path):
+                failures.append((kind, f'recording with seed {seed} wrote a file'))
+                os.remove(seed_path)
+    return failures
+
+
+def watch(replayer):
+    """Show the replay in a window at the game's normal speed from the current tick."""
+    import pygame
+    game = replayer.game
+    render = getattr(game, GAME_KINDS[replayer.kind][3])
+
+    def handle_input():
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                return False
+        return True
+
+    def update():
+        if not replayer.step():
+            game.loop.stop()
+
+    game.loop.run(handle_input, update, render)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded game session.")
+    parser.add_argument('path', nargs='?', help='replay file written with GAME_RECORD')
+    parser.add_argument('--seek', type=int, help='tick to fast-forward to')
+    parser.add_argument('--watch', action='store_true', help='show the replay from the seek tick in a window')
+    parser.add_argument('--check', action='store_true', help='record random sessions and verify exact replay')
+    args = parser.parse_args()
+
+    os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+    os.environ.pop(RECORD_ENV_VAR, None)
+    os.environ['GAME_SCORES'] = ''   # A replayed session was already recorded when it was played
+
+    if args.check:
+        path = args.path or 'replay_check.rpl'
+        failures = run_replay_checks(path)
+        os.remove(path)
+        for failure in failures:
+            print("FAIL %s: %s" % failure)
+        print(f"{len(failures)} failures")
+        return 1 if failures else 0
+    if args.path is None:
+        parser.error('a replay file is required')
+
+    replayer = Replayer(args.path, headless=not args.watch)
+    print(f"{replayer.kind} replay, seed {replayer.seed}, {len(replayer)} ticks")
+    start = time.perf_counter()
+    if args.seek is not None:
+        replayer.seek(args.seek)
+    elif not args.watch:
+        replayer.run_to_end()
+    elapsed = time.perf_counter() - start
+    print(f"tick {replayer.tick}: {describe(replayer.game)} ({elapsed * 1000:.1f} ms)")
+
+    if args.watch:
+        watch(replayer)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,273 @@
+"""
+Persistent high scores and session statistics for all the games.
+
+Every finished game is a row in a SQLite database. record() only puts the
+row on a queue; a background thread writes queued rows in batches, one
+transaction per batch, so a kiosk logging thousands of sessions never waits
+on the disk in the middle of a frame. Leaderboards come from an index on
+(game, score), so top_scores() reads only the rows it returns.
+
+The games record to scores.db in the working directory, or to $GAME_SCORES
+(set it empty to turn recording off). Show a leaderboard:
+    python archive/score_store.py --top snake
+Check batching, frame-time cost and the leaderboard index:
+    python archive/score_store.py --check
+"""
+
+import argparse
+import os
+import queue
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+# --- Constants ---
+SCORES_ENV_VAR = 'GAME_SCORES'
+DEFAULT_PATH = 'scores.db'
+FLUSH_INTERVAL = 1.0        # Seconds a recorded row may wait before it is written
+MAX_BATCH = 500             # Rows written in one transaction at most
+TOP_SCORES = 10
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    game TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    player TEXT,
+    details TEXT,
+    duration REAL,
+    ended REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_by_score ON sessions (game, score DESC);
+"""
+INSERT = "INSERT INTO sessions (game, score, player, details, duration, ended) VALUES (?, ?, ?, ?, ?, ?)"
+
+
+def connect(path):
+    """A connection to the score database, creating it if needed."""
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")      # Readers don't wait for the writer
+    connection.execute("PRAGMA synchronous=NORMAL")    # One sync per checkpoint, not per commit
+    connection.executescript(SCHEMA)
+    return connection
+
+
+class ScoreStore:
+    """
+    Records finished sessions to path from a background writer thread.
+    """
+    def __init__(self, path=DEFAULT_PATH, flush_interval=FLUSH_INTERVAL, max_batch=MAX_BATCH):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.written = 0
+        self.batches = 0
+        self.error = None
+        self._queue = queue.SimpleQueue()
+        connect(path).close()   # Create the schema now, so queries work before the first write
+        self._thread = threading.Thread(target=self._write_rows, name='score-store', daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_env(cls):
+        """
+        A store at $GAME_SCORES (scores.db by default), or None when it is set
+        empty or the database can't be opened, so a bad path never stops a game.
+        """
+        path = os.environ.get(SCORES_ENV_VAR, DEFAULT_PATH)
+        if not path:
+            return None
+        try:
+            return cls(path)
+        except sqlite3.Error as error:
+            print(f"Score store: could not open {path} ({error}); scores won't be saved.")
+            return None
+
+    def record(self, game, score, player=None, details=None, duration=None):
+        """Queue a finished session; returns at once."""
+        self._queue.put((game, int(score), player, details, duration, time.time()))
+
+    def _write_rows(self):
+        """
+        Background thread: write queued rows, batching everything that
+        arrives within flush_interval. None on the queue stops the thread and
+        an Event asks for the batch so far to be written now.
+        """
+        try:
+            connection = connect(self.path)
+        except sqlite3.Error as error:
+            self.error = error
+            print(f"Score store: could not open {self.path} ({error}); scores won't be saved.")
+            return
+        running = True
+        while running:
+            batch = []
+            flushed = None
+            item = self._queue.get()
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is None:
+                    running = False
+                    break
+                if isinstance(item, threading.Event):
+                    flushed = item
+                    break
+                batch.append(item)
+                if len(batch) >= self.max_batch:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    with connection:
+                        connection.executemany(INSERT, batch)
+                    self.written += len(batch)
+                    self.batches += 1
+                except sqlite3.Error as error:
+                    self.error = error
+                    print(f"Score store: could not save {len(batch)} scores: {error}")
+            if flushed is not None:
+                flushed.set()
+        connection.close()
+
+    def flush(self):
+        """Wait until every row recorded so far is written."""
+        if self._thread.is_alive():
+            flushed = threading.Event()
+            self._queue.put(flushed)
+            flushed.wait()
+
+    def close(self):
+        """Write what is queued and stop the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def top_scores(self, game, limit=TOP_SCORES):
+        """The best (score, player, details, ended) rows for game, highest first."""
+        return top_scores(self.path, game, limit)
+
+
+def top_scores(path, game, limit=TOP_SCORES):
+    """The best (score, player, details, ended) rows for game in the database at path."""
+    connection = connect(path)
+    try:
+        return connection.execute(
+            "SELECT score, player, details, ended FROM sessions WHERE game = ? ORDER BY score DESC LIMIT ?",
+            (game, limit)).fetchall()
+    finally:
+        connection.close()
+
+
+def session_stats(path, game):
+    """(sessions, best score, mean score, total seconds played) for game."""
+    connection = connect(path)
+    try:
+        return connection.execute(
+            "SELECT COUNT(*), MAX(score), AVG(score), SUM(duration) FROM sessions WHERE game = ?",
+            (game,)).fetchone()
+    finally:
+        connection.close()
+
+
+# --- Checks ---
+
+def run_store_checks(sessions=5000, frames=20000):
+    """
+    Record sessions from a simulated game loop and check that every one is
+    written, that record() costs nothing noticeable per frame, that writes
+    are batched, and that leaderboards use the index.
+    """
+    failures = []
+    directory = tempfile.mkdtemp(prefix='score_check_')
+    path = os.path.join(directory, 'scores.db')
+    try:
+        store = ScoreStore(path, flush_interval=0.05)
+        times = []
+        every = frames // sessions
+        for frame in range(frames):
+            if frame % every == 0:
+                start = time.perf_counter()
+                store.record('snake' if frame % 3 else 'pong', frame * 7919 % 1000, player=f'p{frame % 7}',
+                             duration=frame % 300 / 10)
+                times.append(time.perf_counter() - start)
+        store.flush()
+        flushed = store.written
+        store.record('pong', 0)
+        store.close()
+
+        count = connect(path).execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        times.sort()
+        p99 = times[int(len(times) * 0.99)] * 1000
+        print(f"{count} sessions written in {store.batches} transactions, record() p99 {p99:.4f} ms, longest {times[-1] * 1000:.3f} ms")
+        if flushed != sessions:
+            failures.append(f'flush() returned with {flushed} of {sessions} sessions written')
+        if count != sessions + 1:
+            failures.append(f'{count} of {sessions + 1} sessions written by close()')
+        if p99 > 0.05:
+            failures.append(f'record() p99 is {p99:.3f} ms')
+        if store.batches > sessions // 10:
+            failures.append(f'{sessions} sessions took {store.batches} transactions')
+
+        best = top_scores(path, 'snake', 5)
+        expected = sorted((frame * 7919 % 1000 for frame in range(0, frames, every) if frame % 3),
+                          reverse=True)[:5]
+        if [row[0] for row in best] != expected:
+            failures.append(f'top scores {[row[0] for row in best]}, expected {expected}')
+        plan = connect(path).execute(
+            "EXPLAIN QUERY PLAN SELECT score FROM sessions WHERE game = ? ORDER BY score DESC LIMIT 10",
+            ('snake',)).fetchall()
+        if not any('sessions_by_score' in row[-1] for row in plan):
+            failures.append(f'leaderboard query does not use the index: {plan}')
+    finally:
+        for name in os.listdir(directory):
+            os.remove(os.path.join(directory, name))
+        os.rmdir(directory)
+
+    # A database that can't be opened turns recording off instead of failing
+    saved = os.environ.get(SCORES_ENV_VAR)
+    os.environ[SCORES_ENV_VAR] = os.path.join(directory, 'missing', 'scores.db')
+    try:
+        if ScoreStore.from_env() is not None:
+            failures.append('from_env() returned a store for a path that cannot be opened')
+    finally:
+        if saved is None:
+            del os.environ[SCORES_ENV_VAR]
+        else:
+            os.environ[SCORES_ENV_VAR] = saved
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show high scores, or check the score store.")
+    parser.add_argument('--top', metavar='GAME', help='print the leaderboard for GAME (snake, snake_retro, pong...)')
+    parser.add_argument('--path', default=os.environ.get(SCORES_ENV_VAR) or DEFAULT_PATH)
+    parser.add_argument('--limit', type=int, default=TOP_SCORES)
+    parser.add_argument('--check', action='store_true', help='check batching, cost and the leaderboard index')
+    args = parser.parse_args()
+
+    if args.check:
+        failures = run_store_checks()
+        for failure in failures:
+            print(f"FAIL {failure}")
+        print(f"{len(failures)} failures")
+        return 1 if failures else 0
+    if args.top is None:
+        parser.error('--top GAME or --check is required')
+    if not os.path.exists(args.path):
+        parser.error(f'{args.path} does not exist yet')
+
+    sessions, best, mean, played = session_stats(args.path, args.top)
+    print(f"{args.top}: {sessions} sessions, best {best}, mean {mean or 0:.1f}, {(played or 0) / 3600:.1f} h played")
+    for rank, (score, player, details, ended) in enumerate(top_scores(args.path, args.top, args.limit), 1):
+        when = time.strftime('%Y-%m-%d %H:%M', time.localtime(ended))
+        print(f"{rank:3}. {score:6}  {player or '':12} {details or '':10} {when}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,418 @@
+"""
+Snake autopilot: picks each move from a Hamiltonian cycle with safe shortcuts.
+
+The snake follows a precomputed cycle through every cell, which can never
+trap it. While it is short it may cut across the cycle towards food, but only
+onto cells that are still ahead of its tail along the cycle. Following the
+cycle from such a cell always reaches the tail, which is the tail-reachability
+safety check. Which shortcut to take comes from a BFS distance field grown
+from the food cells. The field is reused until the food set changes and is
+built incrementally within a time budget that covers the whole call, so every
+decision stays well under a millisecond even on a 100x100 board. Until the
+field reaches the head, the snake aims by cycle position instead.
+
+GreedyPilot is the cheap fallback for worlds too large for the cycle: it
+heads for the nearest food unless that would box the snake in.
+
+Run this file directly to let the autopilot play on small and large boards,
+and the greedy pilot on a large world, and report scores and per-tick decision times. A decision that takes over
+half the limit is timed again from the same state, so time the OS gave to
+other work isn't counted against it.
+"""
+
+import random
+import sys
+import time
+from array import array
+from collections import deque
+
+# --- Constants ---
+TICK_BUDGET = 0.0003        # Seconds per choose() call, field growth and decision together
+DECIDE_RESERVE = 0.0001     # Part of the budget kept for picking the move after the search
+DECISION_LIMIT = 0.001      # Slowest decision the checks allow, in seconds
+RETIMES = 3                 # Repeats of a decision over the limit; the fastest counts
+SHORTCUT_MARGIN = 4         # Cycle cells kept free in front of the tail when cutting across
+MAX_SHORTCUT_FILL = 0.5     # Stop cutting across once the snake covers this much of the board
+CHECK_INTERVAL = 16         # BFS pops between clock checks
+GREEDY_SEARCH_CELLS = 200   # Most cells GreedyPilot's food search reaches per decision
+GREEDY_ROOM_CELLS = 100     # Free cells a GreedyPilot move must open onto (or the snake's length, if shorter)
+GREEDY_STEPS = ((0, -1), (0, 1), (-1, 0), (1, 0))
+UNKNOWN = -1
+
+
+def hamiltonian_cycle(width, height):
+    """
+    Return the cells of a width x height grid as a closed tour where each cell
+    is next to the one before it, or None if no such tour exists (both odd).
+    """
+    if height % 2 == 1:
+        if width % 2 == 1:
+            return None
+        return [(x, y) for y, x in hamiltonian_cycle(height, width)]
+
+    # Snake through columns 1.. row by row, then come back up column 0
+    cycle = []
+    for y in range(height):
+        xs = range(1, width) if y % 2 == 0 else range(width - 1, 0, -1)
+        cycle.extend((x, y) for x in xs)
+    cycle.extend((0, y) for y in range(height - 1, -1, -1))
+    return cycle
+
+
+class SnakeAutopilot:
+    """
+    Chooses the next direction for a snake on a width x height grid.
+
+    choose() takes the snake (a SnakeBody or any head-first sequence that
+    supports `in`), the food cells as (x, y) and the current direction, and
+    returns a (dx, dy) step. It is cheap to call every frame: the decision is
+    cached until the snake moves, and spare calls grow the distance field.
+    """
+    def __init__(self, width, height, budget=TICK_BUDGET):
+        cycle = hamiltonian_cycle(width, height)
+        if cycle is None:
+            raise ValueError("the autopilot needs a grid with at least one even side")
+        self.width = width
+        self.height = height
+        self.size = width * height
+        self.budget = budget
+
+        # Cells are numbered y * width + x; order gives each cell's place on the cycle
+        self._xy = [(i % width, i // width) for i in range(self.size)]
+        self._order = array('i', bytes(4 * self.size))
+        for position, (x, y) in enumerate(cycle):
+            self._order[y * width + x] = position
+        self._neighbors = []
+        for x, y in self._xy:
+            self._neighbors.append(tuple(
+                ny * width + nx
+                for nx, ny in ((x, y - 1), (x, y + 1), (x - 1, y), (x + 1, y))
+                if 0 <= nx < width and 0 <= ny < height
+            ))
+
+        self._unknown = array('i', [UNKNOWN]) * self.size
+        self._dist = array('i', self._unknown)
+        self._frontier = deque()
+        self._food_key = None
+        self._decided_for = None
+        self._decision = None
+
+    def reset(self):
+        """Forget the distance field and cached decision, e.g. after a restart."""
+        self._food_key = None
+        self._decided_for = None
+
+    # --- Distance field ---
+
+    def _start_search(self, food_cells):
+        self._food_key = food_cells
+        self._dist = array('i', self._unknown)
+        self._frontier.clear()
+        for cell in food_cells:
+            self._dist[cell] = 0
+            self._frontier.append(cell)
+
+    def _grow_search(self, snake, deadline):
+        """BFS outwards from the food until the frontier is empty or time runs out."""
+        dist, frontier, neighbors, xy = self._dist, self._frontier, self._neighbors, self._xy
+        pops = 0
+        while frontier:
+            cell = frontier.popleft()
+            step = dist[cell] + 1
+            for n in neighbors[cell]:
+                # Body cells are walls as of when they are reached; the field only guides, never guards
+                if dist[n] == UNKNOWN and xy[n] not in snake:
+                    dist[n] = step
+                    frontier.append(n)
+            pops += 1
+            if pops % CHECK_INTERVAL == 0 and time.perf_counter() >= deadline:
+                return
+
+    # --- Decisions ---
+
+    def choose(self, snake, foods, direction):
+        """Return the (dx, dy) step the snake should take on its next tick."""
+        deadline = time.perf_counter() + self.budget - DECIDE_RESERVE
+        width = self.width
+        food_cells = frozenset(y * width + x for x, y in foods)
+        if food_cells != self._food_key:
+            self._start_search(food_cells)
+            self._decided_for = None
+
+        head_x, head_y = snake.head
+        key = (head_x, head_y, len(snake))
+        if key == self._decided_for:
+            if self._frontier:
+                self._grow_search(snake, deadline)
+            return self._decision
+
+        self._grow_search(snake, deadline)
+        self._decision = self._decide(snake, food_cells, head_y * width + head_x, direction)
+        self._decided_for = key
+        return self._decision
+
+    def _decide(self, snake, food_cells, head, direction):
+        order, size, xy = self._order, self.size, self._xy
+        head_pos = order[head]
+        tail_x, tail_y = snake.tail
+        tail_rel = (order[tail_y * self.width + tail_x] - head_pos) % size or size
+
+        # Free neighbors and how far along the cycle each one is from the head
+        candidates = [(n, (order[n] - head_pos) % size) for n in self._neighbors[head] if xy[n] not in snake]
+        if not candidates:
+            return direction
+
+        # Only the cycle successor, or shortcuts that stay clear of the tail along the cycle
+        limit = tail_rel - SHORTCUT_MARGIN if len(snake) < size * MAX_SHORTCUT_FILL else 2
+        safe = [c for c in candidates if c[1] == 1 or c[1] < limit]
+        if not safe:
+            # The body isn't laid out along the cycle (e.g. at the start): take the roomiest move
+            safe = [max(candidates, key=lambda c: sum(xy[m] not in snake for m in self._neighbors[c[0]]))]
+
+        # Never pass the next food along the cycle, so every move gets closer to it there
+        food_rel = min(((order[f] - head_pos) % size for f in food_cells), default=size)
+        ahead = [c for c in safe if c[1] <= food_rel] or [min(safe, key=lambda c: c[1])]
+
+        # Closest to food by the distance field where it is known, then furthest along the cycle
+        dist = self._dist
+        best = min(ahead, key=lambda c: (dist[c[0]] if dist[c[0]] != UNKNOWN else size, -c[1]))
+
+        x, y = xy[best[0]]
+        head_x, head_y = xy[head]
+        return x - head_x, y - head_y
+
+
+class GreedyPilot:
+    """
+    A cheap autopilot for worlds too large for SnakeAutopilot's cycle tables.
+
+    Each move is the first step of a shortest path to the nearest food, found
+    by a BFS that gives up after max_cells cells, as long as the cell it
+    steps onto still opens onto at least as many free cells as the snake is
+    long (up to GREEDY_ROOM_CELLS); otherwise, or with no food in reach, it
+    takes the roomiest move. It needs no setup and keeps no state, but unlike the cycle
+    it can still trap the snake. choose() has SnakeAutopilot's interface;
+    foods only needs to support `in`, so a world can pass its food index.
+    """
+    def __init__(self, width, height, max_cells=GREEDY_SEARCH_CELLS):
+        self.width = width
+        self.height = height
+        self.max_cells = max_cells
+
+    def reset(self):
+        pass
+
+    def _room(self, start, snake, limit):
+        """Free cells reachable from start, counting up to limit."""
+        width, height = self.width, self.height
+        seen = {start}
+        frontier = deque(seen)
+        while frontier and len(seen) < limit:
+            x, y = frontier.popleft()
+            for n in ((x, y - 1), (x, y + 1), (x - 1, y), (x + 1, y)):
+                if n not in seen and 0 <= n[0] < width and 0 <= n[1] < height and n not in snake:
+                    seen.add(n)
+                    frontier.append(n)
+        return len(seen)
+
+    def choose(self, snake, foods, direction):
+        """Return the (dx, dy) step the snake should take on its next tick."""
+        head_x, head_y = snake.head
+        width, height = self.width, self.height
+        moves = []
+        for step in GREEDY_STEPS:
+            cell = (head_x + step[0], head_y + step[1])
+            if 0 <= cell[0] < width and 0 <= cell[1] < height and cell not in snake:
+                moves.append((cell, step))
+        if not moves:
+            return direction
+        room = min(len(snake), GREEDY_ROOM_CELLS)
+
+        # Nearest food first: one BFS from the head, tracking which move leads where
+        first = {}
+        frontier = deque()
+        target = None
+        for cell, step in moves:
+            if cell in foods:
+                target = step
+                break
+            first[cell] = step
+            frontier.append(cell)
+        while target is None and frontier and len(first) < self.max_cells:
+            x, y = frontier.popleft()
+            step = first[(x, y)]
+            for n in ((x, y - 1), (x, y + 1), (x - 1, y), (x + 1, y)):
+                if n not in first and 0 <= n[0] < width and 0 <= n[1] < height and n not in snake:
+                    if n in foods:
+                        target = step
+                        break
+                    first[n] = step
+                    frontier.append(n)
+        if target is not None:
+            cell = (head_x + target[0], head_y + target[1])
+            if self._room(cell, snake, room) >= room:
+                return target
+
+        # No food in reach, or going for it would trap the snake: take the roomiest move
+        best_step, best_room = direction, -1
+        for cell, step in moves:
+            reached = self._room(cell, snake, room)
+            if reached > best_room:
+                best_step, best_room = step, reached
+                if reached >= room:
+                    break
+        return best_step
+
+
+def _pilot_state(pilot):
+    """Copy of everything choose() changes, for timing a decision again."""
+    return (array('i', pilot._dist), deque(pilot._frontier), pilot._food_key, pilot._decided_for,
+            pilot._decision)
+
+
+def _restore_pilot(pilot, state):
+    dist, frontier, pilot._food_key, pilot._decided_for, pilot._decision = state
+    pilot._dist = array('i', dist)
+    pilot._frontier = deque(frontier)
+
+
+def play(width, height, ticks, seed=0, food_count=3, retime_over=None):
+    """
+    Play a headless game with the classic SnakeGame rules under the autopilot.
+    Returns (score, length, died, ticks played, per-tick decision times).
+    With retime_over, a decision taking that long or longer is made RETIMES
+    more times from the same state and its fastest time is kept.
+    """
+    from free_cells import FreeCellIndex
+    from snake_body import SnakeBody
+
+    rng = random.Random(seed)
+    snake = SnakeBody([(width // 2, height // 2)])
+    free_cells = FreeCellIndex(width, height, snake)
+    foods = []
+    for _ in range(food_count):
+        foods.append(free_cells.pop_random(rng))
+    pilot = SnakeAutopilot(width, height)
+    direction = (1, 0)
+    score = 0
+    times = []
+
+    for tick in range(ticks):
+        before = _pilot_state(pilot) if retime_over is not None else None
+        start = time.perf_counter()
+        next_direction = pilot.choose(snake, foods, direction)
+        elapsed = time.perf_counter() - start
+        if retime_over is not None and elapsed >= retime_over:
+            after = _pilot_state(pilot)
+            for _ in range(RETIMES):
+                _restore_pilot(pilot, before)
+                start = time.perf_counter()
+                pilot.choose(snake, foods, direction)
+                elapsed = min(elapsed, time.perf_counter() - start)
+            _restore_pilot(pilot, after)
+        times.append(elapsed)
+        direction = next_direction
+
+        head_x, head_y = snake.head
+        new_head = (head_x + direction[0], head_y + direction[1])
+        if not (0 <= new_head[0] < width and 0 <= new_head[1] < height) or new_head in snake:
+            return score, len(snake), True, tick, times
+        snake.push_head(new_head)
+        free_cells.discard(new_head)
+        if new_head in foods:
+            score += 10
+            foods.remove(new_head)
+            food = free_cells.pop_random(rng)
+            if food is not None:
+                foods.append(food)
+            elif not foods:
+                return score, len(snake), False, tick + 1, times   # Board full: a perfect game
+        else:
+            free_cells.add(snake.pop_tail())
+    return score, len(snake), False, ticks, times
+
+
+def play_world(width, height, ticks, seed=0, cells_per_food=400, retime_over=None):
+    """
+    Play a large world under GreedyPilot, with one food item per
+    cells_per_food cells. Returns the same tuple as play(); a decision taking
+    retime_over or longer is made RETIMES more times and its fastest time kept.
+    """
+    from snake_body import SnakeBody
+
+    rng = random.Random(seed)
+    snake = SnakeBody([(width // 2, height // 2)])
+    foods = {(rng.randrange(width), rng.randrange(height)) for _ in range(width * height // cells_per_food)}
+    foods -= set(snake)
+    pilot = GreedyPilot(width, height)
+    direction = (1, 0)
+    score = 0
+    times = []
+
+    for tick in range(ticks):
+        start = time.perf_counter()
+        direction = pilot.choose(snake, foods, direction)
+        elapsed = time.perf_counter() - start
+        if retime_over is not None and elapsed >= retime_over:
+            for _ in range(RETIMES):
+                start = time.perf_counter()
+                pilot.choose(snake, foods, direction)
+                elapsed = min(elapsed, time.perf_counter() - start)
+        times.append(elapsed)
+
+        head_x, head_y = snake.head
+        new_head = (head_x + direction[0], head_y + direction[1])
+        if not (0 <= new_head[0] < width and 0 <= new_head[1] < height) or new_head in snake:
+            return score, len(snake), True, tick, times
+        snake.push_head(new_head)
+        if new_head in foods:
+            score += 10
+            foods.discard(new_head)
+            while True:
+                food = (rng.randrange(width), rng.randrange(height))
+                if food not in snake and food not in foods:
+                    foods.add(food)
+                    break
+        else:
+            snake.pop_tail()
+    return score, len(snake), False, ticks, times
+
+
+def run_autopilot_checks():
+    """
+    Play boards of several sizes and return failures: deaths, or any single
+    decision that takes DECISION_LIMIT or more.
+    """
+    failures = []
+    for width, height, ticks in ((30, 20, 60000), (40, 27, 20000), (100, 100, 30000)):
+        score, length, died, played, times = play(width, height, ticks, retime_over=DECISION_LIMIT / 2)
+        times.sort()
+        p99 = times[int(0.99 * (len(times) - 1))] * 1000
+        worst = times[-1] * 1000
+        print(f"{width}x{height}: {played} ticks, score {score}, length {length}, "
+              f"decision p99 {p99:.3f} ms, max {worst:.3f} ms{' DIED' if died else ''}")
+        if died:
+            failures.append((width, height, 'snake died'))
+        if worst >= DECISION_LIMIT * 1000:
+            failures.append((width, height, f'slowest decision took {worst:.3f} ms'))
+
+    # The greedy pilot may trap itself, so only its speed and appetite are checked
+    width = height = 2000
+    score, length, died, played, times = play_world(width, height, 20000, retime_over=DECISION_LIMIT / 2)
+    times.sort()
+    print(f"{width}x{height} greedy: {played} ticks, score {score}, length {length}, "
+          f"decision p99 {times[int(0.99 * (len(times) - 1))] * 1000:.3f} ms, "
+          f"max {times[-1] * 1000:.3f} ms{' DIED' if died else ''}")
+    if score == 0:
+        failures.append((width, height, 'greedy pilot ate nothing'))
+    if times[-1] >= DECISION_LIMIT:
+        failures.append((width, height, f'slowest greedy decision took {times[-1] * 1000:.3f} ms'))
+    return failures
+
+
+if __name__ == '__main__':
+    failures = run_autopilot_checks()
+    for failure in failures:
+        print("FAIL %sx%s: %s" % failure)
+    print(f"{len(failures)} failures")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,236 @@
+"""
+Snake Game - Headless Batch Simulator
+Steps many independent snake boards at once with NumPy, no display needed.
+
+Each board follows the exact rules of SnakeGame.update in backup_snake_game.py,
+so a board created with seed S plays out the same as SnakeGame(seed=S)
+when both receive the same moves.
+"""
+
+import random
+
+import numpy as np
+
+from snake_rules import GRID_WIDTH, GRID_HEIGHT, FOOD_COLORS
+
+# --- Constants ---
+# Cell codes stored in the observation grid
+EMPTY = 0
+BODY = 1
+HEAD = 2
+FOOD = 3
+
+# Actions, indexed like DIRECTIONS below. Any other value keeps the current direction.
+UP, DOWN, LEFT, RIGHT = 0, 1, 2, 3
+DIRECTIONS = np.array([(0, -1), (0, 1), (-1, 0), (1, 0)], dtype=np.int32)
+OPPOSITE = np.array([DOWN, UP, RIGHT, LEFT], dtype=np.int32)
+
+FOOD_SLOTS = 3
+FOOD_REWARD = 10
+
+
+class BatchSnakeEnv:
+    """
+    N snake boards advanced in lock-step.
+
+    State is kept in arrays: an occupancy grid per board (also returned as the
+    observation), a ring buffer of body cells from tail to head, a free-cell
+    index laid out like free_cells.FreeCellIndex, and up to three food slots
+    per board. Only boards that eat touch Python code.
+
+    cells may be a (num_boards, height, width) int8 array, such as a view of
+    shared memory, to keep the observation grid in instead of a new array.
+    """
+    def __init__(self, num_boards, seeds=None, width=GRID_WIDTH, height=GRID_HEIGHT, cells=None):
+        self.num_boards = num_boards
+        self.width = width
+        self.height = height
+        self.capacity = width * height
+
+        if seeds is None:
+            seeds = range(num_boards)
+        self.rngs = [random.Random(seed) for seed in seeds]
+
+        if cells is None:
+            cells = np.zeros((num_boards, height, width), dtype=np.int8)
+        elif cells.shape != (num_boards, height, width) or cells.dtype != np.int8 or not cells.flags.c_contiguous:
+            raise ValueError("cells must be a C-contiguous int8 array of shape (num_boards, height, width)")
+        self.cells = cells
+        self.body = np.zeros((num_boards, self.capacity), dtype=np.int32)
+        self.head_ptr = np.zeros(num_boards, dtype=np.int64)
+        self.length = np.zeros(num_boards, dtype=np.int64)
+        self.direction = np.full(num_boards, RIGHT, dtype=np.int32)
+        self.score = np.zeros(num_boards, dtype=np.int64)
+        self.done = np.zeros(num_boards, dtype=bool)
+
+        # Free cells packed at the front of free_cells, with free_pos mapping back (-1 if taken)
+        self.free_cells = np.zeros((num_boards, self.capacity), dtype=np.int32)
+        self.free_pos = np.zeros((num_boards, self.capacity), dtype=np.int32)
+        self.free_count = np.zeros(num_boards, dtype=np.int64)
+
+        # Food slots keep the order of SnakeGame.foods; -1 marks an empty slot
+        self.food_cell = np.full((num_boards, FOOD_SLOTS), -1, dtype=np.int32)
+        self.food_color = np.zeros((num_boards, FOOD_SLOTS), dtype=np.int8)
+        self.food_count = np.zeros(num_boards, dtype=np.int64)
+
+        self._board_index = np.arange(num_boards)
+
+        # Free-cell layout of a fresh board: every cell, then the start cell swapped out
+        self._start = (height // 2) * width + width // 2
+        fresh_cells = np.arange(self.capacity, dtype=np.int32)
+        fresh_pos = np.arange(self.capacity, dtype=np.int32)
+        fresh_cells[self._start] = self.capacity - 1
+        fresh_pos[self.capacity - 1] = self._start
+        fresh_pos[self._start] = -1
+        self._fresh_free = (fresh_cells, fresh_pos)
+        self.reset()
+
+    def reset(self, mask=None):
+        """
+        Reset the selected boards (all by default) like SnakeGame.reset_game.
+        Returns the observation grid.
+        """
+        if mask is None:
+            boards = self._board_index
+        else:
+            boards = self._board_index[np.asarray(mask, dtype=bool)]
+
+        self.cells[boards] = EMPTY
+        self.cells.reshape(self.num_boards, -1)[boards, self._start] = HEAD
+        self.free_cells[boards] = self._fresh_free[0]
+        self.free_pos[boards] = self._fresh_free[1]
+        self.free_count[boards] = self.capacity - 1
+        self.body[boards, 0] = self._start
+        self.head_ptr[boards] = 0
+        self.length[boards] = 1
+        self.direction[boards] = RIGHT
+        self.score[boards] = 0
+        self.done[boards] = False
+        self.food_cell[boards] = -1
+        self.food_count[boards] = 0
+        for b in boards:
+            for _ in range(FOOD_SLOTS):
+                self._spawn_food(b)
+        return self.cells
+
+    def _take_free(self, boards, cells):
+        """Remove one cell per board from the free index (swap with the last free cell); scalars work too"""
+        slot = self.free_pos[boards, cells]
+        last = self.free_cells[boards, self.free_count[boards] - 1]
+        self.free_cells[boards, slot] = last
+        self.free_pos[boards, last] = slot
+        self.free_pos[boards, cells] = -1
+        self.free_count[boards] -= 1
+
+    def _give_free(self, boards, cells):
+        """Append one cell per board to the free index"""
+        count = self.free_count[boards]
+        self.free_cells[boards, count] = cells
+        self.free_pos[boards, cells] = count
+        self.free_count[boards] += 1
+
+    def _spawn_food(self, b):
+        """Spawn one food item on board b using the same draws as SnakeGame.spawn_food"""
+        if self.free_count[b] == 0:
+            return
+        rng = self.rngs[b]
+        cell = self.free_cells[b, rng.randrange(self.free_count[b])]
+        self._take_free(b, cell)
+
+        color = rng.choice(FOOD_COLORS)
+        slot = self.food_count[b]
+        self.food_cell[b, slot] = cell
+        self.food_color[b, slot] = FOOD_COLORS.index(color)
+        self.food_count[b] += 1
+        self.cells[b].flat[cell] = FOOD
+
+    def _eat_food(self, b, cell):
+        """Remove the eaten item from board b, keeping slot order like list.pop"""
+        count = self.food_count[b]
+        slots = self.food_cell[b, :count]
+        i = int(np.flatnonzero(slots == cell)[0])
+        self.food_cell[b, i:count - 1] = self.food_cell[b, i + 1:count]
+        self.food_color[b, i:count - 1] = self.food_color[b, i + 1:count]
+        self.food_cell[b, count - 1] = -1
+        self.food_count[b] -= 1
+        self.score[b] += FOOD_REWARD
+        self._spawn_food(b)
+
+    def step(self, actions):
+        """
+        Advance every board by one tick.
+
+        actions holds one direction per board (UP, DOWN, LEFT, RIGHT); reversing
+        into the body is ignored just like the games' TurnBuffer. Finished
+        boards stay frozen until reset.
+        Returns (obs, reward, done); obs is the live cell grid, not a copy.
+        """
+        actions = np.asarray(actions, dtype=np.int32)
+        reward = np.zeros(self.num_boards, dtype=np.int64)
+
+        # Apply direction changes, refusing to turn back on ourselves
+        valid = (actions >= 0) & (actions < 4)
+        safe_actions = np.where(valid, actions, 0)
+        turn = valid & (self.direction != OPPOSITE[safe_actions])
+        self.direction = np.where(turn, safe_actions, self.direction)
+
+        alive = ~self.done
+        head = self.body[self._board_index, self.head_ptr]
+        head_x = head % self.width
+        head_y = head // self.width
+        step = DIRECTIONS[self.direction]
+        new_x = head_x + step[:, 0]
+        new_y = head_y + step[:, 1]
+
+        # Check wall collision
+        inside = (new_x >= 0) & (new_x < self.width) & (new_y >= 0) & (new_y < self.height)
+        new_cell = np.where(inside, new_y * self.width + new_x, 0)
+
+        # Check self collision (the current tail still counts, as in SnakeGame)
+        flat = self.cells.reshape(self.num_boards, -1)
+        target = flat[self._board_index, new_cell]
+        hit_self = (target == BODY) | (target == HEAD)
+
+        crashed = alive & (~inside | hit_self)
+        self.done |= crashed
+        moving = alive & ~crashed
+        boards = self._board_index[moving]
+        if boards.size == 0:
+            return self.cells, reward, self.done
+
+        # Add new head
+        moved_cell = new_cell[moving]
+        ate = target[moving] == FOOD
+        flat[boards, head[moving]] = BODY
+        flat[boards, moved_cell] = HEAD
+        self.head_ptr[boards] = (self.head_ptr[boards] + 1) % self.capacity
+        self.body[boards, self.head_ptr[boards]] = moved_cell
+        self._take_free(boards[~ate], moved_cell[~ate])
+
+        # Check food collision
+        for b, cell in zip(boards[ate], moved_cell[ate]):
+            self._eat_food(b, cell)
+        reward[boards[ate]] = FOOD_REWARD
+        self.length[boards[ate]] += 1
+
+        # Remove tail if no food eaten
+        moved = boards[~ate]
+        tail_ptr = (self.head_ptr[moved] - self.length[moved]) % self.capacity
+        tail = self.body[moved, tail_ptr]
+        flat[moved, tail] = EMPTY
+        self._give_free(moved, tail)
+
+        return self.cells, reward, self.done
+
+    def snake(self, b):
+        """Return board b's snake as a head-to-tail list of (x, y), like SnakeGame.snake"""
+        ptrs = (self.head_ptr[b] - np.arange(self.length[b])) % self.capacity
+        return [(int(c % self.width), int(c // self.width)) for c in self.body[b, ptrs]]
+
+    def foods(self, b):
+        """Return board b's food as a list of (x, y, color), like SnakeGame.foods"""
+        return [
+            (int(cell % self.width), int(cell // self.width), FOOD_COLORS[color])
+            for cell, color in zip(self.food_cell[b, :self.food_count[b]],
+                                   self.food_color[b, :self.food_count[b]])
+        ]
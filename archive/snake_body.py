@@ -0,0 +1,56 @@
+"""
+Snake body with constant-time moves and collision checks.
+"""
+
+from collections import deque
+
+
+class SnakeBody:
+    """
+    The snake's segments, stored head first.
+
+    A deque keeps the order so the head and tail can be pushed and popped in
+    O(1), and a set of occupied cells makes `cell in body` O(1) as well.
+    Iterating yields the segments from head to tail, like the old list.
+    """
+    def __init__(self, segments=()):
+        self._segments = deque(segments)
+        self._occupied = set(self._segments)
+
+    def __len__(self):
+        return len(self._segments)
+
+    def __iter__(self):
+        return iter(self._segments)
+
+    def __contains__(self, cell):
+        return cell in self._occupied
+
+    def __getitem__(self, index):
+        """Index into the body; the ends (0 and -1) are O(1)."""
+        return self._segments[index]
+
+    def __eq__(self, other):
+        return list(self._segments) == list(other)
+
+    def __repr__(self):
+        return f"SnakeBody({list(self._segments)!r})"
+
+    @property
+    def head(self):
+        return self._segments[0]
+
+    @property
+    def tail(self):
+        return self._segments[-1]
+
+    def push_head(self, cell):
+        """Add a new head segment."""
+        self._segments.appendleft(cell)
+        self._occupied.add(cell)
+
+    def pop_tail(self):
+        """Remove and return the tail segment."""
+        cell = self._segments.pop()
+        self._occupied.discard(cell)
+        return cell
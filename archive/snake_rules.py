@@ -0,0 +1,17 @@
+"""
+Board size, tick rate and food colors of the classic snake game.
+
+They live apart from backup_snake_game.py so the headless environments
+(snake_batch, snake_runner) follow the same rules without importing pygame.
+"""
+
+# --- Constants ---
+WINDOW_WIDTH = 600
+WINDOW_HEIGHT = 400
+GRID_SIZE = 20
+GRID_WIDTH = WINDOW_WIDTH // GRID_SIZE
+GRID_HEIGHT = WINDOW_HEIGHT // GRID_SIZE
+TICK_RATE = 10  # Snake moves per second, independent of the frame rate
+
+# Red, orange, yellow, pink, purple; the spawn RNG picks one per food item
+FOOD_COLORS = [(255, 0, 0), (255, 165, 0), (255, 255, 0), (255, 20, 147), (148, 0, 211)]
@@ -0,0 +1,249 @@
+"""
+Snake Game - Multi-process Episode Runner
+Spreads snake boards over a pool of worker processes to evaluate (or collect
+self-play data for) a policy on every core.
+
+Each worker owns a headless BatchSnakeEnv slice that follows the SnakeGame
+rules. Observations, actions, rewards and done flags live in shared memory, so
+only two barrier waits per step cross the process boundary. The central
+policy sees all boards at once. Finished boards are reset by their worker,
+and their episode statistics are streamed back over a queue.
+
+Usage:
+    python archive/snake_runner.py [--episodes N] [--boards N] [--workers N]
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import sys
+import time
+from collections import namedtuple
+from multiprocessing import shared_memory
+from queue import Empty
+
+import numpy as np
+
+from snake_batch import BatchSnakeEnv, BODY, DIRECTIONS, FOOD, HEAD, GRID_HEIGHT, GRID_WIDTH
+
+# --- Constants ---
+DEFAULT_BOARDS = 4096
+DEFAULT_EPISODES = 100_000
+BARRIER_TIMEOUT = 60.0   # Seconds before a stuck step is treated as a dead worker
+
+EpisodeStats = namedtuple('EpisodeStats', 'board score length steps')
+
+
+def _shared_array(shape, dtype, name=None):
+    """Create (or attach to, when name is given) a shared-memory block viewed as an array."""
+    size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+    if name is None:
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    else:
+        shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _worker(start, stop, seed, buffers, start_barrier, finish_barrier, stop_event, stats_queue):
+    """
+    Step boards [start, stop) whenever the runner passes start_barrier and
+    report back through finish_barrier. Board b is seeded with seed + b, so
+    results don't depend on how boards are split between workers.
+    """
+    blocks = {}
+    arrays = {}
+    for key, (name, shape, dtype) in buffers.items():
+        blocks[key], arrays[key] = _shared_array(shape, dtype, name)
+    try:
+        _run_worker(start, stop, seed, arrays, start_barrier, finish_barrier, stop_event, stats_queue)
+    except BaseException:
+        # Wake the runner instead of leaving it waiting for a worker that is gone
+        start_barrier.abort()
+        finish_barrier.abort()
+        raise
+    finally:
+        # Stats the runner never read are dropped rather than blocking the exit
+        stats_queue.cancel_join_thread()
+        arrays.clear()
+        for shm in blocks.values():
+            shm.close()
+
+
+def _run_worker(start, stop, seed, arrays, start_barrier, finish_barrier, stop_event, stats_queue):
+    env = BatchSnakeEnv(stop - start, seeds=range(seed + start, seed + stop), cells=arrays['obs'][start:stop])
+    actions = arrays['actions'][start:stop]
+    rewards = arrays['rewards'][start:stop]
+    dones = arrays['dones'][start:stop]
+    steps = np.zeros(stop - start, dtype=np.int64)
+    finish_barrier.wait(BARRIER_TIMEOUT)
+
+    while True:
+        start_barrier.wait()
+        if stop_event.is_set():
+            return
+
+        _, reward, done = env.step(actions)
+        steps += 1
+        rewards[:] = reward
+        dones[:] = done
+
+        # Report and auto-reset finished boards; the next observation is a fresh board
+        if done.any():
+            finished = np.flatnonzero(done)
+            stats_queue.put([
+                EpisodeStats(start + int(b), int(env.score[b]), int(env.length[b]), int(steps[b]))
+                for b in finished
+            ])
+            env.reset(done)
+            steps[finished] = 0
+
+        finish_barrier.wait(BARRIER_TIMEOUT)
+
+
+class SnakeRunner:
+    """
+    Steps num_boards snake boards in lock-step across num_workers processes.
+
+    step(actions) takes one direction per board (see snake_batch) and returns
+    the shared (obs, reward, done) arrays; boards that finish are already reset
+    in obs. episodes() drains the statistics of finished episodes.
+    """
+    def __init__(self, num_boards=DEFAULT_BOARDS, num_workers=None, seed=0):
+        num_workers = min(num_workers or os.cpu_count() or 1, num_boards)
+        self.num_boards = num_boards
+        self.num_workers = num_workers
+
+        specs = {
+            'obs': ((num_boards, GRID_HEIGHT, GRID_WIDTH), np.int8),
+            'actions': ((num_boards,), np.int8),
+            'rewards': ((num_boards,), np.int64),
+            'dones': ((num_boards,), np.bool_),
+        }
+        self._blocks = {}
+        buffers = {}
+        for key, (shape, dtype) in specs.items():
+            self._blocks[key], array = _shared_array(shape, dtype)
+            setattr(self, key, array)
+            buffers[key] = (self._blocks[key].name, shape, dtype)
+
+        self._start_barrier = mp.Barrier(num_workers + 1)
+        self._finish_barrier = mp.Barrier(num_workers + 1)
+        self._stop_event = mp.Event()
+        self._stats_queue = mp.Queue()
+
+        bounds = np.linspace(0, num_boards, num_workers + 1).astype(int)
+        self._workers = [
+            mp.Process(target=_worker, daemon=True,
+                       args=(int(bounds[i]), int(bounds[i + 1]), seed, buffers, self._start_barrier,
+                             self._finish_barrier, self._stop_event, self._stats_queue))
+            for i in range(num_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+        self._finish_barrier.wait(BARRIER_TIMEOUT)   # Every worker has written its first observation
+
+    def step(self, actions):
+        """Advance every board by one tick. Returns (obs, reward, done) as shared arrays."""
+        self.actions[:] = actions
+        self._start_barrier.wait(BARRIER_TIMEOUT)
+        self._finish_barrier.wait(BARRIER_TIMEOUT)
+        return self.obs, self.rewards, self.dones
+
+    def episodes(self):
+        """Return the statistics of episodes finished since the last call."""
+        finished = []
+        while True:
+            try:
+                finished.extend(self._stats_queue.get_nowait())
+            except Empty:
+                return finished
+
+    def evaluate(self, policy, num_episodes):
+        """
+        Run policy(obs) -> actions until num_episodes episodes have finished.
+        Returns their statistics.
+        """
+        finished = self.episodes()
+        while len(finished) < num_episodes:
+            self.step(policy(self.obs))
+            finished.extend(self.episodes())
+        return finished[:num_episodes]
+
+    def close(self):
+        """Stop the workers and free the shared memory."""
+        if self._workers:
+            self._stop_event.set()
+            try:
+                self._start_barrier.wait(BARRIER_TIMEOUT)
+            except Exception:
+                pass
+            for worker in self._workers:
+                worker.join(BARRIER_TIMEOUT)
+            self._workers = []
+        for key, shm in self._blocks.items():
+            setattr(self, key, None)
+            shm.close()
+            shm.unlink()
+        self._blocks = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def greedy_policy(obs):
+    """
+    Head for the nearest food along the grid, never straight into a wall or
+    the body. Works on the whole (N, height, width) observation at once.
+    """
+    num_boards, height, width = obs.shape
+    flat = obs.reshape(num_boards, -1)
+    head = np.argmax(flat == HEAD, axis=1)
+    head_x, head_y = head % width, head // width
+
+    # Nearest food by Manhattan distance (boards always have food until the board is full)
+    food_y, food_x = np.divmod(np.arange(height * width), width)
+    distance = np.abs(food_x - head_x[:, None]) + np.abs(food_y - head_y[:, None])
+    distance = np.where(flat == FOOD, distance, height * width)
+    target = np.argmin(distance, axis=1)
+    target_x, target_y = target % width, target // width
+
+    # Score each direction: unsafe moves last, then the ones that get closer
+    new_x = head_x[:, None] + DIRECTIONS[:, 0]
+    new_y = head_y[:, None] + DIRECTIONS[:, 1]
+    inside = (new_x >= 0) & (new_x < width) & (new_y >= 0) & (new_y < height)
+    cell = np.where(inside, new_y * width + new_x, 0)
+    content = np.take_along_axis(flat, cell, axis=1)
+    safe = inside & (content != BODY) & (content != HEAD)
+    closer = np.abs(target_x[:, None] - new_x) + np.abs(target_y[:, None] - new_y)
+    return np.argmin(np.where(safe, closer, 2 * height * width), axis=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate a snake policy across worker processes.")
+    parser.add_argument('--episodes', type=int, default=DEFAULT_EPISODES)
+    parser.add_argument('--boards', type=int, default=DEFAULT_BOARDS)
+    parser.add_argument('--workers', type=int, default=None, help='defaults to the number of CPUs')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with SnakeRunner(args.boards, args.workers, args.seed) as runner:
+        finished = runner.evaluate(greedy_policy, args.episodes)
+        workers = runner.num_workers
+    elapsed = time.perf_counter() - start
+
+    scores = np.array([episode.score for episode in finished])
+    lengths = np.array([episode.length for episode in finished])
+    steps = np.array([episode.steps for episode in finished])
+    print(f"{len(finished)} episodes on {workers} workers in {elapsed:.1f} s "
+          f"({len(finished) / elapsed:.0f} episodes/s, {steps.sum() / elapsed:.0f} steps/s)")
+    print(f"score mean {scores.mean():.1f} max {scores.max()}, "
+          f"length mean {lengths.mean():.1f}, steps mean {steps.mean():.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
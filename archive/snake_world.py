@@ -0,0 +1,280 @@
+"""
+Large-world snake rendering: a camera that follows the head, bucket indexes
+of the snake and food, and a cache of pre-drawn background chunks.
+
+A frame only touches the buckets and chunks under the viewport, so drawing
+costs the same on a 2000x2000 world as on one the size of the window.
+
+Run this file directly to check that culled drawing matches drawing
+everything, and that frame time stays flat as the world grows.
+"""
+
+import random
+import sys
+import time
+from collections import OrderedDict
+
+import pygame
+
+# --- Constants ---
+BUCKET_SIZE = 16    # Cells per side of a spatial bucket
+CHUNK_SIZE = 16     # Cells per side of a cached background chunk
+MAX_CHUNKS = 64     # Chunks kept before the least recently used one is dropped
+
+
+class BucketIndex:
+    """
+    A set of (x, y) cells grouped into square buckets, so the cells inside a
+    rectangle are found by looking at the few buckets it overlaps.
+    """
+    def __init__(self, cells=(), bucket_size=BUCKET_SIZE):
+        self.bucket_size = bucket_size
+        self._buckets = {}
+        self._count = 0
+        for cell in cells:
+            self.add(cell)
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, cell):
+        size = self.bucket_size
+        bucket = self._buckets.get((cell[0] // size, cell[1] // size))
+        return bucket is not None and cell in bucket
+
+    def add(self, cell):
+        size = self.bucket_size
+        key = (cell[0] // size, cell[1] // size)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = set()
+        if cell not in bucket:
+            bucket.add(cell)
+            self._count += 1
+
+    def discard(self, cell):
+        size = self.bucket_size
+        key = (cell[0] // size, cell[1] // size)
+        bucket = self._buckets.get(key)
+        if bucket is not None and cell in bucket:
+            bucket.remove(cell)
+            self._count -= 1
+            if not bucket:
+                del self._buckets[key]
+
+    def query(self, left, top, right, bottom):
+        """Yield the cells with left <= x < right and top <= y < bottom."""
+        size = self.bucket_size
+        buckets = self._buckets
+        for bucket_y in range(top // size, (bottom - 1) // size + 1):
+            for bucket_x in range(left // size, (right - 1) // size + 1):
+                bucket = buckets.get((bucket_x, bucket_y))
+                if bucket is None:
+                    continue
+                inner = (left <= bucket_x * size and (bucket_x + 1) * size <= right and
+                         top <= bucket_y * size and (bucket_y + 1) * size <= bottom)
+                if inner:
+                    yield from bucket
+                else:
+                    for cell in bucket:
+                        if left <= cell[0] < right and top <= cell[1] < bottom:
+                            yield cell
+
+
+class ChunkCache:
+    """
+    Background chunks drawn once by a baker function and kept in LRU order.
+    bake(chunk_x, chunk_y) returns the Surface for that chunk.
+    """
+    def __init__(self, bake, capacity=MAX_CHUNKS):
+        self._bake = bake
+        self.capacity = capacity
+        self._chunks = OrderedDict()
+
+    def __len__(self):
+        return len(self._chunks)
+
+    def get(self, chunk_x, chunk_y):
+        key = (chunk_x, chunk_y)
+        chunk = self._chunks.get(key)
+        if chunk is not None:
+            self._chunks.move_to_end(key)
+            return chunk
+        chunk = self._bake(chunk_x, chunk_y)
+        if pygame.display.get_surface() is not None:
+            chunk = chunk.convert()
+        self._chunks[key] = chunk
+        if len(self._chunks) > self.capacity:
+            self._chunks.popitem(last=False)
+        return chunk
+
+    def clear(self):
+        self._chunks.clear()
+
+
+class SnakeWorld:
+    """
+    What a large-world snake game needs to draw only the viewport.
+
+    The game keeps body and food in step with its own snake and food list
+    (see reset), and draw() renders the view_width x view_height cells
+    around the head into an area of the screen.
+    """
+    def __init__(self, width, height, view_width, view_height, cell_size, bake_chunk):
+        self.width = width
+        self.height = height
+        self.view_width = min(view_width, width)
+        self.view_height = min(view_height, height)
+        self.cell_size = cell_size
+        self.body = BucketIndex()
+        self.food = BucketIndex()
+        self.chunks = ChunkCache(bake_chunk)
+        self.left = 0
+        self.top = 0
+
+    def reset(self, snake, food=()):
+        """Rebuild the indexes from scratch, e.g. after a restart or a restore."""
+        self.body = BucketIndex(snake)
+        self.food = BucketIndex(food)
+
+    def follow(self, cell):
+        """Centre the camera on cell, without showing anything past the world's edges."""
+        x, y = cell
+        self.left = max(0, min(self.width - self.view_width, x - self.view_width // 2))
+        self.top = max(0, min(self.height - self.view_height, y - self.view_height // 2))
+
+    def draw(self, surface, origin, head, body_tile, head_tile, food_tile):
+        """
+        Draw the background chunks, snake and food in view with the top-left
+        visible cell at pixel origin.
+        """
+        cell = self.cell_size
+        left, top = self.left, self.top
+        right, bottom = left + self.view_width, top + self.view_height
+        origin_x = origin[0] - left * cell
+        origin_y = origin[1] - top * cell
+
+        previous_clip = surface.get_clip()
+        surface.set_clip((origin[0], origin[1], self.view_width * cell, self.view_height * cell))
+
+        chunk_pixels = CHUNK_SIZE * cell
+        blits = []
+        for chunk_y in range(top // CHUNK_SIZE, (bottom - 1) // CHUNK_SIZE + 1):
+            for chunk_x in range(left // CHUNK_SIZE, (right - 1) // CHUNK_SIZE + 1):
+                blits.append((self.chunks.get(chunk_x, chunk_y),
+                              (origin_x + chunk_x * chunk_pixels, origin_y + chunk_y * chunk_pixels)))
+        surface.blits(blits, doreturn=False)
+
+        surface.blits([(body_tile, (origin_x + x * cell, origin_y + y * cell))
+                       for x, y in self.body.query(left, top, right, bottom)], doreturn=False)
+        if left <= head[0] < right and top <= head[1] < bottom:
+            surface.blit(head_tile, (origin_x + head[0] * cell, origin_y + head[1] * cell))
+        surface.blits([(food_tile, (origin_x + x * cell, origin_y + y * cell))
+                       for x, y in self.food.query(left, top, right, bottom)], doreturn=False)
+
+        surface.set_clip(previous_clip)
+
+
+# --- Checks ---
+
+def _check_tile(color, cell):
+    tile = pygame.Surface((cell, cell))
+    tile.fill(color)
+    return tile
+
+
+def _check_chunk_baker(width, height, cell):
+    def bake(chunk_x, chunk_y):
+        chunk = pygame.Surface((CHUNK_SIZE * cell, CHUNK_SIZE * cell))
+        chunk.fill((20, 20, 20))
+        for y in range(CHUNK_SIZE):
+            for x in range(CHUNK_SIZE):
+                world_x, world_y = chunk_x * CHUNK_SIZE + x, chunk_y * CHUNK_SIZE + y
+                if world_x < width and world_y < height and (world_x + world_y) % 2:
+                    chunk.fill((28, 28, 28), (x * cell, y * cell, cell, cell))
+        return chunk
+    return bake
+
+
+def _scene(width, height, segments, band, margin, rng):
+    """
+    A snake winding back and forth inside a band of columns at a random spot
+    at least margin rows from the top and bottom edges, and food scattered
+    over the whole world at one item per 400 cells.
+    """
+    rows = -(-segments // band)
+    start_x = rng.randrange(width - band + 1)
+    start_y = rng.randrange(margin, height - margin - rows + 1)
+    snake = []
+    x, y, step = start_x, start_y, 1
+    while len(snake) < segments:
+        snake.append((x, y))
+        if start_x <= x + step < start_x + band:
+            x += step
+        else:
+            y += 1
+            step = -step
+    food = {(rng.randrange(width), rng.randrange(height)) for _ in range(width * height // 400)} - set(snake)
+    return snake, food
+
+
+def run_world_checks(view=(40, 27), cell=20, segments=600, frames=300):
+    """
+    Check that culled drawing matches drawing everything, and that the same
+    scene costs about the same to draw however large the world around it is.
+    """
+    failures = []
+    rng = random.Random(0)
+    body_tile = _check_tile((80, 140, 20), cell)
+    head_tile = _check_tile((118, 204, 9), cell)
+    food_tile = _check_tile((214, 60, 60), cell)
+    surface = pygame.Surface((view[0] * cell, view[1] * cell + 60))
+    baseline = None
+
+    for width, height in ((3 * view[0], 3 * view[1]), (400, 400), (2000, 2000)):
+        snake, food = _scene(width, height, segments, view[0], view[1], rng)
+        world = SnakeWorld(width, height, view[0], view[1], cell, _check_chunk_baker(width, height, cell))
+        world.reset(snake, food)
+        background = SnakeWorld(width, height, view[0], view[1], cell, _check_chunk_baker(width, height, cell))
+
+        # Culled drawing must match blitting every segment and food item through the clip
+        for _ in range(20):
+            world.follow((rng.randrange(width), rng.randrange(height)))
+            world.draw(surface, (0, 60), snake[0], body_tile, head_tile, food_tile)
+            expected = pygame.Surface(surface.get_size())
+            background.left, background.top = world.left, world.top
+            background.draw(expected, (0, 60), (-1, -1), body_tile, head_tile, food_tile)
+            expected.set_clip((0, 60, world.view_width * cell, world.view_height * cell))
+            offset_x, offset_y = -world.left * cell, 60 - world.top * cell
+            for x, y in snake[1:]:
+                expected.blit(body_tile, (offset_x + x * cell, offset_y + y * cell))
+            expected.blit(head_tile, (offset_x + snake[0][0] * cell, offset_y + snake[0][1] * cell))
+            for x, y in food:
+                expected.blit(food_tile, (offset_x + x * cell, offset_y + y * cell))
+            if pygame.image.tobytes(expected, 'RGB') != pygame.image.tobytes(surface, 'RGB'):
+                failures.append((width, height, f'culled frame differs at camera {world.left},{world.top}'))
+                break
+
+        # Frame time while the camera follows a crawl along the snake, as it would in play
+        times = []
+        for i in range(frames):
+            start = time.perf_counter()
+            world.follow(snake[-1 - i % len(snake)])
+            world.draw(surface, (0, 60), snake[0], body_tile, head_tile, food_tile)
+            times.append(time.perf_counter() - start)
+        times.sort()
+        p50 = times[len(times) // 2] * 1000
+        baseline = baseline or p50
+        print(f"{width}x{height}: {len(food)} food in the world, frame p50 {p50:.3f} ms "
+              f"({p50 / baseline:.2f}x the smallest world), {len(world.chunks)} chunks cached")
+        if p50 > 1.5 * baseline + 0.5:
+            failures.append((width, height, f'frame p50 {p50:.3f} ms grows with the world'))
+    return failures
+
+
+if __name__ == '__main__':
+    failures = run_world_checks()
+    for failure in failures:
+        print("FAIL %sx%s: %s" % failure)
+    print(f"{len(failures)} failures")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,65 @@
+"""
+Pre-baked sprite tiles, so each grid item is drawn with a single blit.
+"""
+
+import pygame
+
+
+class _Placements(dict):
+    """(tile, pixel position) blit items keyed by grid cell, made the first time each cell is asked for."""
+    def __init__(self, tile, cell_size, origin):
+        super().__init__()
+        self.tile = tile
+        self.cell_size = cell_size
+        self.origin = origin
+
+    def __missing__(self, cell):
+        item = self[cell] = (self.tile, (self.origin[0] + cell[0] * self.cell_size,
+                                         self.origin[1] + cell[1] * self.cell_size))
+        return item
+
+
+class SpriteCache:
+    """
+    Bakes each (kind, color) tile once and keeps it for the rest of the game.
+
+    Games register a baker per kind: a function that takes the color and
+    returns a freshly drawn Surface. Tiles are converted to the display
+    format (when a display exists) so blitting them is as cheap as possible.
+    """
+    def __init__(self):
+        self._bakers = {}
+        self._tiles = {}
+        self._placements = {}
+
+    def register(self, kind, baker):
+        self._bakers[kind] = baker
+
+    def get(self, kind, color):
+        """Return the tile for (kind, color), baking it on first use."""
+        key = (kind, color)
+        tile = self._tiles.get(key)
+        if tile is None:
+            tile = self._bakers[kind](color)
+            if pygame.display.get_surface() is not None:
+                tile = tile.convert_alpha() if tile.get_flags() & pygame.SRCALPHA else tile.convert()
+            self._tiles[key] = tile
+        return tile
+
+    def placements(self, kind, color, cell_size, origin=(0, 0)):
+        """
+        Blit items for the (kind, color) tile on a grid of cell_size pixels
+        starting at origin, keyed by cell. Each item is made once and reused,
+        so screen.blits(map(placements.__getitem__, cells)) draws a tile on
+        every cell without allocating.
+        """
+        key = (kind, color, cell_size, origin)
+        placements = self._placements.get(key)
+        if placements is None:
+            placements = self._placements[key] = _Placements(self.get(kind, color), cell_size, origin)
+        return placements
+
+    def clear(self):
+        """Drop all baked tiles, e.g. after the display mode changes."""
+        self._tiles.clear()
+        self._placements.clear()
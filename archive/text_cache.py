@@ -0,0 +1,93 @@
+"""
+Cached text rendering for HUD and message text.
+
+font.render() is one of the most expensive calls in a frame, especially with
+PressStart2P-Regular.ttf, yet most HUD text is the same from frame to frame.
+"""
+
+from collections import OrderedDict
+
+import pygame
+
+# --- Constants ---
+TEXT_CACHE_SIZE = 256
+DIGITS = "0123456789"
+
+
+class TextCache:
+    """
+    LRU cache of rendered text surfaces keyed by (font, text, color, antialias).
+    """
+    def __init__(self, max_entries=TEXT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._surfaces = OrderedDict()
+
+    def __len__(self):
+        return len(self._surfaces)
+
+    def render(self, font, text, color, antialias=True):
+        """Return the surface for text, rendering it only on a cache miss."""
+        key = (font, text, color, antialias)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            return surface
+
+        surface = font.render(text, antialias, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self._surfaces.clear()
+
+
+class GlyphAtlas:
+    """
+    Pre-rendered glyphs for one font and color, so changing numbers such as
+    scores are composed from blits instead of being rendered each time.
+    """
+    def __init__(self, font, color, chars=DIGITS, antialias=True):
+        self.font = font
+        self.color = color
+        self.chars = chars
+        self.antialias = antialias
+        self._glyphs = None
+
+    @property
+    def glyphs(self):
+        """The glyph surfaces, rendered on first use so a lazily loaded font stays unloaded until drawn."""
+        if self._glyphs is None:
+            self._glyphs = {char: self.font.render(char, self.antialias, self.color) for char in self.chars}
+        return self._glyphs
+
+    @property
+    def height(self):
+        return self.font.get_height()
+
+    def size(self, text):
+        """Width and height of text when composed from the atlas."""
+        return sum(self.glyphs[char].get_width() for char in text), self.height
+
+    def label_size(self, label, text):
+        """Size of a pre-rendered label surface followed by text from the atlas."""
+        return label.get_width() + self.size(text)[0], max(label.get_height(), self.height)
+
+    def blit(self, surface, text, pos):
+        """Draw text with its top-left corner at pos and return the covered rect."""
+        x, y = pos
+        for char in text:
+            glyph = self.glyphs[char]
+            surface.blit(glyph, (x, y))
+            x += glyph.get_width()
+        return pygame.Rect(pos[0], y, x - pos[0], self.height)
+
+    def blit_label(self, surface, label, text, pos):
+        """Draw a pre-rendered label surface followed by text from the atlas."""
+        rect = surface.blit(label, pos)
+        return rect.union(self.blit(surface, text, rect.topright))
+
+
+# Shared by all games so identical text is only rendered once per process
+text_cache = TextCache()
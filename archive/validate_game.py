@@ -0,0 +1,283 @@
+"""
+Performance validator for generated games.
+
+Runs a single-file pygame game the way it runs from the command line, but
+under SDL's dummy video driver, with scripted key presses and without the
+frame cap or any sleeping. Every display flip (or update) ends a frame. After
+a warm-up, frames are timed, then a shorter pass measures allocations with
+tracemalloc. The game fails when it misses the frame-time budget, allocates
+too much per frame, renders text every frame, or stops early. The budgets
+are the ones in the Performance section of
+prompts/game_design_prompt_template.md.
+
+Usage:
+    python archive/validate_game.py GAME.py [GAME.py ...] [--frames N]
+        [--p50-ms MS] [--p99-ms MS] [--alloc-kb KB]
+"""
+
+import argparse
+import os
+import runpy
+import sys
+import time
+import tracemalloc
+import traceback
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+os.environ['GAME_SCORES'] = ''   # Scripted sessions stay off the high-score table
+
+import pygame
+import pygame.sysfont
+
+from benchmark import percentile
+
+# --- Constants ---
+DEFAULT_FRAMES = 600
+WARMUP_FRAMES = 30              # Font loading and sprite baking happen here and are not judged
+ALLOC_FRAMES = 120              # Frames measured with tracemalloc, after the timed frames
+FRAME_P50_MS = 4.0              # Update + draw per frame, typical
+FRAME_P99_MS = 8.0              # ... and in the worst 1% of frames
+ALLOC_BYTES_PER_FRAME = 16 * 1024
+TEXT_RENDERS_PER_FRAME = 0.5    # Font.render calls per frame on average; text should be cached
+NOMINAL_FPS = 60                # What the fake Clock.tick reports when the game gives no frame rate
+
+KEY_INTERVAL = 8                # Frames each scripted key is held
+RESTART_INTERVAL = 150          # Frames between presses of R, to get past game-over screens
+SCRIPT_KEYS = (pygame.K_d, pygame.K_s, pygame.K_a, pygame.K_w, pygame.K_RIGHT, pygame.K_DOWN,
+               pygame.K_LEFT, pygame.K_UP, pygame.K_SPACE)
+
+
+class _Finished(BaseException):
+    """Raised from the patched flip once every frame has been seen, to leave the game's loop."""
+
+
+class _FakeClock:
+    """Clock that never sleeps but reports the frame time the game asked for."""
+    def __init__(self):
+        self._last = 0
+
+    def tick(self, framerate=0):
+        self._last = round(1000 / (framerate or NOMINAL_FPS))
+        return self._last
+
+    tick_busy_loop = tick
+
+    def get_time(self):
+        return self._last
+
+    def get_rawtime(self):
+        return self._last
+
+    def get_fps(self):
+        return 1000 / self._last if self._last else 0.0
+
+
+class _PressedKeys:
+    """Stands in for pygame.key.get_pressed(): indexable by key constant."""
+    def __init__(self, held):
+        self._held = held
+
+    def __getitem__(self, key):
+        return key in self._held
+
+    def __iter__(self):
+        # Enough for any(keys); games index by key constant otherwise
+        return iter([key in self._held for key in SCRIPT_KEYS])
+
+
+class GameHarness:
+    """
+    Feeds a game scripted input and measures each frame between display flips.
+    """
+    def __init__(self, frames=DEFAULT_FRAMES, warmup=WARMUP_FRAMES, alloc_frames=ALLOC_FRAMES):
+        self.frames = frames
+        self.warmup = warmup
+        self.alloc_frames = alloc_frames
+        self.frame = 0
+        self.frame_times = []
+        self.allocations = []
+        self.text_renders = 0
+        self._frame_start = None
+        self._alloc_start = 0
+        self._events_frame = -1
+        self._pending = []
+        self._pending_frame = -1
+        self._held = set()
+
+    @property
+    def total_frames(self):
+        return self.warmup + self.frames + self.alloc_frames
+
+    # --- Scripted input ---
+
+    def _script(self, frame):
+        """Key presses and releases that happen at the start of frame."""
+        events = []
+        if frame % KEY_INTERVAL == 0:
+            key = SCRIPT_KEYS[frame // KEY_INTERVAL % len(SCRIPT_KEYS)]
+            for held in list(self._held):
+                events.append(pygame.event.Event(pygame.KEYUP, key=held, mod=0, scancode=0, unicode=''))
+            self._held = {key}
+            events.append(pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, scancode=0,
+                                             unicode=chr(key) if key < 128 else ''))
+        if frame % RESTART_INTERVAL == RESTART_INTERVAL - 1:
+            events.append(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_r, mod=0, scancode=0, unicode='r'))
+            events.append(pygame.event.Event(pygame.KEYUP, key=pygame.K_r, mod=0, scancode=0, unicode=''))
+        return events
+
+    def get_events(self, *args, **kwargs):
+        """This frame's scripted events, once; later calls in the same frame get nothing."""
+        if self._events_frame == self.frame:
+            return []
+        self._events_frame = self.frame
+        return self._script(self.frame)
+
+    def poll_event(self):
+        """Like get_events, one event at a time."""
+        if self._pending_frame != self.frame:
+            self._pending = self.get_events()
+            self._pending_frame = self.frame
+        return self._pending.pop(0) if self._pending else pygame.event.Event(pygame.NOEVENT)
+
+    def get_pressed(self):
+        return _PressedKeys(self._held)
+
+    # --- Frames ---
+
+    def end_frame(self, *args, **kwargs):
+        """Called on every flip/update: records the frame that just ended."""
+        now = time.perf_counter()
+        timed_end = self.warmup + self.frames
+        if self.warmup <= self.frame < timed_end and self._frame_start is not None:
+            self.frame_times.append(now - self._frame_start)
+        elif self.frame >= timed_end and tracemalloc.is_tracing():
+            self.allocations.append(tracemalloc.get_traced_memory()[1] - self._alloc_start)
+
+        self.frame += 1
+        if self.frame == timed_end:
+            tracemalloc.start()
+        if self.frame >= self.total_frames:
+            raise _Finished()
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            self._alloc_start = tracemalloc.get_traced_memory()[0]
+        self._frame_start = time.perf_counter()
+
+    def count_render(self):
+        if self.warmup <= self.frame < self.warmup + self.frames:
+            self.text_renders += 1
+
+    # --- Running ---
+
+    def _patches(self):
+        harness = self
+
+        class CountingFont(pygame.font.Font):
+            def render(self, *args, **kwargs):
+                harness.count_render()
+                return super().render(*args, **kwargs)
+
+        return [
+            (pygame.event, 'get', self.get_events),
+            (pygame.event, 'poll', self.poll_event),
+            (pygame.event, 'pump', lambda: None),
+            (pygame.key, 'get_pressed', self.get_pressed),
+            (pygame.display, 'flip', self.end_frame),
+            (pygame.display, 'update', self.end_frame),
+            (pygame.time, 'Clock', _FakeClock),
+            (pygame.time, 'delay', lambda ms: 0),
+            (pygame.time, 'wait', lambda ms: 0),
+            (pygame.font, 'Font', CountingFont),
+            (pygame.sysfont, 'Font', CountingFont),
+            (time, 'sleep', lambda seconds: None),
+        ]
+
+    def run(self, path):
+        """
+        Run the game file as __main__ until enough frames were drawn.
+        Returns None, or a description of why the game stopped early.
+        """
+        patches = self._patches()
+        originals = [(owner, name, getattr(owner, name)) for owner, name, _ in patches]
+        saved_argv, saved_path = sys.argv, list(sys.path)
+        sys.argv = [path]
+        sys.path.insert(0, os.path.dirname(os.path.abspath(path)))
+        for owner, name, replacement in patches:
+            setattr(owner, name, replacement)
+        try:
+            runpy.run_path(path, run_name='__main__')
+            return 'the game returned'
+        except _Finished:
+            return None
+        except SystemExit as exit:
+            return f'the game exited (status {exit.code})'
+        except Exception:
+            return 'the game raised an error:\n' + traceback.format_exc()
+        finally:
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+            for owner, name, original in originals:
+                setattr(owner, name, original)
+            sys.argv, sys.path[:] = saved_argv, saved_path
+            pygame.quit()
+
+
+def validate(path, frames=DEFAULT_FRAMES, p50_ms=FRAME_P50_MS, p99_ms=FRAME_P99_MS,
+             alloc_bytes=ALLOC_BYTES_PER_FRAME, text_renders=TEXT_RENDERS_PER_FRAME):
+    """Run one game and return (measurements, failures)."""
+    harness = GameHarness(frames)
+    stopped = harness.run(path)
+    failures = []
+    if stopped is not None:
+        failures.append(f'stopped after {harness.frame} of {harness.total_frames} frames: {stopped}')
+
+    results = {'frames': len(harness.frame_times)}
+    if harness.frame_times:
+        times = sorted(harness.frame_times)
+        results['frame_ms_p50'] = percentile(times, 0.50) * 1000
+        results['frame_ms_p99'] = percentile(times, 0.99) * 1000
+        results['text_renders_per_frame'] = harness.text_renders / len(times)
+        if results['frame_ms_p50'] > p50_ms:
+            failures.append(f"frame time p50 {results['frame_ms_p50']:.2f} ms is over {p50_ms} ms")
+        if results['frame_ms_p99'] > p99_ms:
+            failures.append(f"frame time p99 {results['frame_ms_p99']:.2f} ms is over {p99_ms} ms")
+        if results['text_renders_per_frame'] > text_renders:
+            failures.append(f"{results['text_renders_per_frame']:.2f} text renders per frame; "
+                            "render text once and reuse it")
+    if harness.allocations:
+        results['alloc_bytes_per_frame_p50'] = percentile(sorted(harness.allocations), 0.50)
+        if results['alloc_bytes_per_frame_p50'] > alloc_bytes:
+            failures.append(f"allocates {results['alloc_bytes_per_frame_p50'] / 1024:.1f} KiB per frame, "
+                            f"over {alloc_bytes / 1024:.0f} KiB")
+    return results, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check a generated pygame game against the performance budgets.")
+    parser.add_argument('games', nargs='+', help='single-file games to run')
+    parser.add_argument('--frames', type=int, default=DEFAULT_FRAMES, help='timed frames after the warm-up')
+    parser.add_argument('--p50-ms', type=float, default=FRAME_P50_MS)
+    parser.add_argument('--p99-ms', type=float, default=FRAME_P99_MS)
+    parser.add_argument('--alloc-kb', type=float, default=ALLOC_BYTES_PER_FRAME / 1024)
+    args = parser.parse_args()
+
+    failed = 0
+    for path in args.games:
+        results, failures = validate(path, args.frames, args.p50_ms, args.p99_ms, args.alloc_kb * 1024)
+        summary = f"{path}: {results['frames']} frames"
+        if 'frame_ms_p50' in results:
+            summary += (f", p50 {results['frame_ms_p50']:.2f} ms, p99 {results['frame_ms_p99']:.2f} ms, "
+                        f"{results['text_renders_per_frame']:.2f} text renders/frame")
+        if 'alloc_bytes_per_frame_p50' in results:
+            summary += f", alloc {results['alloc_bytes_per_frame_p50'] / 1024:.1f} KiB/frame"
+        print(f"{summary} - {'FAIL' if failures else 'PASS'}")
+        for failure in failures:
+            print(f"  {failure}")
+        failed += bool(failures)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())